@@ -1,17 +1,30 @@
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from pathlib import Path
+from typing import Optional
 
 # Configurações
-from util.config import APP_NAME, SECRET_KEY, HOST, PORT, RELOAD, VERSION
+from util.config import APP_NAME, SECRET_KEY, HOST, PORT, RELOAD, VERSION, TEMPLATES_PRECOMPILAR
 
 # Logger
 from util.logger_config import logger
 
+# Banco de dados
+from util.auth_decorator import requer_autenticacao
+from util.perfis import Perfil
+from util.db_util import obter_estatisticas_pool, verificar_pragmas
+from util.db_async import executor_banco
+from util.chat_manager import chat_manager
+from util.chat_retencao import agendador_retencao
+from util.config_cache import config
+from util.template_util import precompilar_templates
+from util.cache_fragmentos import cache_fragmentos
+from util.cache_paginas import cache_paginas
+
 # Exception Handlers
 from util.exception_handlers import (
     http_exception_handler,
@@ -23,7 +36,8 @@ from util.exceptions import FormValidationError
 
 # Repositórios
 from repo import usuario_repo, configuracao_repo, tarefa_repo, chamado_repo, chamado_interacao_repo, indices_repo
-from repo import chat_sala_repo, chat_participante_repo, chat_mensagem_repo, categoria_repo
+from repo import chat_sala_repo, chat_participante_repo, chat_mensagem_repo, chat_evento_repo, categoria_repo
+from repo import rate_limit_repo
 
 # Rotas
 from routes.auth_routes import router as auth_router
@@ -53,6 +67,34 @@ from util.csrf_protection import CSRFProtectionMiddleware
 app.add_middleware(CSRFProtectionMiddleware)
 logger.info("CSRF Protection habilitado")
 
+# Configurar Rate Limiting (adicionado por último: é o middleware mais externo e
+# rejeita requisições acima do limite antes de sessão, CSRF, roteamento e templates).
+# A primeira regra que casa com método + caminho decide o limiter.
+from util.rate_limit_middleware import RateLimitMiddleware, RegraRateLimit
+from routes.public_routes import public_limiter
+from routes.examples_routes import examples_limiter
+from routes.usuario_routes import form_get_limiter
+from routes.chat_routes import chat_mensagem_limiter, chat_sala_limiter, busca_usuarios_limiter, chat_listagem_limiter
+
+REGRAS_RATE_LIMIT = [
+    # Páginas públicas
+    RegraRateLimit("/", public_limiter),
+    RegraRateLimit("/index", public_limiter),
+    RegraRateLimit("/sobre", public_limiter),
+    RegraRateLimit("/exemplos/{pagina:path}", examples_limiter),
+    # Formulários GET do perfil
+    RegraRateLimit("/usuario/perfil/editar", form_get_limiter),
+    RegraRateLimit("/usuario/perfil/alterar-senha", form_get_limiter),
+    # Chat (chamadas fetch: 429 em JSON)
+    RegraRateLimit("/chat/salas", chat_sala_limiter, metodos=["POST"], formato="json"),
+    RegraRateLimit("/chat/mensagens", chat_mensagem_limiter, metodos=["POST"], formato="json"),
+    RegraRateLimit("/chat/conversas", chat_listagem_limiter, formato="json"),
+    RegraRateLimit("/chat/mensagens/{sala_id}", chat_listagem_limiter, formato="json"),
+    RegraRateLimit("/chat/usuarios/buscar", busca_usuarios_limiter, formato="json"),
+]
+app.add_middleware(RateLimitMiddleware, regras=REGRAS_RATE_LIMIT)
+logger.info(f"Rate limiting por middleware habilitado ({len(REGRAS_RATE_LIMIT)} regras)")
+
 # Registrar Exception Handlers
 app.add_exception_handler(StarletteHTTPException, http_exception_handler)  # type: ignore[arg-type]
 app.add_exception_handler(RequestValidationError, validation_exception_handler)  # type: ignore[arg-type]
@@ -91,7 +133,13 @@ try:
     logger.info("Tabela 'chat_participante' criada/verificada")
 
     chat_mensagem_repo.criar_tabela()
-    logger.info("Tabela 'chat_mensagem' criada/verificada")
+    logger.info("Tabelas 'chat_mensagem' e 'chat_mensagem_arquivo' criadas/verificadas")
+
+    chat_evento_repo.criar_tabela()
+    logger.info("Tabela 'chat_evento' criada/verificada")
+
+    rate_limit_repo.criar_tabela()
+    logger.info("Tabela 'rate_limit' criada/verificada")
 
     categoria_repo.criar_tabela()
     logger.info("Tabela 'categoria' criada/verificada")
@@ -103,6 +151,19 @@ except Exception as e:
     logger.error(f"Erro ao criar tabelas: {e}")
     raise
 
+# Verificar configuração efetiva do banco (PRAGMAs podem ser recusados pelo SQLite)
+try:
+    for pragma, valores in verificar_pragmas().items():
+        if valores["ok"]:
+            logger.info(f"PRAGMA {pragma} = {valores['efetivo']}")
+        else:
+            logger.warning(
+                f"PRAGMA {pragma} efetivo ({valores['efetivo']}) difere do "
+                f"configurado ({valores['configurado']})"
+            )
+except Exception as e:
+    logger.error(f"Erro ao verificar PRAGMAs do banco: {e}")
+
 # Inicializar dados seed
 try:
     inicializar_dados()
@@ -116,6 +177,16 @@ try:
 except Exception as e:
     logger.error(f"Erro ao migrar configurações para banco: {e}", exc_info=True)
 
+# Carregar todas as configurações no cache (snapshot tipado) antes da primeira requisição
+config.carregar()
+
+# Compilar todos os templates (ambiente Jinja2 compartilhado + cache de bytecode)
+if TEMPLATES_PRECOMPILAR:
+    try:
+        precompilar_templates()
+    except Exception as e:
+        logger.error(f"Erro ao pré-compilar templates: {e}")
+
 # Incluir routers
 # IMPORTANTE: public_router deve ser incluído por último para que a rota "/" funcione corretamente
 app.include_router(auth_router, tags=["Autenticação"])
@@ -148,6 +219,13 @@ logger.info("Router de usuário incluído")
 app.include_router(chat_router, tags=["Chat"])
 logger.info("Router de chat incluído")
 
+# Encerrar o barramento de eventos do chat junto com a aplicação
+app.add_event_handler("shutdown", chat_manager.encerrar)
+
+# Job de arquivamento de mensagens antigas do chat (util/chat_retencao.py)
+app.add_event_handler("startup", agendador_retencao.iniciar)
+app.add_event_handler("shutdown", agendador_retencao.encerrar)
+
 # Rotas públicas (deve ser por último para não sobrescrever outras rotas)
 app.include_router(public_router, tags=["Público"])
 logger.info("Router público incluído")
@@ -158,9 +236,22 @@ logger.info("Router de exemplos incluído")
 
 @app.get("/health")
 async def health_check():
-    """Endpoint de health check"""
+    """Endpoint de health check (público: apenas o status)"""
     return {"status": "healthy"}
 
+@app.get("/health/detalhes")
+@requer_autenticacao([Perfil.ADMIN.value])
+async def health_check_detalhes(request: Request, usuario_logado: Optional[dict] = None):
+    """Estatísticas do pool, do executor do banco e dos caches (somente administradores)"""
+    return {
+        "status": "healthy",
+        "banco": obter_estatisticas_pool(),
+        "executor_banco": executor_banco.obter_estatisticas(),
+        "retencao_chat": agendador_retencao.obter_estatisticas(),
+        "cache_fragmentos": cache_fragmentos.obter_estatisticas(),
+        "cache_paginas": cache_paginas.obter_estatisticas(),
+    }
+
 if __name__ == "__main__":
     logger.info("=" * 60)
     logger.info(f"Iniciando {APP_NAME} v{VERSION}")
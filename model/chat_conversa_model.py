@@ -0,0 +1,36 @@
+"""
+Model para representar o resumo de uma conversa na lista de chats.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+
+@dataclass
+class ChatConversa:
+    """
+    Resumo de uma sala do ponto de vista de um participante.
+
+    Não corresponde a uma tabela: é montado por uma única consulta que
+    junta chat_sala, chat_participante, usuario e chat_mensagem.
+
+    Attributes:
+        sala_id: ID da sala de chat
+        ultima_atividade: Timestamp da última atividade na sala
+        outro_usuario_id: ID do outro participante
+        outro_usuario_nome: Nome do outro participante
+        outro_usuario_email: E-mail do outro participante
+        nao_lidas: Mensagens do outro participante ainda não lidas
+        ultima_mensagem: Conteúdo da última mensagem (None se sala vazia)
+        ultima_mensagem_usuario_id: Autor da última mensagem
+        ultima_mensagem_data_envio: Timestamp de envio da última mensagem
+    """
+    sala_id: str
+    ultima_atividade: datetime
+    outro_usuario_id: int
+    outro_usuario_nome: str
+    outro_usuario_email: str
+    nao_lidas: int = 0
+    ultima_mensagem: Optional[str] = None
+    ultima_mensagem_usuario_id: Optional[int] = None
+    ultima_mensagem_data_envio: Optional[datetime] = None
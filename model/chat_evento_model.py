@@ -0,0 +1,23 @@
+"""
+Model para representar um evento SSE do chat publicado no barramento entre workers.
+"""
+from dataclasses import dataclass
+
+
+@dataclass
+class ChatEvento:
+    """
+    Evento destinado às conexões SSE de um usuário.
+
+    Attributes:
+        id: ID sequencial do evento (ordem de publicação)
+        usuario_id: ID do usuário destinatário
+        payload: Evento a enviar pelo SSE (mesmo dicionário passado ao broadcast)
+        origem: Identificador do worker que publicou
+        criado_em: Momento da publicação (epoch, segundos)
+    """
+    id: int
+    usuario_id: int
+    payload: dict
+    origem: str
+    criado_em: float
@@ -0,0 +1,45 @@
+"""
+Model para representar as contagens por faceta da busca de vagas.
+"""
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping
+
+
+@dataclass(frozen=True)
+class FacetasVaga:
+    """
+    Quantidade de vagas abertas por valor de cada faceta da busca.
+
+    Não corresponde a uma tabela: é montado por vaga_repo.obter_facetas a
+    partir de uma única consulta agrupada. A contagem de cada faceta ignora
+    o filtro da própria faceta (ex: por_uf considera área e modalidade
+    escolhidas, mas não a UF), para que o usuário veja as alternativas.
+
+    Imutável: a mesma instância fica em cache e
+    é devolvida a todas as requisições, então ninguém pode alterá-la.
+
+    Attributes:
+        total: Vagas que atendem a todos os filtros
+        por_area: {id_area: quantidade}
+        nomes_area: {id_area: nome da área}
+        por_uf: {uf: quantidade}
+        por_modalidade: {modalidade: quantidade}
+        por_faixa_salarial: {faixa: quantidade}, faixas de FAIXAS_SALARIAIS
+    """
+    total: int = 0
+    por_area: Mapping[int, int] = field(default_factory=lambda: MappingProxyType({}))
+    nomes_area: Mapping[int, str] = field(default_factory=lambda: MappingProxyType({}))
+    por_uf: Mapping[str, int] = field(default_factory=lambda: MappingProxyType({}))
+    por_modalidade: Mapping[str, int] = field(default_factory=lambda: MappingProxyType({}))
+    por_faixa_salarial: Mapping[str, int] = field(default_factory=lambda: MappingProxyType({}))
+
+
+# Faixas salariais na ordem de exibição (chave usada em CONTAR_FACETAS -> rótulo)
+FAIXAS_SALARIAIS = {
+    "a_combinar": "A combinar",
+    "ate_1500": "Até R$ 1.500",
+    "1500_3000": "R$ 1.500 a R$ 3.000",
+    "3000_5000": "R$ 3.000 a R$ 5.000",
+    "acima_5000": "Acima de R$ 5.000",
+}
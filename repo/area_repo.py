@@ -1,4 +1,5 @@
-from typing import Optional
+import json
+from typing import Iterable, Optional
 from model.area_model import Area
 from sql.area_sql import *
 from util.db_util import get_connection
@@ -47,6 +48,32 @@ def obter_por_id(id_area: int) -> Optional[Area]:
         return None
 
 
+def obter_por_ids(ids: Iterable[int]) -> dict[int, Area]:
+    """
+    Obtém várias áreas em uma única consulta.
+
+    Args:
+        ids: IDs das áreas (repetições são ignoradas)
+
+    Returns:
+        Dicionário {id_area: Area}; IDs inexistentes ficam de fora
+    """
+    ids = list(set(ids))
+    if not ids:
+        return {}
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_POR_IDS, (json.dumps(ids),))
+        return {
+            row["id_area"]: Area(
+                id_area=row["id_area"],
+                nome=row["nome"],
+                descricao=row["descricao"] if "descricao" in row.keys() else "",
+            )
+            for row in cursor.fetchall()
+        }
+
+
 def obter_todas() -> list[Area]:
     with get_connection() as conn:
         cursor = conn.cursor()
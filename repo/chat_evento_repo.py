@@ -0,0 +1,101 @@
+"""
+Repositório para operações com a tabela chat_evento.
+"""
+import json
+import time
+from typing import Iterable, List
+from sqlite3 import Row
+
+from model.chat_evento_model import ChatEvento
+from sql.chat_evento_sql import (
+    CRIAR_TABELA,
+    INSERIR,
+    OBTER_ULTIMO_ID,
+    LISTAR_APOS,
+    EXCLUIR_ANTERIORES
+)
+from util.db_util import get_connection
+
+
+def _row_to_evento(row: Row) -> ChatEvento:
+    """Converte uma row do banco em objeto ChatEvento."""
+    return ChatEvento(
+        id=row["id"],
+        usuario_id=row["usuario_id"],
+        payload=json.loads(row["payload"]),
+        origem=row["origem"],
+        criado_em=row["criado_em"]
+    )
+
+
+def criar_tabela():
+    """Cria a tabela chat_evento se não existir."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CRIAR_TABELA)
+
+
+def inserir(usuario_ids: Iterable[int], payload: dict, origem: str) -> None:
+    """
+    Publica um evento para vários usuários em uma única transação.
+
+    Args:
+        usuario_ids: IDs dos destinatários
+        payload: Evento a enviar pelo SSE
+        origem: Identificador do worker que publica
+    """
+    conteudo = json.dumps(payload)
+    criado_em = time.time()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(
+            INSERIR,
+            [(usuario_id, conteudo, origem, criado_em) for usuario_id in usuario_ids]
+        )
+
+
+def obter_ultimo_id() -> int:
+    """
+    Obtém o ID do evento mais recente.
+
+    Returns:
+        Último ID publicado (0 se não houver eventos)
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_ULTIMO_ID)
+        return cursor.fetchone()["ultimo_id"]
+
+
+def listar_apos(ultimo_id: int, origem: str, limite: int = 500) -> List[ChatEvento]:
+    """
+    Lista eventos de outros workers publicados após um ID.
+
+    Args:
+        ultimo_id: ID do último evento já processado
+        origem: Identificador do worker que consulta (seus eventos são ignorados)
+        limite: Número máximo de eventos
+
+    Returns:
+        Lista de ChatEvento em ordem de publicação
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(LISTAR_APOS, (ultimo_id, origem, limite))
+        return [_row_to_evento(row) for row in cursor.fetchall()]
+
+
+def excluir_anteriores(limite_epoch: float) -> int:
+    """
+    Remove eventos publicados antes de um instante.
+
+    Args:
+        limite_epoch: Instante limite (epoch, segundos)
+
+    Returns:
+        Número de eventos removidos
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(EXCLUIR_ANTERIORES, (limite_epoch,))
+        return cursor.rowcount
@@ -1,24 +1,50 @@
 """
 Repositório para operações com a tabela chat_mensagem.
 """
+import json
+from datetime import datetime
 from typing import Optional, List
 from sqlite3 import Row
 
 from model.chat_mensagem_model import ChatMensagem
 from sql.chat_mensagem_sql import (
     CRIAR_TABELA,
+    CRIAR_TABELA_ARQUIVO,
     INSERIR,
     OBTER_POR_ID,
-    LISTAR_POR_SALA,
+    LISTAR_ULTIMAS_POR_SALA,
+    LISTAR_POR_SALA_ANTES_DE,
+    LISTAR_POR_SALA_DEPOIS_DE,
+    LISTAR_POR_USUARIO_DEPOIS_DE,
     CONTAR_POR_SALA,
     MARCAR_COMO_LIDAS,
     OBTER_ULTIMA_MENSAGEM_SALA,
-    EXCLUIR
+    OBTER_DADOS_EXCLUSAO,
+    EXCLUIR,
+    LISTAR_ARQUIVO_POR_SALA_ANTES_DE,
+    LISTAR_ARQUIVO_POR_SALA_DEPOIS_DE,
+    CONTAR_ARQUIVO_POR_SALA,
+    MARCAR_ARQUIVO_COMO_LIDAS,
+    OBTER_DADOS_EXCLUSAO_ARQUIVO,
+    EXCLUIR_ARQUIVO,
+    OBTER_ID_CORTE_SALA,
+    LISTAR_IDS_PARA_ARQUIVAR,
+    COPIAR_PARA_ARQUIVO,
+    EXCLUIR_ARQUIVADAS
+)
+from sql.chat_participante_sql import (
+    INCREMENTAR_NAO_LIDAS,
+    DECREMENTAR_NAO_LIDAS,
+    ZERAR_NAO_LIDAS
 )
 from util.db_util import get_connection
 from util.datetime_util import agora
 
 
+# Maior ID possível no SQLite (cursor "antes de tudo")
+_ID_MAXIMO = 2 ** 63 - 1
+
+
 def _row_to_mensagem(row: Row) -> ChatMensagem:
     """Converte uma row do banco em objeto ChatMensagem."""
     # Acessar campos com verificação de chave
@@ -41,16 +67,19 @@ def _row_to_mensagem(row: Row) -> ChatMensagem:
 
 
 def criar_tabela():
-    """Cria a tabela chat_mensagem se não existir."""
+    """Cria as tabelas chat_mensagem e chat_mensagem_arquivo se não existirem."""
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(CRIAR_TABELA)
+        cursor.execute(CRIAR_TABELA_ARQUIVO)
 
 
 def inserir(sala_id: str, usuario_id: int, mensagem: str) -> ChatMensagem:
     """
     Insere uma nova mensagem em uma sala.
 
+    Na mesma transação incrementa o contador de não lidas dos demais participantes.
+
     Args:
         sala_id: ID da sala
         usuario_id: ID do usuário que enviou
@@ -65,6 +94,7 @@ def inserir(sala_id: str, usuario_id: int, mensagem: str) -> ChatMensagem:
         cursor = conn.cursor()
         cursor.execute(INSERIR, (sala_id, usuario_id, mensagem, data_envio, None))
         mensagem_id = cursor.lastrowid
+        cursor.execute(INCREMENTAR_NAO_LIDAS, (sala_id, usuario_id))
 
     return ChatMensagem(
         id=mensagem_id,
@@ -96,29 +126,92 @@ def obter_por_id(mensagem_id: int) -> Optional[ChatMensagem]:
         return None
 
 
-def listar_por_sala(sala_id: str, limit: int = 50, offset: int = 0) -> List[ChatMensagem]:
+def listar_por_sala(
+    sala_id: str,
+    limit: int = 50,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None
+) -> List[ChatMensagem]:
     """
-    Lista mensagens de uma sala com paginação.
+    Lista mensagens de uma sala com paginação por cursor (ID da mensagem).
+
+    Sem cursor, retorna as `limit` mensagens mais recentes. Com `before_id`,
+    as `limit` imediatamente anteriores a ela (rolar para trás no histórico);
+    com `after_id`, as `limit` imediatamente posteriores (buscar novas).
+
+    Mensagens movidas para chat_mensagem_arquivo pelo job de retenção são
+    lidas de lá quando a página ultrapassa a janela mantida na tabela
+    principal; para quem chama, o histórico é contínuo.
 
     Args:
         sala_id: ID da sala
         limit: Número máximo de mensagens a retornar
-        offset: Número de mensagens a pular (para paginação)
+        before_id: Retornar apenas mensagens com ID menor que este
+        after_id: Retornar apenas mensagens com ID maior que este
 
     Returns:
         Lista de objetos ChatMensagem (ordenadas por ID crescente - mais antigas primeiro)
+
+    Raises:
+        ValueError: Se before_id e after_id forem informados juntos
     """
+    if before_id is not None and after_id is not None:
+        raise ValueError("Informe before_id ou after_id, não ambos")
+
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute(LISTAR_POR_SALA, (sala_id, limit, offset))
-        rows = cursor.fetchall()
+        if after_id is not None:
+            # IDs arquivados são sempre menores que os da tabela principal
+            cursor.execute(LISTAR_ARQUIVO_POR_SALA_DEPOIS_DE, (sala_id, after_id, limit))
+            rows = cursor.fetchall()
+            if len(rows) < limit:
+                ultimo_id = rows[-1]["id"] if rows else after_id
+                cursor.execute(LISTAR_POR_SALA_DEPOIS_DE, (sala_id, ultimo_id, limit - len(rows)))
+                rows += cursor.fetchall()
+        else:
+            if before_id is not None:
+                cursor.execute(LISTAR_POR_SALA_ANTES_DE, (sala_id, before_id, limit))
+            else:
+                cursor.execute(LISTAR_ULTIMAS_POR_SALA, (sala_id, limit))
+            rows = cursor.fetchall()
+            if len(rows) < limit:
+                # Página passou da janela quente: completar com o arquivo
+                primeiro_id = rows[-1]["id"] if rows else before_id
+                cursor.execute(
+                    LISTAR_ARQUIVO_POR_SALA_ANTES_DE,
+                    (sala_id, primeiro_id if primeiro_id is not None else _ID_MAXIMO, limit - len(rows))
+                )
+                rows += cursor.fetchall()
+            # Consultas "para trás" vêm da mais nova para a mais antiga
+            rows = list(reversed(rows))
 
         return [_row_to_mensagem(row) for row in rows]
 
 
+def listar_por_usuario_depois_de(usuario_id: int, after_id: int, limit: int = 200) -> List[ChatMensagem]:
+    """
+    Lista mensagens de todas as salas do usuário com ID maior que `after_id`.
+
+    Usado para reenviar, em uma única consulta, o que o stream SSE perdeu
+    enquanto o cliente estava desconectado.
+
+    Args:
+        usuario_id: ID do participante
+        after_id: Último ID de mensagem recebido pelo cliente
+        limit: Número máximo de mensagens a retornar
+
+    Returns:
+        Lista de objetos ChatMensagem (ordenadas por ID crescente)
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(LISTAR_POR_USUARIO_DEPOIS_DE, (usuario_id, after_id, limit))
+        return [_row_to_mensagem(row) for row in cursor.fetchall()]
+
+
 def contar_por_sala(sala_id: str) -> int:
     """
-    Conta o total de mensagens em uma sala.
+    Conta o total de mensagens em uma sala (incluindo as arquivadas).
 
     Args:
         sala_id: ID da sala
@@ -128,16 +221,22 @@ def contar_por_sala(sala_id: str) -> int:
     """
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute(CONTAR_POR_SALA, (sala_id,))
-        row = cursor.fetchone()
+        total = 0
+        for sql in (CONTAR_POR_SALA, CONTAR_ARQUIVO_POR_SALA):
+            cursor.execute(sql, (sala_id,))
+            row = cursor.fetchone()
+            total += row["total"] if row else 0
 
-        return row["total"] if row else 0
+        return total
 
 
 def marcar_como_lidas(sala_id: str, usuario_id: int) -> bool:
     """
     Marca como lidas todas as mensagens não lidas de outros usuários em uma sala.
 
+    Vale também para as mensagens já arquivadas (chat_mensagem_arquivo).
+    Também zera o contador de não lidas do usuário na sala.
+
     Args:
         sala_id: ID da sala
         usuario_id: ID do usuário que está marcando como lidas
@@ -147,7 +246,10 @@ def marcar_como_lidas(sala_id: str, usuario_id: int) -> bool:
     """
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute(MARCAR_COMO_LIDAS, (agora(), sala_id, usuario_id))
+        lida_em = agora()
+        cursor.execute(MARCAR_COMO_LIDAS, (lida_em, sala_id, usuario_id))
+        cursor.execute(MARCAR_ARQUIVO_COMO_LIDAS, (lida_em, sala_id, usuario_id))
+        cursor.execute(ZERAR_NAO_LIDAS, (sala_id, usuario_id))
         return cursor.rowcount >= 0  # Retorna True mesmo se nenhuma mensagem foi marcada
 
 
@@ -173,7 +275,10 @@ def obter_ultima_mensagem_sala(sala_id: str) -> Optional[ChatMensagem]:
 
 def excluir(mensagem_id: int) -> bool:
     """
-    Exclui uma mensagem.
+    Exclui uma mensagem, esteja ela na tabela principal ou no arquivo.
+
+    Se a mensagem ainda não tinha sido lida por algum participante,
+    o contador de não lidas dele é decrementado.
 
     Args:
         mensagem_id: ID da mensagem
@@ -183,5 +288,51 @@ def excluir(mensagem_id: int) -> bool:
     """
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute(EXCLUIR, (mensagem_id,))
-        return cursor.rowcount > 0
+        for obter_dados, excluir_sql in ((OBTER_DADOS_EXCLUSAO, EXCLUIR),
+                                         (OBTER_DADOS_EXCLUSAO_ARQUIVO, EXCLUIR_ARQUIVO)):
+            cursor.execute(obter_dados, (mensagem_id,))
+            row = cursor.fetchone()
+            if row:
+                cursor.execute(excluir_sql, (mensagem_id,))
+                cursor.execute(DECREMENTAR_NAO_LIDAS, (row["sala_id"], row["usuario_id"], row["data_envio"]))
+                return True
+
+        return False
+
+
+def arquivar_lote(sala_id: str, manter: int, anteriores_a: datetime, lote: int = 500) -> int:
+    """
+    Move um lote de mensagens antigas de uma sala para chat_mensagem_arquivo.
+
+    São arquivadas, das mais antigas para as mais novas, mensagens que estão
+    fora das `manter` mais recentes da sala E foram enviadas antes de
+    `anteriores_a`. Cópia e exclusão ocorrem na mesma transação.
+
+    Args:
+        sala_id: ID da sala
+        manter: Quantidade de mensagens recentes que permanecem na tabela principal
+        anteriores_a: Data limite de envio
+        lote: Máximo de mensagens movidas nesta chamada
+
+    Returns:
+        Quantidade de mensagens arquivadas (menor que `lote` indica que a sala terminou)
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        corte = _ID_MAXIMO
+        if manter > 0:
+            cursor.execute(OBTER_ID_CORTE_SALA, (sala_id, manter - 1))
+            row = cursor.fetchone()
+            if row is None:
+                # Sala com menos de `manter` mensagens: nada a arquivar
+                return 0
+            corte = row["id"]
+
+        cursor.execute(LISTAR_IDS_PARA_ARQUIVAR, (sala_id, corte, anteriores_a, lote))
+        ids = json.dumps([row["id"] for row in cursor.fetchall()])
+        if ids == "[]":
+            return 0
+
+        cursor.execute(COPIAR_PARA_ARQUIVO, (ids,))
+        cursor.execute(EXCLUIR_ARQUIVADAS, (ids,))
+        return cursor.rowcount
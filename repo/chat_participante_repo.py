@@ -11,12 +11,18 @@ from sql.chat_participante_sql import (
     OBTER_POR_SALA_E_USUARIO,
     LISTAR_POR_SALA,
     LISTAR_POR_USUARIO,
+    LISTAR_CONTATOS,
     ATUALIZAR_ULTIMA_LEITURA,
-    CONTAR_MENSAGENS_NAO_LIDAS,
+    OBTER_NAO_LIDAS,
+    SOMAR_NAO_LIDAS_POR_USUARIO,
+    LISTAR_COLUNAS,
+    ADICIONAR_COLUNA_NAO_LIDAS,
+    RECALCULAR_NAO_LIDAS,
     EXCLUIR
 )
 from util.db_util import get_connection
 from util.datetime_util import agora
+from util.logger_config import logger
 
 
 def _row_to_participante(row: Row) -> ChatParticipante:
@@ -29,16 +35,28 @@ def _row_to_participante(row: Row) -> ChatParticipante:
     return ChatParticipante(
         sala_id=row["sala_id"],
         usuario_id=row["usuario_id"],
-        ultima_leitura=ultima_leitura
+        ultima_leitura=ultima_leitura,
+        nao_lidas=row["nao_lidas"] if "nao_lidas" in row.keys() else 0
     )
 
 
 def criar_tabela():
-    """Cria a tabela chat_participante se não existir."""
+    """
+    Cria a tabela chat_participante se não existir.
+
+    Bancos criados antes do contador materializado de não lidas ganham
+    a coluna nao_lidas, já preenchida a partir das mensagens existentes.
+    """
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(CRIAR_TABELA)
 
+        colunas = {row["name"] for row in cursor.execute(LISTAR_COLUNAS).fetchall()}
+        if "nao_lidas" not in colunas:
+            cursor.execute(ADICIONAR_COLUNA_NAO_LIDAS)
+            cursor.execute(RECALCULAR_NAO_LIDAS)
+            logger.info(f"Coluna chat_participante.nao_lidas criada e preenchida ({cursor.rowcount} participações)")
+
 
 def adicionar_participante(sala_id: str, usuario_id: int) -> ChatParticipante:
     """
@@ -121,7 +139,7 @@ def listar_por_usuario(usuario_id: int) -> List[ChatParticipante]:
 
 def atualizar_ultima_leitura(sala_id: str, usuario_id: int) -> bool:
     """
-    Atualiza o timestamp de última leitura do participante.
+    Atualiza o timestamp de última leitura do participante e zera seu contador de não lidas.
 
     Args:
         sala_id: ID da sala
@@ -138,7 +156,9 @@ def atualizar_ultima_leitura(sala_id: str, usuario_id: int) -> bool:
 
 def contar_mensagens_nao_lidas(sala_id: str, usuario_id: int) -> int:
     """
-    Conta quantas mensagens não lidas existem para um usuário em uma sala.
+    Obtém quantas mensagens não lidas existem para um usuário em uma sala.
+
+    Lê o contador materializado em chat_participante (sem varrer as mensagens).
 
     Args:
         sala_id: ID da sala
@@ -149,13 +169,46 @@ def contar_mensagens_nao_lidas(sala_id: str, usuario_id: int) -> int:
     """
     with get_connection() as conn:
         cursor = conn.cursor()
-        # Passar usuario_id 3 vezes: para sala_id, usuario_id != ?, e duas vezes na subquery
-        cursor.execute(CONTAR_MENSAGENS_NAO_LIDAS, (sala_id, usuario_id, usuario_id, usuario_id))
+        cursor.execute(OBTER_NAO_LIDAS, (sala_id, usuario_id))
+        row = cursor.fetchone()
+
+        return row["nao_lidas"] if row else 0
+
+
+def contar_nao_lidas_total(usuario_id: int) -> int:
+    """
+    Soma as mensagens não lidas de um usuário em todas as suas salas.
+
+    Args:
+        usuario_id: ID do usuário
+
+    Returns:
+        Total de mensagens não lidas
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SOMAR_NAO_LIDAS_POR_USUARIO, (usuario_id,))
         row = cursor.fetchone()
 
         return row["total"] if row else 0
 
 
+def listar_contatos(usuario_id: int) -> List[int]:
+    """
+    Lista os IDs dos usuários que têm sala de chat com o usuário informado.
+
+    Args:
+        usuario_id: ID do usuário
+
+    Returns:
+        Lista de IDs dos outros participantes das salas do usuário
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(LISTAR_CONTATOS, (usuario_id,))
+        return [row["usuario_id"] for row in cursor.fetchall()]
+
+
 def excluir(sala_id: str, usuario_id: int) -> bool:
     """
     Remove um participante de uma sala.
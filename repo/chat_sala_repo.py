@@ -1,16 +1,19 @@
 """
 Repositório para operações com a tabela chat_sala.
 """
-from typing import Optional
+from typing import Optional, List
 from sqlite3 import Row
 
 from model.chat_sala_model import ChatSala
+from model.chat_conversa_model import ChatConversa
 from sql.chat_sala_sql import (
     CRIAR_TABELA,
     INSERIR,
     OBTER_POR_ID,
     ATUALIZAR_ULTIMA_ATIVIDADE,
-    EXCLUIR
+    EXCLUIR,
+    LISTAR_CONVERSAS_POR_USUARIO,
+    LISTAR_IDS_APOS
 )
 from util.db_util import get_connection
 from util.datetime_util import agora
@@ -156,9 +159,62 @@ def atualizar_ultima_atividade(sala_id: str) -> bool:
         return cursor.rowcount > 0
 
 
+def listar_conversas_por_usuario(usuario_id: int, limit: int = 12, offset: int = 0) -> List[ChatConversa]:
+    """
+    Lista as conversas de um usuário, mais recentes primeiro.
+
+    Uma única consulta traz, para cada sala, o outro participante, a última
+    mensagem e o número de não lidas; ordenação e paginação são feitas no banco.
+
+    Args:
+        usuario_id: ID do usuário dono da lista
+        limit: Número máximo de conversas a retornar
+        offset: Número de conversas a pular (para paginação)
+
+    Returns:
+        Lista de objetos ChatConversa
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(LISTAR_CONVERSAS_POR_USUARIO, (usuario_id, limit, offset))
+        rows = cursor.fetchall()
+
+        return [
+            ChatConversa(
+                sala_id=row["sala_id"],
+                ultima_atividade=row["ultima_atividade"],
+                outro_usuario_id=row["outro_usuario_id"],
+                outro_usuario_nome=row["outro_usuario_nome"],
+                outro_usuario_email=row["outro_usuario_email"],
+                nao_lidas=row["nao_lidas"],
+                ultima_mensagem=row["ultima_mensagem"],
+                ultima_mensagem_usuario_id=row["ultima_mensagem_usuario_id"],
+                ultima_mensagem_data_envio=row["ultima_mensagem_data_envio"]
+            )
+            for row in rows
+        ]
+
+
+def listar_ids_apos(ultimo_id: str = "", limite: int = 200) -> List[str]:
+    """
+    Lista IDs de salas em ordem, a partir de um ID (paginação por chave).
+
+    Args:
+        ultimo_id: Último ID da página anterior ("" para começar)
+        limite: Número máximo de IDs
+
+    Returns:
+        Lista de IDs de sala maiores que ultimo_id
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(LISTAR_IDS_APOS, (ultimo_id, limite))
+        return [row["id"] for row in cursor.fetchall()]
+
+
 def excluir(sala_id: str) -> bool:
     """
-    Exclui uma sala (cascade deleta participantes e mensagens).
+    Exclui uma sala (cascade deleta participantes e mensagens, inclusive arquivadas).
 
     Args:
         sala_id: ID da sala
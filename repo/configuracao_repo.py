@@ -28,8 +28,42 @@ def criar_tabela() -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(CRIAR_TABELA)
+        cursor.execute(CRIAR_TABELA_VERSAO)
+        cursor.execute(INICIALIZAR_VERSAO)
+        for gatilho in CRIAR_GATILHOS_VERSAO:
+            cursor.execute(gatilho)
         return True
 
+
+def obter_versao() -> int:
+    """
+    Obtém a versão atual das configurações.
+
+    A versão é incrementada por gatilhos a cada INSERT/UPDATE/DELETE em
+    configuracao, qualquer que seja o processo que escreveu.
+
+    Returns:
+        Versão atual (0 se a tabela de versão ainda não foi inicializada)
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_VERSAO)
+        row = cursor.fetchone()
+        return row["versao"] if row else 0
+
+
+def obter_valores() -> dict[str, str]:
+    """
+    Obtém todas as configurações em uma única consulta.
+
+    Returns:
+        Dicionário {chave: valor}
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_VALORES)
+        return {row["chave"]: row["valor"] for row in cursor.fetchall()}
+
 def obter_por_chave(chave: str) -> Optional[Configuracao]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -196,17 +230,20 @@ def inserir_ou_atualizar(chave: str, valor: str, descricao: str = "") -> bool:
         logger.error(f"Erro ao inserir ou atualizar configuração '{chave}': {e}")
         raise
 
-def inserir_padrao() -> None:
-    configs_padrao = [
-        ("nome_sistema", "Sistema Web", "Nome do sistema"),
-        ("email_contato", "contato@sistema.com", "E-mail de contato"),
-        ("tema_padrao", "claro", "Tema padrão (claro/escuro)"),
-        ("theme", "original", "Tema visual da aplicação (Bootswatch)"),
-    ]
+# Configurações padrão (chave, valor, descrição). Também usadas pelo
+# config_cache como valores iniciais quando a chave não está no banco.
+CONFIGS_PADRAO = [
+    ("nome_sistema", "Sistema Web", "Nome do sistema"),
+    ("email_contato", "contato@sistema.com", "E-mail de contato"),
+    ("tema_padrao", "claro", "Tema padrão (claro/escuro)"),
+    ("theme", "original", "Tema visual da aplicação (Bootswatch)"),
+]
 
+
+def inserir_padrao() -> None:
     with get_connection() as conn:
         cursor = conn.cursor()
-        for chave, valor, descricao in configs_padrao:
+        for chave, valor, descricao in CONFIGS_PADRAO:
             try:
                 cursor.execute(INSERIR, (chave, valor, descricao))
             except sqlite3.IntegrityError:
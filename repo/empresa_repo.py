@@ -1,4 +1,5 @@
-from typing import Optional
+import json
+from typing import Iterable, Optional
 from model.empresa_model import Empresa
 from sql.empresa_sql import *
 from util.db_util import get_connection
@@ -52,6 +53,34 @@ def obter_por_id(id_empresa: int) -> Optional[Empresa]:
             )
         return None
 
+def obter_por_ids(ids: Iterable[int]) -> dict[int, Empresa]:
+    """
+    Obtém várias empresas em uma única consulta.
+
+    Args:
+        ids: IDs das empresas (repetições são ignoradas)
+
+    Returns:
+        Dicionário {id_empresa: Empresa}; IDs inexistentes ficam de fora
+    """
+    ids = list(set(ids))
+    if not ids:
+        return {}
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_POR_IDS, (json.dumps(ids),))
+        return {
+            row["id_empresa"]: Empresa(
+                id_empresa=row["id_empresa"],
+                nome=row["nome"],
+                cnpj=row["cnpj"],
+                descricao=row["descricao"] if "descricao" in row.keys() else "",
+                data_cadastro=row["data_cadastro"] if "data_cadastro" in row.keys() else None,
+                data_atualizacao=row["data_atualizacao"] if "data_atualizacao" in row.keys() else None
+            )
+            for row in cursor.fetchall()
+        }
+
 def obter_todas() -> list[Empresa]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -0,0 +1,116 @@
+"""
+Repositório para operações com a tabela rate_limit.
+"""
+from typing import Optional, Tuple
+
+from sql.rate_limit_sql import (
+    CRIAR_TABELA,
+    CONSUMIR,
+    OBTER,
+    EXCLUIR,
+    EXCLUIR_POR_LIMITER,
+    EXCLUIR_OCIOSOS,
+    CONTAR_POR_LIMITER
+)
+from util.db_util import get_connection
+
+
+def criar_tabela():
+    """Cria a tabela rate_limit se não existir."""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CRIAR_TABELA)
+
+
+def consumir(limiter: str, identificador: str, capacidade: int, taxa: float, agora: float) -> Tuple[bool, float]:
+    """
+    Consome uma ficha do balde do identificador, de forma atômica.
+
+    Args:
+        limiter: Nome do rate limiter
+        identificador: Identificador do cliente (geralmente IP)
+        capacidade: Fichas do balde cheio (max_tentativas)
+        taxa: Fichas reabastecidas por segundo
+        agora: Instante atual (epoch, segundos)
+
+    Returns:
+        Tupla (permitido, fichas restantes)
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CONSUMIR, (limiter, identificador, capacidade, agora, taxa, taxa, taxa))
+        row = cursor.fetchone()
+        return bool(row["permitido"]), row["fichas"]
+
+
+def obter(limiter: str, identificador: str) -> Optional[Tuple[float, float]]:
+    """
+    Obtém o estado gravado do balde de um identificador.
+
+    Args:
+        limiter: Nome do rate limiter
+        identificador: Identificador do cliente
+
+    Returns:
+        Tupla (fichas, atualizado_em) ou None se não houver registro
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER, (limiter, identificador))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return row["fichas"], row["atualizado_em"]
+
+
+def excluir(limiter: str, identificador: Optional[str] = None) -> int:
+    """
+    Remove o estado de um identificador ou de todos os identificadores do limiter.
+
+    Args:
+        limiter: Nome do rate limiter
+        identificador: Identificador a remover (None remove todos do limiter)
+
+    Returns:
+        Número de registros removidos
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        if identificador is None:
+            cursor.execute(EXCLUIR_POR_LIMITER, (limiter,))
+        else:
+            cursor.execute(EXCLUIR, (limiter, identificador))
+        return cursor.rowcount
+
+
+def excluir_ociosos(limiter: str, anteriores_a: float) -> int:
+    """
+    Remove identificadores sem acesso desde um instante.
+
+    Args:
+        limiter: Nome do rate limiter
+        anteriores_a: Instante limite (epoch, segundos)
+
+    Returns:
+        Número de registros removidos
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(EXCLUIR_OCIOSOS, (limiter, anteriores_a))
+        return cursor.rowcount
+
+
+def contar(limiter: str) -> int:
+    """
+    Conta os identificadores registrados de um limiter.
+
+    Args:
+        limiter: Nome do rate limiter
+
+    Returns:
+        Quantidade de identificadores
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(CONTAR_POR_LIMITER, (limiter,))
+        return cursor.fetchone()["quantidade"]
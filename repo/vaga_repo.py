@@ -1,12 +1,29 @@
+import re
+from types import MappingProxyType
 from typing import Optional
 from model.vaga_model import Vaga
+from model.vaga_facetas_model import FacetasVaga, FAIXAS_SALARIAIS
 from sql.vaga_sql import *
+from util.cache_util import CacheTTL
+from util.config import VAGA_FACETAS_CACHE_SEGUNDOS
 from util.db_util import get_connection
 
+# Contagens por faceta: toleram alguns segundos de atraso e são pedidas a cada busca
+_cache_facetas = CacheTTL(ttl_segundos=VAGA_FACETAS_CACHE_SEGUNDOS, max_itens=512)
+
 def criar_tabela() -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(CRIAR_TABELA)
+
+        # Índice de busca textual, sincronizado por triggers
+        fts_existia = cursor.execute(EXISTE_TABELA_FTS).fetchone() is not None
+        cursor.execute(CRIAR_TABELA_FTS)
+        cursor.execute(CRIAR_TRIGGER_FTS_INSERIR)
+        cursor.execute(CRIAR_TRIGGER_FTS_EXCLUIR)
+        cursor.execute(CRIAR_TRIGGER_FTS_ALTERAR)
+        if not fts_existia:
+            cursor.execute(RECONSTRUIR_FTS)
         return True
 
 def inserir(vaga: Vaga) -> Optional[int]:
@@ -28,7 +45,9 @@ def inserir(vaga: Vaga) -> Optional[int]:
             vaga.cidade,
             vaga.uf
         ))
-        return cursor.lastrowid
+        id_vaga = cursor.lastrowid
+    limpar_cache_facetas()
+    return id_vaga
 
 def alterar(vaga: Vaga) -> bool:
     with get_connection() as conn:
@@ -47,19 +66,25 @@ def alterar(vaga: Vaga) -> bool:
             vaga.uf,
             vaga.id_vaga
         ))
-        return cursor.rowcount > 0
+        alterada = cursor.rowcount > 0
+    limpar_cache_facetas()
+    return alterada
 
 def alterar_status(id_vaga: int, status: str) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(ALTERAR_STATUS, (status, id_vaga))
-        return cursor.rowcount > 0
+        alterada = cursor.rowcount > 0
+    limpar_cache_facetas()
+    return alterada
 
 def excluir(id_vaga: int) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(EXCLUIR, (id_vaga,))
-        return cursor.rowcount > 0
+        excluida = cursor.rowcount > 0
+    limpar_cache_facetas()
+    return excluida
 
 def obter_por_id(id_vaga: int) -> Optional[Vaga]:
     with get_connection() as conn:
@@ -210,6 +235,164 @@ def buscar(
             for row in rows
         ]
 
+def _montar_consulta_fts(termo: str) -> Optional[str]:
+    """
+    Converte o texto digitado em consulta FTS5: cada palavra vira um
+    prefixo entre aspas ("dev"* encontra "desenvolvedor"), todas obrigatórias.
+    Operadores e pontuação são descartados, então a entrada nunca gera erro de sintaxe.
+    """
+    palavras = re.findall(r"\w+", termo or "")
+    if not palavras:
+        return None
+    return " ".join(f'"{palavra}"*' for palavra in palavras)
+
+def buscar_texto(
+    termo: str,
+    id_area: Optional[int] = None,
+    cidade: Optional[str] = None,
+    uf: Optional[str] = None,
+    modalidade: Optional[str] = None,
+    salario_min: Optional[float] = None,
+    limit: int = 50,
+    offset: int = 0
+) -> list[Vaga]:
+    """
+    Busca vagas abertas por texto em titulo, descricao e requisitos.
+
+    Usa o índice FTS5 (vaga_fts), sem diferenciar acentos e com casamento
+    por prefixo. Resultados ordenados por relevância (bm25). Aceita os
+    mesmos filtros de buscar(); sem palavras no termo, equivale a buscar().
+
+    Args:
+        termo: Texto digitado pelo usuário
+        id_area: Filtrar por área
+        cidade: Filtrar por cidade (contém)
+        uf: Filtrar por UF
+        modalidade: Filtrar por modalidade
+        salario_min: Salário mínimo
+        limit: Número máximo de resultados
+        offset: Resultados a pular (paginação)
+
+    Returns:
+        Lista de vagas, da mais relevante para a menos relevante
+    """
+    consulta = _montar_consulta_fts(termo)
+    if consulta is None:
+        return buscar(id_area, cidade, uf, modalidade, salario_min, limit, offset)
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(BUSCAR_TEXTO, (
+            consulta,
+            id_area, id_area,
+            cidade, cidade,
+            uf, uf,
+            modalidade, modalidade,
+            salario_min, salario_min,
+            limit, offset
+        ))
+        rows = cursor.fetchall()
+        return [
+            Vaga(
+                id_vaga=row["id_vaga"],
+                id_area=row["id_area"],
+                id_empresa=row["id_empresa"],
+                id_recrutador=row["id_recrutador"],
+                status_vaga=row["status_vaga"] if "status_vaga" in row.keys() else "aberta",
+                descricao=row["descricao"],
+                numero_vagas=row["numero_vagas"] if "numero_vagas" in row.keys() else 1,
+                salario=row["salario"] if "salario" in row.keys() else 0.0,
+                data_cadastro=row["data_cadastro"] if "data_cadastro" in row.keys() else None,
+                titulo=row["titulo"],
+                requisitos=row["requisitos"] if "requisitos" in row.keys() else None,
+                beneficios=row["beneficios"] if "beneficios" in row.keys() else None,
+                carga_horaria=row["carga_horaria"] if "carga_horaria" in row.keys() else None,
+                modalidade=row["modalidade"] if "modalidade" in row.keys() else None,
+                cidade=row["cidade"] if "cidade" in row.keys() else None,
+                uf=row["uf"] if "uf" in row.keys() else None
+            )
+            for row in rows
+        ]
+
+def obter_facetas(
+    termo: Optional[str] = None,
+    id_area: Optional[int] = None,
+    cidade: Optional[str] = None,
+    uf: Optional[str] = None,
+    modalidade: Optional[str] = None,
+    salario_min: Optional[float] = None
+) -> FacetasVaga:
+    """
+    Conta vagas abertas por área, UF, modalidade e faixa salarial.
+
+    Uma única consulta agrupa as vagas que atendem aos filtros que não são
+    facetas (termo, cidade, salario_min) por combinação de valores de faceta;
+    as contagens de cada faceta são somadas a partir dessas linhas, aplicando
+    os filtros das demais facetas. O resultado fica em cache por
+    VAGA_FACETAS_CACHE_SEGUNDOS e é descartado quando uma vaga é alterada.
+
+    Args:
+        termo: Texto da busca (mesma regra de buscar_texto)
+        id_area: Área selecionada
+        cidade: Cidade (contém)
+        uf: UF selecionada
+        modalidade: Modalidade selecionada
+        salario_min: Salário mínimo
+
+    Returns:
+        FacetasVaga com o total e as contagens por valor de cada faceta
+    """
+    consulta = _montar_consulta_fts(termo) if termo else None
+    chave = (consulta, id_area, cidade, uf, modalidade, salario_min)
+    facetas = _cache_facetas.obter(chave)
+    if facetas is not None:
+        return facetas
+
+    parametros = [cidade, cidade, salario_min, salario_min]
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        if consulta is None:
+            cursor.execute(CONTAR_FACETAS, parametros)
+        else:
+            cursor.execute(CONTAR_FACETAS_TEXTO, parametros + [consulta])
+        rows = cursor.fetchall()
+
+    total = 0
+    por_area, nomes_area, por_uf, por_modalidade = {}, {}, {}, {}
+    por_faixa_salarial = {faixa: 0 for faixa in FAIXAS_SALARIAIS}
+    for row in rows:
+        quantidade = row["quantidade"]
+        na_area = id_area is None or row["id_area"] == id_area
+        na_uf = uf is None or row["uf"] == uf
+        na_modalidade = modalidade is None or row["modalidade"] == modalidade
+
+        if na_uf and na_modalidade:
+            por_area[row["id_area"]] = por_area.get(row["id_area"], 0) + quantidade
+            nomes_area[row["id_area"]] = row["area_nome"]
+        if na_area and na_modalidade and row["uf"]:
+            por_uf[row["uf"]] = por_uf.get(row["uf"], 0) + quantidade
+        if na_area and na_uf and row["modalidade"]:
+            por_modalidade[row["modalidade"]] = por_modalidade.get(row["modalidade"], 0) + quantidade
+        if na_area and na_uf and na_modalidade:
+            por_faixa_salarial[row["faixa_salarial"]] += quantidade
+            total += quantidade
+
+    # Instância compartilhada pelo cache: só mapeamentos somente leitura
+    facetas = FacetasVaga(
+        total=total,
+        por_area=MappingProxyType(por_area),
+        nomes_area=MappingProxyType(nomes_area),
+        por_uf=MappingProxyType(por_uf),
+        por_modalidade=MappingProxyType(por_modalidade),
+        por_faixa_salarial=MappingProxyType(por_faixa_salarial),
+    )
+    _cache_facetas.definir(chave, facetas)
+    return facetas
+
+def limpar_cache_facetas() -> None:
+    """Descarta as contagens por faceta em cache (chamado após alterar vagas)."""
+    _cache_facetas.limpar()
+
 def obter_quantidade() -> int:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -13,7 +13,8 @@ from util.template_util import criar_templates
 from util.flash_messages import informar_sucesso, informar_erro, informar_aviso
 from util.logger_config import logger
 from util.perfis import Perfil
-from util import backup_util
+from util import backup_util, db_util
+from util.db_async import executar_db
 from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
 
 
@@ -95,6 +96,40 @@ async def post_criar(request: Request, usuario_logado: Optional[dict] = None):
     )
 
 
+@router.post("/compactar")
+@requer_autenticacao([Perfil.ADMIN.value])
+async def post_compactar(request: Request, usuario_logado: Optional[dict] = None):
+    """
+    Compacta o banco de dados (VACUUM completo com auto_vacuum incremental)
+
+    Operação única e demorada, que bloqueia o banco enquanto roda; depois
+    dela o job de retenção do chat devolve o espaço de forma incremental.
+    """
+    assert usuario_logado is not None
+
+    # Rate limiting
+    ip = obter_identificador_cliente(request)
+    if not admin_backups_limiter.verificar(ip):
+        informar_erro(request, "Muitas operações de backup. Aguarde alguns minutos e tente novamente.")
+        return RedirectResponse("/admin/backups/listar", status_code=status.HTTP_303_SEE_OTHER)
+
+    try:
+        resultado = await executar_db(db_util.converter_para_vacuum_incremental)
+        logger.info(f"Banco compactado por admin {usuario_logado['id']}: {resultado}")
+        informar_sucesso(
+            request,
+            f"Banco compactado: {resultado['paginas_antes']} -> {resultado['paginas_depois']} páginas."
+        )
+    except Exception as e:
+        logger.error(f"Erro ao compactar banco por admin {usuario_logado['id']}: {e}")
+        informar_erro(request, "Erro ao compactar o banco de dados.")
+
+    return RedirectResponse(
+        "/admin/backups/listar",
+        status_code=status.HTTP_303_SEE_OTHER
+    )
+
+
 @router.post("/restaurar/{nome_arquivo}")
 @requer_autenticacao([Perfil.ADMIN.value])
 async def post_restaurar(
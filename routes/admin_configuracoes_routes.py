@@ -7,6 +7,7 @@ from pydantic import ValidationError
 
 from repo import configuracao_repo
 from util.config_cache import config
+from util.cache_paginas import cache_paginas
 from util.auth_decorator import requer_autenticacao
 from util.template_util import criar_templates
 from util.flash_messages import informar_sucesso, informar_erro, informar_aviso
@@ -249,8 +250,9 @@ async def post_aplicar_tema(
         )
 
         if sucesso:
-            # Limpar cache de configurações
+            # Limpar cache de configurações e páginas públicas em cache
             config.limpar()
+            cache_paginas.limpar()
 
             logger.info(
                 f"Tema alterado para '{tema}' por admin {usuario_logado['id']} "
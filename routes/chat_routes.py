@@ -9,9 +9,12 @@ from pydantic import ValidationError
 from typing import Optional
 
 from dtos.chat_dto import CriarSalaDTO, EnviarMensagemDTO
+from model.chat_mensagem_model import ChatMensagem
 from repo import chat_sala_repo, chat_participante_repo, chat_mensagem_repo, usuario_repo
 from util.auth_decorator import requer_autenticacao
 from util.chat_manager import chat_manager
+from util.config import CHAT_SSE_LOTE_MAX, CHAT_SSE_HEARTBEAT_SEGUNDOS, CHAT_SSE_REPLAY_MAX, CHAT_SSE_RETRY_MS
+from util.db_async import repo_async
 from util.foto_util import obter_caminho_foto_usuario
 from util.datetime_util import agora
 from util.logger_config import logger
@@ -19,8 +22,14 @@ from util.perfis import Perfil
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
-# Rate limiters
-from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
+# Fachadas assíncronas: consultas rodam fora do event loop (não travam o SSE)
+chat_sala_db = repo_async(chat_sala_repo)
+chat_participante_db = repo_async(chat_participante_repo)
+chat_mensagem_db = repo_async(chat_mensagem_repo)
+usuario_db = repo_async(usuario_repo)
+
+# Rate limiters (aplicados pelo RateLimitMiddleware, ver REGRAS_RATE_LIMIT em main.py)
+from util.rate_limiter import DynamicRateLimiter
 
 chat_mensagem_limiter = DynamicRateLimiter(
     chave_max="rate_limit_chat_message_max",
@@ -52,34 +61,106 @@ chat_listagem_limiter = DynamicRateLimiter(
 )
 
 
+# Máximo de usuários por consulta de presença
+PRESENCA_MAX_IDS = 100
+
+
+def _evento_nova_mensagem(mensagem: ChatMensagem) -> dict:
+    """Monta o evento SSE de uma mensagem (envio em tempo real e retomada)."""
+    return {
+        "tipo": "nova_mensagem",
+        "sala_id": mensagem.sala_id,
+        "mensagem": {
+            "id": mensagem.id,
+            "sala_id": mensagem.sala_id,
+            "usuario_id": mensagem.usuario_id,
+            "mensagem": mensagem.mensagem,
+            "data_envio": mensagem.data_envio.isoformat() if mensagem.data_envio else None,
+            "lida_em": mensagem.lida_em.isoformat() if mensagem.lida_em else None
+        }
+    }
+
+
+def _formatar_sse(evento: dict) -> str:
+    """
+    Formata um evento no protocolo SSE.
+
+    Eventos de mensagem levam `id:` (ID da chat_mensagem): o navegador o
+    devolve no cabeçalho Last-Event-ID ao reconectar. Os demais não alteram
+    o último ID conhecido pelo cliente.
+    """
+    if evento.get("tipo") == "nova_mensagem":
+        return f"id: {evento['mensagem']['id']}\ndata: {json.dumps(evento)}\n\n"
+    return f"data: {json.dumps(evento)}\n\n"
+
+
+def _obter_ultimo_evento_id(request: Request) -> Optional[int]:
+    """Lê o último ID recebido (cabeçalho Last-Event-ID ou parâmetro last_event_id)."""
+    valor = request.headers.get("last-event-id") or request.query_params.get("last_event_id")
+    try:
+        return int(valor) if valor else None
+    except ValueError:
+        return None
+
+
 @router.get("/stream")
 @requer_autenticacao()
 async def stream_mensagens(request: Request, usuario_logado: Optional[dict] = None):
     """
     Endpoint SSE para receber mensagens em tempo real.
-    Cada usuário mantém UMA conexão que recebe mensagens de TODAS as suas salas.
+    Cada conexão recebe mensagens de TODAS as salas do usuário; várias abas
+    abertas mantêm conexões independentes.
+
+    Ao reconectar com Last-Event-ID, as mensagens enviadas no intervalo são
+    reenviadas antes dos eventos novos. Sem eventos por
+    CHAT_SSE_HEARTBEAT_SEGUNDOS, um comentário mantém a conexão viva e
+    conexões já fechadas pelo cliente são liberadas.
     """
     usuario_id = usuario_logado["id"]
+    ultimo_evento_id = _obter_ultimo_evento_id(request)
 
     async def event_generator():
-        # Conectar usuário ao ChatManager
+        # Conectar antes de consultar o histórico: nada enviado no meio se perde
         queue = await chat_manager.connect(usuario_id)
         try:
-            while True:
-                # Aguardar mensagem na fila
-                evento = await queue.get()
+            yield f"retry: {CHAT_SSE_RETRY_MS}\n\n"
+
+            ultimo_reenviado = 0
+            if ultimo_evento_id is not None:
+                perdidas = await chat_mensagem_db.listar_por_usuario_depois_de(
+                    usuario_id, ultimo_evento_id, CHAT_SSE_REPLAY_MAX
+                )
+                if perdidas:
+                    ultimo_reenviado = perdidas[-1].id
+                    yield "".join(_formatar_sse(_evento_nova_mensagem(m)) for m in perdidas)
+                if len(perdidas) >= CHAT_SSE_REPLAY_MAX:
+                    # Lacuna maior que o limite: o cliente recarrega as conversas
+                    yield _formatar_sse({"tipo": "resincronizar"})
 
-                # Formatar como SSE
-                sse_data = f"data: {json.dumps(evento)}\n\n"
-                yield sse_data
-
-                # Pequeno delay para não sobrecarregar
-                await asyncio.sleep(0.1)
+            while True:
+                try:
+                    # Aguardar eventos e enviar todos os pendentes em uma única escrita
+                    eventos = await asyncio.wait_for(
+                        queue.obter_lote(CHAT_SSE_LOTE_MAX), timeout=CHAT_SSE_HEARTBEAT_SEGUNDOS
+                    )
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": heartbeat\n\n"
+                    continue
+
+                # Mensagens já reenviadas na retomada podem estar também na fila
+                eventos = [
+                    evento for evento in eventos
+                    if evento.get("tipo") != "nova_mensagem" or evento["mensagem"]["id"] > ultimo_reenviado
+                ]
+                if eventos:
+                    yield "".join(_formatar_sse(evento) for evento in eventos)
         except asyncio.CancelledError:
             logger.info(f"[SSE] Conexão cancelada para usuário {usuario_id}")
         finally:
-            # Desconectar ao fechar stream
-            await chat_manager.disconnect(usuario_id)
+            # Desconectar apenas esta conexão (outras abas seguem ativas)
+            await chat_manager.disconnect(usuario_id, queue)
 
     return StreamingResponse(
         event_generator(),
@@ -102,15 +183,6 @@ async def criar_ou_obter_sala(
     """
     Cria ou obtém uma sala de chat entre o usuário logado e outro usuário.
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not chat_sala_limiter.verificar(ip):
-        logger.warning(f"Rate limit excedido para criação de sala de chat - IP: {ip}")
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Muitas tentativas de criação de salas. Aguarde alguns minutos."
-        )
-
     try:
         # Validar DTO
         dto = CriarSalaDTO(outro_usuario_id=outro_usuario_id)
@@ -123,7 +195,7 @@ async def criar_ou_obter_sala(
             )
 
         # Verificar se outro usuário existe
-        outro_usuario = usuario_repo.obter_por_id(dto.outro_usuario_id)
+        outro_usuario = await usuario_db.obter_por_id(dto.outro_usuario_id)
         if not outro_usuario:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -131,16 +203,16 @@ async def criar_ou_obter_sala(
             )
 
         # Criar ou obter sala
-        sala = chat_sala_repo.criar_ou_obter_sala(usuario_logado["id"], dto.outro_usuario_id)
+        sala = await chat_sala_db.criar_ou_obter_sala(usuario_logado["id"], dto.outro_usuario_id)
 
         # Adicionar participantes se sala foi recém-criada
-        participante1 = chat_participante_repo.obter_por_sala_e_usuario(sala.id, usuario_logado["id"])
+        participante1 = await chat_participante_db.obter_por_sala_e_usuario(sala.id, usuario_logado["id"])
         if not participante1:
-            chat_participante_repo.adicionar_participante(sala.id, usuario_logado["id"])
+            await chat_participante_db.adicionar_participante(sala.id, usuario_logado["id"])
 
-        participante2 = chat_participante_repo.obter_por_sala_e_usuario(sala.id, dto.outro_usuario_id)
+        participante2 = await chat_participante_db.obter_por_sala_e_usuario(sala.id, dto.outro_usuario_id)
         if not participante2:
-            chat_participante_repo.adicionar_participante(sala.id, dto.outro_usuario_id)
+            await chat_participante_db.adicionar_participante(sala.id, dto.outro_usuario_id)
 
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -165,74 +237,32 @@ async def listar_conversas(
     """
     Lista conversas do usuário (salas com última mensagem e contador de não lidas).
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not chat_listagem_limiter.verificar(ip):
-        logger.warning(f"Rate limit excedido para listagem de conversas - IP: {ip}")
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Muitas requisições de listagem. Aguarde alguns minutos."
-        )
-
-    usuario_id = usuario_logado["id"]
-
-    # Obter todas as participações do usuário
-    participacoes = chat_participante_repo.listar_por_usuario(usuario_id)
-
-    conversas = []
-    for participacao in participacoes:
-        sala = chat_sala_repo.obter_por_id(participacao.sala_id)
-        if not sala:
-            continue
+    # Uma consulta: outro participante, última mensagem e não lidas, já paginado
+    conversas = await chat_sala_db.listar_conversas_por_usuario(usuario_logado["id"], limit, offset)
 
-        # Obter o outro participante da sala
-        participantes = chat_participante_repo.listar_por_sala(sala.id)
-        outro_participante = next(
-            (p for p in participantes if p.usuario_id != usuario_id),
-            None
-        )
-
-        if not outro_participante:
-            continue
-
-        # Obter dados do outro usuário
-        outro_usuario = usuario_repo.obter_por_id(outro_participante.usuario_id)
-        if not outro_usuario:
-            continue
-
-        # Obter última mensagem
-        ultima_mensagem = chat_mensagem_repo.obter_ultima_mensagem_sala(sala.id)
-
-        # Contar não lidas
-        nao_lidas = chat_participante_repo.contar_mensagens_nao_lidas(sala.id, usuario_id)
-
-        conversa = {
-            "sala_id": sala.id,
+    conversas_json = [
+        {
+            "sala_id": conversa.sala_id,
             "outro_usuario": {
-                "id": outro_usuario.id,
-                "nome": outro_usuario.nome,
-                "email": outro_usuario.email,
-                "foto_url": obter_caminho_foto_usuario(outro_usuario.id)
+                "id": conversa.outro_usuario_id,
+                "nome": conversa.outro_usuario_nome,
+                "email": conversa.outro_usuario_email,
+                "foto_url": obter_caminho_foto_usuario(conversa.outro_usuario_id)
             },
             "ultima_mensagem": {
-                "mensagem": ultima_mensagem.mensagem,
-                "data_envio": ultima_mensagem.data_envio.isoformat() if ultima_mensagem.data_envio else None,
-                "usuario_id": ultima_mensagem.usuario_id
-            } if ultima_mensagem else None,
-            "nao_lidas": nao_lidas,
-            "ultima_atividade": sala.ultima_atividade.isoformat() if sala.ultima_atividade else ""
+                "mensagem": conversa.ultima_mensagem,
+                "data_envio": conversa.ultima_mensagem_data_envio.isoformat() if conversa.ultima_mensagem_data_envio else None,
+                "usuario_id": conversa.ultima_mensagem_usuario_id
+            } if conversa.ultima_mensagem is not None else None,
+            "nao_lidas": conversa.nao_lidas,
+            "ultima_atividade": conversa.ultima_atividade.isoformat() if conversa.ultima_atividade else ""
         }
-        conversas.append(conversa)
-
-    # Ordenar por última atividade (mais recente primeiro)
-    conversas.sort(key=lambda c: c["ultima_atividade"], reverse=True)
-
-    # Aplicar paginação
-    conversas_paginadas = conversas[offset:offset + limit]
+        for conversa in conversas
+    ]
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
-        content=conversas_paginadas
+        content=conversas_json
     )
 
 
@@ -242,33 +272,46 @@ async def listar_mensagens(
     request: Request,
     sala_id: str,
     limit: int = 50,
-    offset: int = 0,
+    before_id: Optional[int] = None,
+    after_id: Optional[int] = None,
     usuario_logado: Optional[dict] = None
 ):
     """
-    Lista mensagens de uma sala específica com paginação.
+    Lista mensagens de uma sala específica com paginação por cursor.
+
+    Sem cursor retorna as mensagens mais recentes. Para rolar o histórico,
+    repassar `proximo_cursor` como `before_id`; para buscar mensagens novas
+    a partir da última conhecida, usar `after_id` (e o cursor retornado).
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not chat_listagem_limiter.verificar(ip):
-        logger.warning(f"Rate limit excedido para listagem de mensagens - IP: {ip}")
+    if before_id is not None and after_id is not None:
         raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Muitas requisições de listagem. Aguarde alguns minutos."
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Informe before_id ou after_id, não ambos."
         )
+    limit = max(1, min(limit, 100))
 
     usuario_id = usuario_logado["id"]
 
     # Verificar se usuário participa da sala
-    participante = chat_participante_repo.obter_por_sala_e_usuario(sala_id, usuario_id)
+    participante = await chat_participante_db.obter_por_sala_e_usuario(sala_id, usuario_id)
     if not participante:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Você não tem acesso a esta sala."
         )
 
-    # Obter mensagens
-    mensagens = chat_mensagem_repo.listar_por_sala(sala_id, limit, offset)
+    # Buscar uma mensagem a mais para saber se há outra página
+    mensagens = await chat_mensagem_db.listar_por_sala(
+        sala_id, limit + 1, before_id=before_id, after_id=after_id
+    )
+    tem_mais = len(mensagens) > limit
+    if tem_mais:
+        # A mensagem extra fica do lado oposto ao cursor
+        mensagens = mensagens[:limit] if after_id is not None else mensagens[1:]
+
+    proximo_cursor = None
+    if tem_mais and mensagens:
+        proximo_cursor = mensagens[-1].id if after_id is not None else mensagens[0].id
 
     mensagens_json = [
         {
@@ -284,7 +327,10 @@ async def listar_mensagens(
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
-        content=mensagens_json
+        content={
+            "mensagens": mensagens_json,
+            "proximo_cursor": proximo_cursor
+        }
     )
 
 
@@ -299,15 +345,6 @@ async def enviar_mensagem(
     """
     Envia uma mensagem em uma sala.
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not chat_mensagem_limiter.verificar(ip):
-        logger.warning(f"Rate limit excedido para envio de mensagem no chat - IP: {ip}")
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Muitas mensagens enviadas. Aguarde alguns minutos."
-        )
-
     try:
         # Validar DTO
         dto = EnviarMensagemDTO(sala_id=sala_id, mensagem=mensagem)
@@ -315,7 +352,7 @@ async def enviar_mensagem(
         usuario_id = usuario_logado["id"]
 
         # Verificar se usuário participa da sala
-        participante = chat_participante_repo.obter_por_sala_e_usuario(dto.sala_id, usuario_id)
+        participante = await chat_participante_db.obter_por_sala_e_usuario(dto.sala_id, usuario_id)
         if not participante:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -323,7 +360,7 @@ async def enviar_mensagem(
             )
 
         # Verificar se sala existe
-        sala = chat_sala_repo.obter_por_id(dto.sala_id)
+        sala = await chat_sala_db.obter_por_id(dto.sala_id)
         if not sala:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -331,24 +368,13 @@ async def enviar_mensagem(
             )
 
         # Inserir mensagem
-        nova_mensagem = chat_mensagem_repo.inserir(dto.sala_id, usuario_id, dto.mensagem)
+        nova_mensagem = await chat_mensagem_db.inserir(dto.sala_id, usuario_id, dto.mensagem)
 
         # Atualizar última atividade da sala
-        chat_sala_repo.atualizar_ultima_atividade(dto.sala_id)
+        await chat_sala_db.atualizar_ultima_atividade(dto.sala_id)
 
         # Broadcast via SSE para ambos participantes
-        mensagem_sse = {
-            "tipo": "nova_mensagem",
-            "sala_id": nova_mensagem.sala_id,
-            "mensagem": {
-                "id": nova_mensagem.id,
-                "sala_id": nova_mensagem.sala_id,
-                "usuario_id": nova_mensagem.usuario_id,
-                "mensagem": nova_mensagem.mensagem,
-                "data_envio": nova_mensagem.data_envio.isoformat() if nova_mensagem.data_envio else None,
-                "lida_em": None
-            }
-        }
+        mensagem_sse = _evento_nova_mensagem(nova_mensagem)
         await chat_manager.broadcast_para_sala(dto.sala_id, mensagem_sse)
 
         return JSONResponse(
@@ -383,7 +409,7 @@ async def marcar_como_lidas(
     usuario_id = usuario_logado["id"]
 
     # Verificar se usuário participa da sala
-    participante = chat_participante_repo.obter_por_sala_e_usuario(sala_id, usuario_id)
+    participante = await chat_participante_db.obter_por_sala_e_usuario(sala_id, usuario_id)
     if not participante:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -391,10 +417,10 @@ async def marcar_como_lidas(
         )
 
     # Marcar mensagens como lidas
-    chat_mensagem_repo.marcar_como_lidas(sala_id, usuario_id)
+    await chat_mensagem_db.marcar_como_lidas(sala_id, usuario_id)
 
     # Atualizar última leitura do participante
-    chat_participante_repo.atualizar_ultima_leitura(sala_id, usuario_id)
+    await chat_participante_db.atualizar_ultima_leitura(sala_id, usuario_id)
 
     # Notificar via SSE para atualizar contador
     await chat_manager.broadcast_para_sala(sala_id, {
@@ -408,6 +434,86 @@ async def marcar_como_lidas(
     )
 
 
+@router.post("/digitando/{sala_id}")
+@requer_autenticacao()
+async def notificar_digitando(
+    request: Request,
+    sala_id: str,
+    usuario_logado: Optional[dict] = None
+):
+    """
+    Avisa o outro participante da sala que o usuário está digitando.
+
+    Chamadas repetidas dentro de CHAT_DIGITANDO_INTERVALO_SEGUNDOS são
+    aceitas, mas não geram novo evento nem consultam o banco. O limite só é
+    registrado depois de confirmar que o usuário participa da sala, então
+    um aviso recente implica participação já verificada.
+    """
+    usuario_id = usuario_logado["id"]
+
+    if chat_manager.digitando_recente(usuario_id, sala_id):
+        return JSONResponse(status_code=status.HTTP_200_OK, content={"publicado": False})
+
+    # Verificar se usuário participa da sala
+    participante = await chat_participante_db.obter_por_sala_e_usuario(sala_id, usuario_id)
+    if not participante:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Você não tem acesso a esta sala."
+        )
+
+    # Outra requisição concorrente pode ter publicado enquanto o banco era consultado
+    if not chat_manager.registrar_digitando(usuario_id, sala_id):
+        return JSONResponse(status_code=status.HTTP_200_OK, content={"publicado": False})
+
+    await chat_manager.publicar_digitando(usuario_id, sala_id)
+
+    return JSONResponse(status_code=status.HTTP_200_OK, content={"publicado": True})
+
+
+@router.get("/presenca")
+@requer_autenticacao()
+async def consultar_presenca(
+    request: Request,
+    ids: str = "",
+    usuario_logado: Optional[dict] = None
+):
+    """
+    Informa quais dos usuários estão online (uma chamada para toda a lista de conversas).
+
+    Só responde pelos contatos do usuário (quem tem sala com ele); os demais
+    IDs são ignorados, para que a rota não revele a presença de qualquer usuário.
+    Com a presença desativada (barramento entre workers), responde vazio.
+
+    Query params:
+        ids: IDs separados por vírgula (máximo PRESENCA_MAX_IDS)
+    """
+    try:
+        usuario_ids = [int(valor) for valor in ids.split(",") if valor.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids deve conter números separados por vírgula."
+        )
+
+    if len(usuario_ids) > PRESENCA_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Informe no máximo {PRESENCA_MAX_IDS} usuários."
+        )
+
+    if not chat_manager.presenca_ativa:
+        return JSONResponse(status_code=status.HTTP_200_OK, content={"presenca": {}})
+
+    contatos = set(await chat_participante_db.listar_contatos(usuario_logado["id"]))
+    presenca = chat_manager.obter_presenca([usuario_id for usuario_id in usuario_ids if usuario_id in contatos])
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={"presenca": {str(usuario_id): online for usuario_id, online in presenca.items()}}
+    )
+
+
 @router.get("/usuarios/buscar")
 @requer_autenticacao()
 async def buscar_usuarios(
@@ -420,15 +526,6 @@ async def buscar_usuarios(
     Exclui o próprio usuário e administradores dos resultados.
     Administradores só podem ser contactados via sistema de chamados.
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not busca_usuarios_limiter.verificar(ip):
-        logger.warning(f"Rate limit excedido para busca de usuários - IP: {ip}")
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Muitas buscas. Aguarde alguns minutos."
-        )
-
     if len(q) < 2:
         return JSONResponse(
             status_code=status.HTTP_200_OK,
@@ -436,7 +533,7 @@ async def buscar_usuarios(
         )
 
     # Buscar usuários
-    usuarios = usuario_repo.buscar_por_termo(q, limit=10)
+    usuarios = await usuario_db.buscar_por_termo(q, limit=10)
 
     # Excluir o próprio usuário e administradores dos resultados
     usuarios_filtrados = [
@@ -469,18 +566,8 @@ async def contar_nao_lidas_total(
     """
     Conta o total de mensagens não lidas em todas as salas do usuário.
     """
-    usuario_id = usuario_logado["id"]
-
-    # Obter todas as participações do usuário
-    participacoes = chat_participante_repo.listar_por_usuario(usuario_id)
-
-    total_nao_lidas = 0
-    for participacao in participacoes:
-        nao_lidas = chat_participante_repo.contar_mensagens_nao_lidas(
-            participacao.sala_id,
-            usuario_id
-        )
-        total_nao_lidas += nao_lidas
+    # Soma dos contadores materializados em chat_participante (uma consulta indexada)
+    total_nao_lidas = await chat_participante_db.contar_nao_lidas_total(usuario_logado["id"])
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
@@ -1,14 +1,13 @@
-from fastapi import APIRouter, Request, status
+from fastapi import APIRouter, Request
 
 from util.template_util import criar_templates
-from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
-from util.flash_messages import informar_erro
-from util.logger_config import logger
+from util.rate_limiter import DynamicRateLimiter
 
 router = APIRouter(prefix="/exemplos")
 templates_public = criar_templates("templates")
 
-# Rate limiter para páginas de exemplos (proteção contra DDoS)
+# Rate limiter para páginas de exemplos (proteção contra DDoS).
+# Aplicado pelo RateLimitMiddleware, antes do roteamento (ver REGRAS_RATE_LIMIT em main.py)
 examples_limiter = DynamicRateLimiter(
     chave_max="rate_limit_examples_max",
     chave_minutos="rate_limit_examples_minutos",
@@ -23,17 +22,6 @@ async def index(request: Request):
     """
     Página inicial de exemplos
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
     return templates_public.TemplateResponse(
         "exemplos/index.html",
         {"request": request}
@@ -45,17 +33,6 @@ async def form_fields_demo(request: Request):
     """
     Página de demonstração da macro de campos de formulário
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
     return templates_public.TemplateResponse(
         "exemplos/demo_campos_formulario.html",
         {"request": request}
@@ -67,17 +44,6 @@ async def cards_grid_demo(request: Request):
     """
     Página de demonstração de grid de cards responsivo
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
     return templates_public.TemplateResponse(
         "exemplos/grade_cartoes.html",
         {"request": request}
@@ -89,17 +55,6 @@ async def bootswatch_demo(request: Request):
     """
     Página de demonstração de temas Bootswatch
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
     return templates_public.TemplateResponse(
         "exemplos/bootswatch.html",
         {"request": request}
@@ -111,17 +66,6 @@ async def product_detail_demo(request: Request):
     """
     Página de demonstração de detalhes de produto e-commerce
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
     return templates_public.TemplateResponse(
         "exemplos/detalhes_produto.html",
         {"request": request}
@@ -133,17 +77,6 @@ async def service_detail_demo(request: Request):
     """
     Página de demonstração de detalhes de serviço profissional
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
     return templates_public.TemplateResponse(
         "exemplos/detalhes_servico.html",
         {"request": request}
@@ -155,17 +88,6 @@ async def profile_detail_demo(request: Request):
     """
     Página de demonstração de perfil de pessoa
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
     return templates_public.TemplateResponse(
         "exemplos/detalhes_perfil.html",
         {"request": request}
@@ -177,17 +99,6 @@ async def property_detail_demo(request: Request):
     """
     Página de demonstração de detalhes de imóvel
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
     return templates_public.TemplateResponse(
         "exemplos/detalhes_imovel.html",
         {"request": request}
@@ -199,17 +110,6 @@ async def table_list_demo(request: Request):
     """
     Página de demonstração de tabela com listagem de dados
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not examples_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página de exemplos - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
     # Dados mockados para demonstração
     produtos = [
         {"id": 1, "nome": "Notebook Dell Inspiron 15", "categoria": "Informática", "preco": 3499.90, "estoque": 75, "ativo": True},
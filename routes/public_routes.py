@@ -1,16 +1,16 @@
-from fastapi import APIRouter, Request, status
+from fastapi import APIRouter, Request
 from fastapi.responses import RedirectResponse
 
 from util.template_util import criar_templates
+from util.cache_paginas import responder_pagina_publica
 from util.auth_decorator import obter_usuario_logado
-from util.rate_limiter import DynamicRateLimiter, obter_identificador_cliente
-from util.flash_messages import informar_erro
-from util.logger_config import logger
+from util.rate_limiter import DynamicRateLimiter
 
 router = APIRouter()
 templates_public = criar_templates("templates")
 
-# Rate limiter para páginas públicas (proteção contra DDoS)
+# Rate limiter para páginas públicas (proteção contra DDoS).
+# Aplicado pelo RateLimitMiddleware, antes do roteamento (ver REGRAS_RATE_LIMIT em main.py)
 public_limiter = DynamicRateLimiter(
     chave_max="rate_limit_public_max",
     chave_minutos="rate_limit_public_minutos",
@@ -24,22 +24,9 @@ public_limiter = DynamicRateLimiter(
 async def home(request: Request):
     """
     Rota inicial - Landing Page pública (sempre)
+    Visitantes anônimos recebem a página do cache (ver util/cache_paginas.py)
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not public_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página pública - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
-    return templates_public.TemplateResponse(
-        "index.html",
-        {"request": request}
-    )
+    return responder_pagina_publica(request, templates_public, "index.html")
 
 
 @router.get("/index")
@@ -48,21 +35,7 @@ async def index(request: Request):
     Página pública inicial (Landing Page)
     Sempre exibe a página pública, independentemente de autenticação
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not public_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página pública - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
-    return templates_public.TemplateResponse(
-        "index.html",
-        {"request": request}
-    )
+    return responder_pagina_publica(request, templates_public, "index.html")
 
 
 @router.get("/sobre")
@@ -70,18 +43,4 @@ async def sobre(request: Request):
     """
     Página "Sobre" com informações do projeto acadêmico
     """
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not public_limiter.verificar(ip):
-        informar_erro(request, "Muitas requisições. Aguarde alguns minutos.")
-        logger.warning(f"Rate limit excedido para página pública - IP: {ip}")
-        return templates_public.TemplateResponse(
-            "errors/429.html",
-            {"request": request},
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS
-        )
-
-    return templates_public.TemplateResponse(
-        "sobre.html",
-        {"request": request}
-    )
+    return responder_pagina_publica(request, templates_public, "sobre.html")
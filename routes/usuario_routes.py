@@ -34,6 +34,7 @@ alterar_senha_limiter = DynamicRateLimiter(
     padrao_minutos=15,
     nome="alterar_senha",
 )
+# Formulários GET: aplicado pelo RateLimitMiddleware (ver REGRAS_RATE_LIMIT em main.py)
 form_get_limiter = DynamicRateLimiter(
     chave_max="rate_limit_form_get_max",
     chave_minutos="rate_limit_form_get_minutos",
@@ -89,12 +90,6 @@ async def get_visualizar_perfil(request: Request, usuario_logado: Optional[dict]
 @router.get("/usuario/perfil/editar")
 @requer_autenticacao()
 async def get_editar_perfil(request: Request, usuario_logado: Optional[dict] = None):
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not form_get_limiter.verificar(ip):
-        informar_erro(request, f"Muitas requisições. Aguarde {form_get_limiter.janela_minutos} minuto(s).")
-        logger.warning(f"Rate limit excedido para formulário GET - IP: {ip}")
-        return RedirectResponse("/usuario", status_code=status.HTTP_303_SEE_OTHER)
     """Formulário para editar dados do perfil"""
     assert usuario_logado is not None
     usuario = usuario_repo.obter_por_id(usuario_logado["id"])
@@ -193,13 +188,6 @@ async def post_editar_perfil(
 @requer_autenticacao()
 async def get_alterar_senha(request: Request, usuario_logado: Optional[dict] = None):
     """Formulário para alterar senha"""
-    # Rate limiting por IP
-    ip = obter_identificador_cliente(request)
-    if not form_get_limiter.verificar(ip):
-        informar_erro(request, f"Muitas requisições. Aguarde {form_get_limiter.janela_minutos} minuto(s).")
-        logger.warning(f"Rate limit excedido para formulário GET - IP: {ip}")
-        return RedirectResponse("/usuario", status_code=status.HTTP_303_SEE_OTHER)
-
     assert usuario_logado is not None
     return templates_usuario.TemplateResponse("perfil/alterar-senha.html", {"request": request})
 
@@ -1,3 +1,4 @@
+import asyncio
 from typing import Optional
 from fastapi import APIRouter, Form, Request, Query, status
 from fastapi.responses import RedirectResponse
@@ -5,6 +6,8 @@ from pydantic import ValidationError
 
 from repo import vaga_repo, area_repo, empresa_repo
 from util.auth_decorator import requer_autenticacao
+from util.batch_loader import obter_carregador
+from util.db_async import repo_async
 from util.template_util import criar_templates
 from util.flash_messages import informar_sucesso, informar_erro
 from util.logger_config import logger
@@ -13,6 +16,9 @@ from util.perfis import Perfil
 router = APIRouter(prefix="/admin/vagas")
 templates = criar_templates("templates/admin/vagas")
 
+# Fachadas assíncronas: consultas rodam fora do event loop
+vaga_db = repo_async(vaga_repo)
+
 @router.get("/")
 @requer_autenticacao([Perfil.ADMIN.value])
 async def index(request: Request, usuario_logado: Optional[dict] = None):
@@ -30,21 +36,23 @@ async def listar(
 
     # Buscar vagas por status
     if status_filtro:
-        vagas = vaga_repo.obter_por_status(status_filtro)
+        vagas = await vaga_db.obter_por_status(status_filtro)
     else:
-        vagas = vaga_repo.obter_todas()
-
-    # Enriquecer vagas com dados de área e empresa
-    vagas_enriquecidas = []
-    for vaga in vagas:
-        area = area_repo.obter_por_id(vaga.id_area) if vaga.id_area else None
-        empresa = empresa_repo.obter_por_id(vaga.id_empresa) if vaga.id_empresa else None
+        vagas = await vaga_db.obter_todas()
 
-        vagas_enriquecidas.append({
+    # Enriquecer vagas com dados de área e empresa: uma consulta por tipo de entidade
+    areas, empresas = await asyncio.gather(
+        obter_carregador(request, area_repo.obter_por_ids).carregar_muitos(v.id_area for v in vagas),
+        obter_carregador(request, empresa_repo.obter_por_ids).carregar_muitos(v.id_empresa for v in vagas),
+    )
+    vagas_enriquecidas = [
+        {
             "vaga": vaga,
             "area_nome": area.nome if area else "N/A",
             "empresa_nome": empresa.nome if empresa else "N/A"
-        })
+        }
+        for vaga, area, empresa in zip(vagas, areas, empresas)
+    ]
 
     status_opcoes = ["Pendente", "Aprovada", "Reprovada", "Arquivada"]
 
@@ -27,6 +27,9 @@ OBTER_POR_ID = "SELECT * FROM area WHERE id_area = ?"
 
 OBTER_TODAS = "SELECT * FROM area ORDER BY nome"
 
+# Várias áreas em uma consulta; o parâmetro é uma lista JSON de IDs ("[1, 2, 3]")
+OBTER_POR_IDS = "SELECT * FROM area WHERE id_area IN (SELECT value FROM json_each(?))"
+
 OBTER_POR_NOME = "SELECT * FROM area WHERE nome = ?"
 
 OBTER_QUANTIDADE = "SELECT COUNT(*) as quantidade FROM area"
@@ -0,0 +1,38 @@
+"""
+SQL statements para a tabela chat_evento.
+Fila de eventos SSE compartilhada entre workers (barramento SQLite do chat).
+"""
+
+CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS chat_evento (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    usuario_id INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    origem TEXT NOT NULL,
+    criado_em REAL NOT NULL
+)
+"""
+
+INSERIR = """
+INSERT INTO chat_evento (usuario_id, payload, origem, criado_em)
+VALUES (?, ?, ?, ?)
+"""
+
+OBTER_ULTIMO_ID = """
+SELECT COALESCE(MAX(id), 0) as ultimo_id
+FROM chat_evento
+"""
+
+# Eventos publicados por outros workers após o último já entregue
+LISTAR_APOS = """
+SELECT id, usuario_id, payload, origem, criado_em
+FROM chat_evento
+WHERE id > ? AND origem != ?
+ORDER BY id
+LIMIT ?
+"""
+
+EXCLUIR_ANTERIORES = """
+DELETE FROM chat_evento
+WHERE criado_em < ?
+"""
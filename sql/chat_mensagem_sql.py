@@ -16,6 +16,21 @@ CREATE TABLE IF NOT EXISTS chat_mensagem (
 )
 """
 
+# Mensagens antigas movidas pelo job de retenção (util/chat_retencao.py).
+# Mesmas colunas; o ID original é preservado (AUTOINCREMENT nunca o reutiliza).
+CRIAR_TABELA_ARQUIVO = """
+CREATE TABLE IF NOT EXISTS chat_mensagem_arquivo (
+    id INTEGER PRIMARY KEY,
+    sala_id TEXT NOT NULL,
+    usuario_id INTEGER NOT NULL,
+    mensagem TEXT NOT NULL,
+    data_envio TIMESTAMP NOT NULL,
+    lida_em TIMESTAMP,
+    FOREIGN KEY (sala_id) REFERENCES chat_sala(id) ON DELETE CASCADE,
+    FOREIGN KEY (usuario_id) REFERENCES usuario(id) ON DELETE CASCADE
+)
+"""
+
 INSERIR = """
 INSERT INTO chat_mensagem (sala_id, usuario_id, mensagem, data_envio, lida_em)
 VALUES (?, ?, ?, ?, ?)
@@ -27,12 +42,41 @@ FROM chat_mensagem
 WHERE id = ?
 """
 
-LISTAR_POR_SALA = """
-SELECT id, sala_id, usuario_id, mensagem, data_envio[timestamp], lida_em[timestamp]
+# Paginação por cursor (keyset) sobre o índice (sala_id, id):
+# o custo não cresce com a profundidade e inserções concorrentes não deslocam páginas.
+LISTAR_ULTIMAS_POR_SALA = """
+SELECT id, sala_id, usuario_id, mensagem, data_envio, lida_em
 FROM chat_mensagem
 WHERE sala_id = ?
+ORDER BY id DESC
+LIMIT ?
+"""
+
+LISTAR_POR_SALA_ANTES_DE = """
+SELECT id, sala_id, usuario_id, mensagem, data_envio, lida_em
+FROM chat_mensagem
+WHERE sala_id = ? AND id < ?
+ORDER BY id DESC
+LIMIT ?
+"""
+
+LISTAR_POR_SALA_DEPOIS_DE = """
+SELECT id, sala_id, usuario_id, mensagem, data_envio, lida_em
+FROM chat_mensagem
+WHERE sala_id = ? AND id > ?
 ORDER BY id ASC
-LIMIT ? OFFSET ?
+LIMIT ?
+"""
+
+# Mensagens de todas as salas do usuário após um ID (retomada do stream SSE
+# com Last-Event-ID): uma busca por sala no índice (sala_id, id)
+LISTAR_POR_USUARIO_DEPOIS_DE = """
+SELECT m.id, m.sala_id, m.usuario_id, m.mensagem, m.data_envio, m.lida_em
+FROM chat_participante p
+INNER JOIN chat_mensagem m ON m.sala_id = p.sala_id
+WHERE p.usuario_id = ? AND m.id > ?
+ORDER BY m.id ASC
+LIMIT ?
 """
 
 CONTAR_POR_SALA = """
@@ -57,7 +101,85 @@ ORDER BY id DESC
 LIMIT 1
 """
 
+OBTER_DADOS_EXCLUSAO = """
+SELECT sala_id, usuario_id, data_envio
+FROM chat_mensagem
+WHERE id = ?
+"""
+
 EXCLUIR = """
 DELETE FROM chat_mensagem
 WHERE id = ?
 """
+
+# Leitura do arquivo quando o usuário rola além da janela mantida na tabela principal
+LISTAR_ARQUIVO_POR_SALA_ANTES_DE = """
+SELECT id, sala_id, usuario_id, mensagem, data_envio, lida_em
+FROM chat_mensagem_arquivo
+WHERE sala_id = ? AND id < ?
+ORDER BY id DESC
+LIMIT ?
+"""
+
+LISTAR_ARQUIVO_POR_SALA_DEPOIS_DE = """
+SELECT id, sala_id, usuario_id, mensagem, data_envio, lida_em
+FROM chat_mensagem_arquivo
+WHERE sala_id = ? AND id > ?
+ORDER BY id ASC
+LIMIT ?
+"""
+
+CONTAR_ARQUIVO_POR_SALA = """
+SELECT COUNT(*) as total
+FROM chat_mensagem_arquivo
+WHERE sala_id = ?
+"""
+
+# Mensagens arquivadas continuam visíveis no histórico: leitura e exclusão valem para elas também
+MARCAR_ARQUIVO_COMO_LIDAS = """
+UPDATE chat_mensagem_arquivo
+SET lida_em = ?
+WHERE sala_id = ?
+  AND usuario_id != ?
+  AND lida_em IS NULL
+"""
+
+OBTER_DADOS_EXCLUSAO_ARQUIVO = """
+SELECT sala_id, usuario_id, data_envio
+FROM chat_mensagem_arquivo
+WHERE id = ?
+"""
+
+EXCLUIR_ARQUIVO = """
+DELETE FROM chat_mensagem_arquivo
+WHERE id = ?
+"""
+
+# Arquivamento: ID da N-ésima mensagem mais recente da sala (as anteriores saem da janela)
+OBTER_ID_CORTE_SALA = """
+SELECT id
+FROM chat_mensagem
+WHERE sala_id = ?
+ORDER BY id DESC
+LIMIT 1 OFFSET ?
+"""
+
+LISTAR_IDS_PARA_ARQUIVAR = """
+SELECT id
+FROM chat_mensagem
+WHERE sala_id = ? AND id < ? AND data_envio < ?
+ORDER BY id ASC
+LIMIT ?
+"""
+
+COPIAR_PARA_ARQUIVO = """
+INSERT OR IGNORE INTO chat_mensagem_arquivo (id, sala_id, usuario_id, mensagem, data_envio, lida_em)
+SELECT id, sala_id, usuario_id, mensagem, data_envio, lida_em
+FROM chat_mensagem
+WHERE id IN (SELECT value FROM json_each(?))
+"""
+
+EXCLUIR_ARQUIVADAS = """
+DELETE FROM chat_mensagem
+WHERE id IN (SELECT value FROM json_each(?))
+"""
@@ -8,6 +8,7 @@ CREATE TABLE IF NOT EXISTS chat_participante (
     sala_id TEXT NOT NULL,
     usuario_id INTEGER NOT NULL,
     ultima_leitura TIMESTAMP,
+    nao_lidas INTEGER NOT NULL DEFAULT 0,
     PRIMARY KEY (sala_id, usuario_id),
     FOREIGN KEY (sala_id) REFERENCES chat_sala(id) ON DELETE CASCADE,
     FOREIGN KEY (usuario_id) REFERENCES usuario(id) ON DELETE CASCADE
@@ -20,43 +21,91 @@ VALUES (?, ?, ?)
 """
 
 OBTER_POR_SALA_E_USUARIO = """
-SELECT sala_id, usuario_id, ultima_leitura[timestamp]
+SELECT sala_id, usuario_id, ultima_leitura[timestamp], nao_lidas
 FROM chat_participante
 WHERE sala_id = ? AND usuario_id = ?
 """
 
 LISTAR_POR_SALA = """
-SELECT sala_id, usuario_id, ultima_leitura[timestamp]
+SELECT sala_id, usuario_id, ultima_leitura[timestamp], nao_lidas
 FROM chat_participante
 WHERE sala_id = ?
 """
 
 LISTAR_POR_USUARIO = """
-SELECT sala_id, usuario_id, ultima_leitura[timestamp]
+SELECT sala_id, usuario_id, ultima_leitura[timestamp], nao_lidas
 FROM chat_participante
 WHERE usuario_id = ?
 """
 
+# Usuários que têm sala com o usuário informado (destinatários de eventos de presença)
+LISTAR_CONTATOS = """
+SELECT DISTINCT outro.usuario_id
+FROM chat_participante eu
+INNER JOIN chat_participante outro ON outro.sala_id = eu.sala_id
+WHERE eu.usuario_id = ? AND outro.usuario_id != eu.usuario_id
+"""
+
 ATUALIZAR_ULTIMA_LEITURA = """
 UPDATE chat_participante
-SET ultima_leitura = ?
+SET ultima_leitura = ?, nao_lidas = 0
 WHERE sala_id = ? AND usuario_id = ?
 """
 
-CONTAR_MENSAGENS_NAO_LIDAS = """
-SELECT COUNT(*) as total
-FROM chat_mensagem m
-WHERE m.sala_id = ?
-  AND m.usuario_id != ?
-  AND (
-    (SELECT cp.ultima_leitura
-     FROM chat_participante cp
-     WHERE cp.sala_id = m.sala_id AND cp.usuario_id = ?) IS NULL
-    OR
-    (SELECT cp.ultima_leitura
-     FROM chat_participante cp
-     WHERE cp.sala_id = m.sala_id AND cp.usuario_id = ?) < m.data_envio
-  )
+# Contador materializado: mantido por chat_mensagem_repo.inserir/excluir
+# e zerado ao marcar como lidas, então a leitura é O(1) por sala.
+OBTER_NAO_LIDAS = """
+SELECT nao_lidas
+FROM chat_participante
+WHERE sala_id = ? AND usuario_id = ?
+"""
+
+SOMAR_NAO_LIDAS_POR_USUARIO = """
+SELECT COALESCE(SUM(nao_lidas), 0) as total
+FROM chat_participante
+WHERE usuario_id = ?
+"""
+
+INCREMENTAR_NAO_LIDAS = """
+UPDATE chat_participante
+SET nao_lidas = nao_lidas + 1
+WHERE sala_id = ? AND usuario_id != ?
+"""
+
+DECREMENTAR_NAO_LIDAS = """
+UPDATE chat_participante
+SET nao_lidas = MAX(nao_lidas - 1, 0)
+WHERE sala_id = ?
+  AND usuario_id != ?
+  AND (ultima_leitura IS NULL OR ultima_leitura < ?)
+"""
+
+ZERAR_NAO_LIDAS = """
+UPDATE chat_participante
+SET nao_lidas = 0
+WHERE sala_id = ? AND usuario_id = ?
+"""
+
+# Migração de bancos criados antes do contador
+LISTAR_COLUNAS = """
+PRAGMA table_info(chat_participante)
+"""
+
+ADICIONAR_COLUNA_NAO_LIDAS = """
+ALTER TABLE chat_participante
+ADD COLUMN nao_lidas INTEGER NOT NULL DEFAULT 0
+"""
+
+RECALCULAR_NAO_LIDAS = """
+UPDATE chat_participante
+SET nao_lidas = (
+    SELECT COUNT(*)
+    FROM chat_mensagem m
+    WHERE m.sala_id = chat_participante.sala_id
+      AND m.usuario_id != chat_participante.usuario_id
+      AND (chat_participante.ultima_leitura IS NULL
+           OR chat_participante.ultima_leitura < m.data_envio)
+)
 """
 
 EXCLUIR = """
@@ -28,7 +28,41 @@ SET ultima_atividade = ?
 WHERE id = ?
 """
 
+# Percorre as salas em páginas pela chave primária (job de retenção)
+LISTAR_IDS_APOS = """
+SELECT id
+FROM chat_sala
+WHERE id > ?
+ORDER BY id
+LIMIT ?
+"""
+
 EXCLUIR = """
 DELETE FROM chat_sala
 WHERE id = ?
 """
+
+# Lista de conversas de um usuário em uma única consulta:
+# outro participante, última mensagem e não lidas por sala,
+# já ordenada e paginada no banco.
+LISTAR_CONVERSAS_POR_USUARIO = """
+SELECT s.id AS sala_id,
+       s.ultima_atividade AS ultima_atividade,
+       u.id AS outro_usuario_id,
+       u.nome AS outro_usuario_nome,
+       u.email AS outro_usuario_email,
+       m.mensagem AS ultima_mensagem,
+       m.usuario_id AS ultima_mensagem_usuario_id,
+       m.data_envio AS ultima_mensagem_data_envio,
+       cp.nao_lidas AS nao_lidas
+FROM chat_participante cp
+JOIN chat_sala s ON s.id = cp.sala_id
+JOIN chat_participante outro ON outro.sala_id = cp.sala_id AND outro.usuario_id != cp.usuario_id
+JOIN usuario u ON u.id = outro.usuario_id
+LEFT JOIN chat_mensagem m ON m.id = (
+    SELECT MAX(ult.id) FROM chat_mensagem ult WHERE ult.sala_id = s.id
+)
+WHERE cp.usuario_id = ?
+ORDER BY s.ultima_atividade DESC, s.id
+LIMIT ? OFFSET ?
+"""
@@ -14,3 +14,31 @@ OBTER_POR_CHAVE = "SELECT * FROM configuracao WHERE chave = ?"
 OBTER_TODOS = "SELECT * FROM configuracao ORDER BY chave"
 
 ATUALIZAR = "UPDATE configuracao SET valor = ? WHERE chave = ?"
+
+# Versão das configurações: contador incrementado por gatilhos a cada escrita
+# em configuracao. Cada worker compara com a versão que carregou para saber
+# quando recarregar o cache (util/config_cache.py).
+CRIAR_TABELA_VERSAO = """
+CREATE TABLE IF NOT EXISTS configuracao_versao (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    versao INTEGER NOT NULL
+)
+"""
+
+INICIALIZAR_VERSAO = "INSERT OR IGNORE INTO configuracao_versao (id, versao) VALUES (1, 0)"
+
+CRIAR_GATILHOS_VERSAO = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_configuracao_versao_{operacao.lower()}
+    AFTER {operacao} ON configuracao
+    BEGIN
+        UPDATE configuracao_versao SET versao = versao + 1 WHERE id = 1;
+    END
+    """
+    for operacao in ("INSERT", "UPDATE", "DELETE")
+]
+
+OBTER_VERSAO = "SELECT versao FROM configuracao_versao WHERE id = 1"
+
+# Carga de todas as configurações em uma única consulta
+OBTER_VALORES = "SELECT chave, valor FROM configuracao"
@@ -30,6 +30,9 @@ OBTER_POR_ID = "SELECT * FROM empresa WHERE id_empresa = ?"
 
 OBTER_TODAS = "SELECT * FROM empresa ORDER BY nome"
 
+# Várias empresas em uma consulta; o parâmetro é uma lista JSON de IDs ("[1, 2, 3]")
+OBTER_POR_IDS = "SELECT * FROM empresa WHERE id_empresa IN (SELECT value FROM json_each(?))"
+
 OBTER_POR_CNPJ = "SELECT * FROM empresa WHERE cnpj = ?"
 
 OBTER_QUANTIDADE = "SELECT COUNT(*) as quantidade FROM empresa"
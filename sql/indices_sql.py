@@ -21,10 +21,130 @@ CREATE INDEX IF NOT EXISTS idx_tarefa_usuario_concluida
 ON tarefa(usuario_id, concluida, data_criacao DESC)
 """
 
+# Índices da tabela chat_sala
+CRIAR_INDICE_CHAT_SALA_ATIVIDADE = """
+CREATE INDEX IF NOT EXISTS idx_chat_sala_atividade
+ON chat_sala(ultima_atividade DESC)
+"""
+
+# Índices da tabela chat_participante
+# (usuario_id, nao_lidas) cobre a soma de não lidas sem acessar a tabela
+CRIAR_INDICE_CHAT_PARTICIPANTE_USUARIO = """
+CREATE INDEX IF NOT EXISTS idx_chat_participante_usuario
+ON chat_participante(usuario_id, nao_lidas)
+"""
+
+# Índices da tabela chat_mensagem
+# (sala_id, id) atende listagem paginada, contagem e última mensagem da sala
+CRIAR_INDICE_CHAT_MENSAGEM_SALA = """
+CREATE INDEX IF NOT EXISTS idx_chat_mensagem_sala
+ON chat_mensagem(sala_id, id)
+"""
+
+# Índices da tabela chat_mensagem_arquivo (mesma paginação por sala da tabela principal)
+CRIAR_INDICE_CHAT_MENSAGEM_ARQUIVO_SALA = """
+CREATE INDEX IF NOT EXISTS idx_chat_mensagem_arquivo_sala
+ON chat_mensagem_arquivo(sala_id, id)
+"""
+
+# Parcial: só mensagens arquivadas ainda não lidas, usadas ao marcar a sala como lida
+CRIAR_INDICE_CHAT_MENSAGEM_ARQUIVO_NAO_LIDAS = """
+CREATE INDEX IF NOT EXISTS idx_chat_mensagem_arquivo_nao_lidas
+ON chat_mensagem_arquivo(sala_id)
+WHERE lida_em IS NULL
+"""
+
+# Índices da tabela vaga
+# (status_vaga, data_cadastro) atende a busca pública e a listagem de vagas abertas
+CRIAR_INDICE_VAGA_STATUS_DATA = """
+CREATE INDEX IF NOT EXISTS idx_vaga_status_data
+ON vaga(status_vaga, data_cadastro DESC)
+"""
+
+CRIAR_INDICE_VAGA_EMPRESA = """
+CREATE INDEX IF NOT EXISTS idx_vaga_empresa
+ON vaga(id_empresa, data_cadastro DESC)
+"""
+
+CRIAR_INDICE_VAGA_RECRUTADOR = """
+CREATE INDEX IF NOT EXISTS idx_vaga_recrutador
+ON vaga(id_recrutador, data_cadastro DESC)
+"""
+
+CRIAR_INDICE_VAGA_AREA = """
+CREATE INDEX IF NOT EXISTS idx_vaga_area
+ON vaga(id_area)
+"""
+
+# Índices da tabela candidatura
+# (id_vaga, id_candidato) já é coberto pela restrição UNIQUE
+CRIAR_INDICE_CANDIDATURA_CANDIDATO = """
+CREATE INDEX IF NOT EXISTS idx_candidatura_candidato
+ON candidatura(id_candidato, data_candidatura DESC)
+"""
+
+CRIAR_INDICE_CANDIDATURA_STATUS = """
+CREATE INDEX IF NOT EXISTS idx_candidatura_status
+ON candidatura(status, data_candidatura DESC)
+"""
+
+# Índices da tabela chamado
+CRIAR_INDICE_CHAMADO_USUARIO_STATUS = """
+CREATE INDEX IF NOT EXISTS idx_chamado_usuario_status
+ON chamado(usuario_id, status)
+"""
+
+CRIAR_INDICE_CHAMADO_STATUS = """
+CREATE INDEX IF NOT EXISTS idx_chamado_status
+ON chamado(status)
+"""
+
+# Índices da tabela chamado_interacao
+CRIAR_INDICE_CHAMADO_INTERACAO_CHAMADO = """
+CREATE INDEX IF NOT EXISTS idx_chamado_interacao_chamado
+ON chamado_interacao(chamado_id, data_interacao)
+"""
+
+# Parcial: só interações não lidas, usadas pelo contador de não lidas
+CRIAR_INDICE_CHAMADO_INTERACAO_NAO_LIDAS = """
+CREATE INDEX IF NOT EXISTS idx_chamado_interacao_nao_lidas
+ON chamado_interacao(chamado_id, usuario_id)
+WHERE data_leitura IS NULL
+"""
+
+# Índices da tabela chat_evento (limpeza periódica por idade)
+CRIAR_INDICE_CHAT_EVENTO_CRIADO_EM = """
+CREATE INDEX IF NOT EXISTS idx_chat_evento_criado_em
+ON chat_evento(criado_em)
+"""
+
+# Índices da tabela rate_limit (descarte de identificadores ociosos)
+CRIAR_INDICE_RATE_LIMIT_ATUALIZADO_EM = """
+CREATE INDEX IF NOT EXISTS idx_rate_limit_atualizado_em
+ON rate_limit(limiter, atualizado_em)
+"""
+
 # Lista de todos os índices para criação
 TODOS_INDICES = [
     CRIAR_INDICE_USUARIO_PERFIL,
     CRIAR_INDICE_USUARIO_TOKEN,
     CRIAR_INDICE_TAREFA_USUARIO,
     CRIAR_INDICE_TAREFA_USUARIO_CONCLUIDA,
+    CRIAR_INDICE_CHAT_SALA_ATIVIDADE,
+    CRIAR_INDICE_CHAT_PARTICIPANTE_USUARIO,
+    CRIAR_INDICE_CHAT_MENSAGEM_SALA,
+    CRIAR_INDICE_CHAT_MENSAGEM_ARQUIVO_SALA,
+    CRIAR_INDICE_CHAT_MENSAGEM_ARQUIVO_NAO_LIDAS,
+    CRIAR_INDICE_VAGA_STATUS_DATA,
+    CRIAR_INDICE_VAGA_EMPRESA,
+    CRIAR_INDICE_VAGA_RECRUTADOR,
+    CRIAR_INDICE_VAGA_AREA,
+    CRIAR_INDICE_CANDIDATURA_CANDIDATO,
+    CRIAR_INDICE_CANDIDATURA_STATUS,
+    CRIAR_INDICE_CHAMADO_USUARIO_STATUS,
+    CRIAR_INDICE_CHAMADO_STATUS,
+    CRIAR_INDICE_CHAMADO_INTERACAO_CHAMADO,
+    CRIAR_INDICE_CHAMADO_INTERACAO_NAO_LIDAS,
+    CRIAR_INDICE_CHAT_EVENTO_CRIADO_EM,
+    CRIAR_INDICE_RATE_LIMIT_ATUALIZADO_EM,
 ]
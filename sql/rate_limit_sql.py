@@ -0,0 +1,58 @@
+"""
+SQL statements para a tabela rate_limit.
+Estado dos token buckets do rate limiter compartilhado entre workers.
+"""
+
+CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS rate_limit (
+    limiter TEXT NOT NULL,
+    identificador TEXT NOT NULL,
+    fichas REAL NOT NULL,
+    atualizado_em REAL NOT NULL,
+    permitido INTEGER NOT NULL,
+    PRIMARY KEY (limiter, identificador)
+) WITHOUT ROWID
+"""
+
+# Reabastece o balde, consome uma ficha se houver e informa o resultado em
+# um único statement (atômico entre processos). Parâmetros: limiter,
+# identificador, capacidade, agora e três vezes a taxa (fichas por segundo).
+# No UPDATE, fichas/atualizado_em são os valores anteriores da linha.
+CONSUMIR = """
+INSERT INTO rate_limit (limiter, identificador, fichas, atualizado_em, permitido)
+VALUES (?, ?, ? - 1, ?, 1)
+ON CONFLICT (limiter, identificador) DO UPDATE SET
+    fichas = MIN(excluded.fichas + 1, fichas + (excluded.atualizado_em - atualizado_em) * ?)
+        - (MIN(excluded.fichas + 1, fichas + (excluded.atualizado_em - atualizado_em) * ?) >= 1),
+    permitido = MIN(excluded.fichas + 1, fichas + (excluded.atualizado_em - atualizado_em) * ?) >= 1,
+    atualizado_em = excluded.atualizado_em
+RETURNING fichas, permitido
+"""
+
+OBTER = """
+SELECT fichas, atualizado_em
+FROM rate_limit
+WHERE limiter = ? AND identificador = ?
+"""
+
+EXCLUIR = """
+DELETE FROM rate_limit
+WHERE limiter = ? AND identificador = ?
+"""
+
+EXCLUIR_POR_LIMITER = """
+DELETE FROM rate_limit
+WHERE limiter = ?
+"""
+
+# Identificadores sem acesso há uma janela inteira têm o balde cheio
+EXCLUIR_OCIOSOS = """
+DELETE FROM rate_limit
+WHERE limiter = ? AND atualizado_em < ?
+"""
+
+CONTAR_POR_LIMITER = """
+SELECT COUNT(*) as quantidade
+FROM rate_limit
+WHERE limiter = ?
+"""
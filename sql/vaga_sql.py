@@ -127,4 +127,104 @@ LEFT JOIN empresa e ON v.id_empresa = e.id_empresa
 WHERE v.status_vaga = 'aberta'
 ORDER BY v.data_cadastro DESC
 LIMIT ? OFFSET ?
-"""
\ No newline at end of file
+"""
+# Busca textual (FTS5) sobre titulo, descricao e requisitos.
+# Tabela de conteúdo externo: o texto fica só em vaga, o índice em vaga_fts,
+# mantido pelos triggers abaixo. unicode61 com remove_diacritics ignora
+# acentos ("tecnico" encontra "técnico"); prefix acelera buscas por prefixo.
+CRIAR_TABELA_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS vaga_fts USING fts5(
+    titulo, descricao, requisitos,
+    content='vaga',
+    content_rowid='id_vaga',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+)
+"""
+
+CRIAR_TRIGGER_FTS_INSERIR = """
+CREATE TRIGGER IF NOT EXISTS vaga_fts_inserir AFTER INSERT ON vaga BEGIN
+    INSERT INTO vaga_fts (rowid, titulo, descricao, requisitos)
+    VALUES (new.id_vaga, new.titulo, new.descricao, new.requisitos);
+END
+"""
+
+CRIAR_TRIGGER_FTS_EXCLUIR = """
+CREATE TRIGGER IF NOT EXISTS vaga_fts_excluir AFTER DELETE ON vaga BEGIN
+    INSERT INTO vaga_fts (vaga_fts, rowid, titulo, descricao, requisitos)
+    VALUES ('delete', old.id_vaga, old.titulo, old.descricao, old.requisitos);
+END
+"""
+
+CRIAR_TRIGGER_FTS_ALTERAR = """
+CREATE TRIGGER IF NOT EXISTS vaga_fts_alterar AFTER UPDATE OF titulo, descricao, requisitos ON vaga BEGIN
+    INSERT INTO vaga_fts (vaga_fts, rowid, titulo, descricao, requisitos)
+    VALUES ('delete', old.id_vaga, old.titulo, old.descricao, old.requisitos);
+    INSERT INTO vaga_fts (rowid, titulo, descricao, requisitos)
+    VALUES (new.id_vaga, new.titulo, new.descricao, new.requisitos);
+END
+"""
+
+EXISTE_TABELA_FTS = """
+SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'vaga_fts'
+"""
+
+# Reindexa vagas cadastradas antes da criação de vaga_fts
+RECONSTRUIR_FTS = """
+INSERT INTO vaga_fts (vaga_fts) VALUES ('rebuild')
+"""
+
+# Ordenado por relevância (bm25; menor é melhor), com pesos
+# titulo > requisitos > descricao, e os mesmos filtros de BUSCAR
+BUSCAR_TEXTO = """
+SELECT v.*,
+       a.nome as area_nome,
+       e.nome as empresa_nome,
+       bm25(vaga_fts, 10.0, 1.0, 3.0) as relevancia
+FROM vaga_fts
+JOIN vaga v ON v.id_vaga = vaga_fts.rowid
+LEFT JOIN area a ON v.id_area = a.id_area
+LEFT JOIN empresa e ON v.id_empresa = e.id_empresa
+WHERE vaga_fts MATCH ?
+  AND (? IS NULL OR v.id_area = ?)
+  AND (? IS NULL OR v.cidade LIKE '%' || ? || '%')
+  AND (? IS NULL OR v.uf = ?)
+  AND (? IS NULL OR v.modalidade = ?)
+  AND (? IS NULL OR v.salario >= ?)
+  AND v.status_vaga = 'aberta'
+ORDER BY relevancia, v.data_cadastro DESC
+LIMIT ? OFFSET ?
+"""
+
+# Facetas da busca: uma linha por combinação (área, UF, modalidade, faixa
+# salarial) das vagas abertas. As contagens por faceta são somadas em
+# vaga_repo.obter_facetas, sem uma consulta por valor de faceta.
+_SELECT_FACETAS = """
+SELECT v.id_area,
+       a.nome as area_nome,
+       v.uf,
+       v.modalidade,
+       CASE
+           WHEN v.salario IS NULL OR v.salario <= 0 THEN 'a_combinar'
+           WHEN v.salario < 1500 THEN 'ate_1500'
+           WHEN v.salario < 3000 THEN '1500_3000'
+           WHEN v.salario < 5000 THEN '3000_5000'
+           ELSE 'acima_5000'
+       END as faixa_salarial,
+       COUNT(*) as quantidade
+FROM vaga v
+LEFT JOIN area a ON v.id_area = a.id_area
+WHERE v.status_vaga = 'aberta'
+  AND (? IS NULL OR v.cidade LIKE '%' || ? || '%')
+  AND (? IS NULL OR v.salario >= ?)
+"""
+
+_AGRUPAR_FACETAS = """
+GROUP BY v.id_area, v.uf, v.modalidade, faixa_salarial
+"""
+
+CONTAR_FACETAS = _SELECT_FACETAS + _AGRUPAR_FACETAS
+
+CONTAR_FACETAS_TEXTO = _SELECT_FACETAS + """
+  AND v.id_vaga IN (SELECT rowid FROM vaga_fts WHERE vaga_fts MATCH ?)
+""" + _AGRUPAR_FACETAS
@@ -6,12 +6,15 @@
 const chatWidget = (() => {
     // Estado do widget
     let eventSource = null;
+    let ultimoEventoId = null;
     let conversaAtual = null;
     let conversasOffset = 0;
     let debounceTimer = null;
-    let mensagensOffset = 0;
+    let cursorMensagens = null;
     let carregandoMensagens = false;
     let todasMensagensCarregadas = false;
+    let ultimoAvisoDigitando = 0;
+    let digitandoTimer = null;
 
     // Elementos do DOM
     const elementos = {
@@ -23,7 +26,8 @@ const chatWidget = (() => {
         conversationsList: null,
         messagesContainer: null,
         messageInput: null,
-        messageForm: null
+        messageForm: null,
+        typingIndicator: null
     };
 
     /**
@@ -40,6 +44,7 @@ const chatWidget = (() => {
         elementos.messagesContainer = document.getElementById('chat-messages-container');
         elementos.messageInput = document.getElementById('chat-message-input');
         elementos.messageForm = document.getElementById('chat-message-form');
+        elementos.typingIndicator = document.getElementById('chat-typing-indicator');
 
         // Conectar SSE
         conectarSSE();
@@ -53,6 +58,7 @@ const chatWidget = (() => {
         // Event listeners
         elementos.userSearch.addEventListener('input', handleBuscaUsuario);
         elementos.messageInput.addEventListener('keydown', handleMessageInputKeydown);
+        elementos.messageInput.addEventListener('input', avisarDigitando);
         elementos.messagesContainer.addEventListener('scroll', handleScrollMensagens);
 
         console.log('[Chat] Widget inicializado');
@@ -62,20 +68,28 @@ const chatWidget = (() => {
      * Conecta ao stream SSE
      */
     function conectarSSE() {
-        eventSource = new EventSource('/chat/stream');
+        // Nova instância não herda o Last-Event-ID: informar pela URL
+        const url = ultimoEventoId ? `/chat/stream?last_event_id=${ultimoEventoId}` : '/chat/stream';
+        eventSource = new EventSource(url);
 
         eventSource.onopen = () => {
             console.log('[Chat SSE] Conexão estabelecida');
         };
 
         eventSource.onmessage = (event) => {
+            if (event.lastEventId) {
+                ultimoEventoId = event.lastEventId;
+            }
             const mensagem = JSON.parse(event.data);
             processarMensagemSSE(mensagem);
         };
 
         eventSource.onerror = (error) => {
             console.error('[Chat SSE] Erro na conexão:', error);
-            // EventSource reconecta automaticamente
+            // EventSource reconecta sozinho (enviando Last-Event-ID); se desistiu, reabrir
+            if (eventSource.readyState === EventSource.CLOSED) {
+                setTimeout(conectarSSE, 5000);
+            }
         };
     }
 
@@ -88,6 +102,7 @@ const chatWidget = (() => {
         if (mensagem.tipo === 'nova_mensagem') {
             // Se for da conversa atual, adicionar na tela
             if (conversaAtual && mensagem.sala_id === conversaAtual.sala_id) {
+                elementos.typingIndicator.style.display = 'none';
                 renderizarMensagem(mensagem.mensagem, false);
 
                 // Scroll para o final para mostrar nova mensagem
@@ -105,6 +120,14 @@ const chatWidget = (() => {
         } else if (mensagem.tipo === 'atualizar_contador') {
             // Atualizar contador de não lidas
             atualizarContadorNaoLidas();
+        } else if (mensagem.tipo === 'presenca') {
+            aplicarPresenca(mensagem.usuario_id, mensagem.online);
+        } else if (mensagem.tipo === 'digitando') {
+            exibirDigitando(mensagem.sala_id);
+        } else if (mensagem.tipo === 'resincronizar') {
+            // Desconectado por tempo demais para reenviar tudo: recarregar
+            carregarConversas(0);
+            atualizarContadorNaoLidas();
         }
     }
 
@@ -124,6 +147,9 @@ const chatWidget = (() => {
             renderizarConversas(conversas);
             conversasOffset += conversas.length;
 
+            // Presença de todos os contatos da página em uma única requisição
+            carregarPresenca(conversas.map(c => c.outro_usuario.id));
+
         } catch (error) {
             console.error('[Chat] Erro ao carregar conversas:', error);
         }
@@ -137,6 +163,7 @@ const chatWidget = (() => {
             const item = document.createElement('div');
             item.className = 'chat-conversation-item p-2 border-bottom d-flex align-items-center';
             item.setAttribute('data-sala-id', conversa.sala_id);
+            item.setAttribute('data-usuario-id', conversa.outro_usuario.id);
 
             if (conversaAtual && conversaAtual.sala_id === conversa.sala_id) {
                 item.classList.add('active');
@@ -159,6 +186,13 @@ const chatWidget = (() => {
             nome.className = 'fw-bold small text-truncate';
             nome.textContent = conversa.outro_usuario.nome;
 
+            // Indicador de presença (atualizado por carregarPresenca e eventos SSE)
+            const presenca = document.createElement('i');
+            presenca.className = 'chat-presenca bi bi-circle-fill text-success ms-1';
+            presenca.style.fontSize = '0.5rem';
+            presenca.style.display = 'none';
+            nome.appendChild(presenca);
+
             const ultimaMensagem = document.createElement('div');
             ultimaMensagem.className = 'text-muted small text-truncate';
             ultimaMensagem.textContent = conversa.ultima_mensagem
@@ -188,6 +222,70 @@ const chatWidget = (() => {
         });
     }
 
+    /**
+     * Consulta a presença de vários usuários de uma vez
+     */
+    async function carregarPresenca(usuarioIds) {
+        if (usuarioIds.length === 0) {
+            return;
+        }
+
+        try {
+            const response = await fetch(`/chat/presenca?ids=${usuarioIds.join(',')}`);
+            const data = await response.json();
+
+            Object.entries(data.presenca).forEach(([usuarioId, online]) => {
+                aplicarPresenca(usuarioId, online);
+            });
+
+        } catch (error) {
+            console.error('[Chat] Erro ao carregar presença:', error);
+        }
+    }
+
+    /**
+     * Mostra ou oculta o indicador de online de um usuário na lista de conversas
+     */
+    function aplicarPresenca(usuarioId, online) {
+        document.querySelectorAll(`.chat-conversation-item[data-usuario-id="${usuarioId}"] .chat-presenca`)
+            .forEach(indicador => {
+                indicador.style.display = online ? 'inline' : 'none';
+            });
+    }
+
+    /**
+     * Exibe "digitando..." na conversa aberta por alguns segundos
+     */
+    function exibirDigitando(salaId) {
+        if (!conversaAtual || conversaAtual.sala_id !== salaId) {
+            return;
+        }
+
+        elementos.typingIndicator.textContent = `${conversaAtual.outro_usuario.nome} está digitando...`;
+        elementos.typingIndicator.style.display = 'block';
+
+        if (digitandoTimer) {
+            clearTimeout(digitandoTimer);
+        }
+        digitandoTimer = setTimeout(() => {
+            elementos.typingIndicator.style.display = 'none';
+        }, 4000);
+    }
+
+    /**
+     * Avisa o servidor que o usuário está digitando (no máximo a cada 3s)
+     */
+    function avisarDigitando() {
+        const agora = Date.now();
+        if (!conversaAtual || agora - ultimoAvisoDigitando < 3000) {
+            return;
+        }
+        ultimoAvisoDigitando = agora;
+
+        fetch(`/chat/digitando/${conversaAtual.sala_id}`, { method: 'POST' })
+            .catch(error => console.error('[Chat] Erro ao avisar digitação:', error));
+    }
+
     /**
      * Handle busca de usuário com debounce
      */
@@ -323,7 +421,7 @@ const chatWidget = (() => {
         conversaAtual = conversa;
 
         // Resetar estado de paginação
-        mensagensOffset = 0;
+        cursorMensagens = null;
         todasMensagensCarregadas = false;
 
         // Marcar como ativa na lista
@@ -359,17 +457,24 @@ const chatWidget = (() => {
 
         try {
             const limit = 24;
-            const response = await fetch(`/chat/mensagens/${salaId}?limit=${limit}&offset=${mensagensOffset}`);
-            const mensagens = await response.json();
+            // Paginação por cursor: sem cursor vêm as mais recentes;
+            // depois, before_id traz as imediatamente anteriores à mais antiga exibida
+            let url = `/chat/mensagens/${salaId}?limit=${limit}`;
+            if (!inicial && cursorMensagens !== null) {
+                url += `&before_id=${cursorMensagens}`;
+            }
+            const response = await fetch(url);
+            const dados = await response.json();
+            const mensagens = dados.mensagens;
 
-            // Se retornou menos que o limite, não há mais mensagens
-            if (mensagens.length < limit) {
+            cursorMensagens = dados.proximo_cursor;
+            // Sem cursor, não há mensagens mais antigas
+            if (cursorMensagens === null) {
                 todasMensagensCarregadas = true;
             }
 
             if (inicial) {
                 elementos.messagesContainer.innerHTML = '';
-                mensagensOffset = 0;
             }
 
             // Salvar posição de scroll antes de adicionar
@@ -395,8 +500,6 @@ const chatWidget = (() => {
                 elementos.messagesContainer.scrollTop = scrollAntes + (alturaDepois - alturaAntes);
             }
 
-            mensagensOffset += mensagens.length;
-
         } catch (error) {
             console.error('[Chat] Erro ao carregar mensagens:', error);
         } finally {
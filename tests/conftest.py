@@ -12,6 +12,19 @@ from pathlib import Path
 from typing import Optional
 from util.perfis import Perfil
 
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Benchmarks marcados com @pytest.mark.slow só rodam quando pedidos
+    explicitamente: `pytest -m slow` ou RUN_SLOW_TESTS=1.
+    """
+    if "slow" in (config.getoption("-m") or "") or os.getenv("RUN_SLOW_TESTS") == "1":
+        return
+    pular = pytest.mark.skip(reason="teste lento: use -m slow ou RUN_SLOW_TESTS=1")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(pular)
+
 # Configurar banco de dados de teste ANTES de importar a aplicação
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_database():
@@ -111,8 +124,10 @@ def limpar_banco_dados():
                 'vaga',               # depende de area, empresa e usuario
                 'endereco',           # depende de usuario
                 'chat_mensagem',      # depende de chat_sala e usuario
+                'chat_mensagem_arquivo',
                 'chat_participante',  # depende de chat_sala e usuario
                 'chat_sala',
+                'chat_evento',
                 'chamado_interacao',  # depende de chamado e usuario
                 'chamado',            # depende de usuario
                 'tarefa',             # depende de usuario
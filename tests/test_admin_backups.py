@@ -73,6 +73,30 @@ class TestCriarBackup:
         assert "backup_" in backups[0].nome_arquivo
         assert ".db" in backups[0].nome_arquivo
 
+
+class TestCompactarBanco:
+    """Testes da compactação do banco (conversão para auto_vacuum incremental)"""
+
+    def test_compactar_por_admin(self, admin_autenticado):
+        """Admin compacta o banco e o modo incremental fica ativo"""
+        from util import db_util
+
+        response = admin_autenticado.post("/admin/backups/compactar", follow_redirects=False)
+
+        assert response.status_code == status.HTTP_303_SEE_OTHER
+        assert response.headers["location"] == "/admin/backups/listar"
+        assert db_util.obter_espaco_banco()["auto_vacuum"] == "INCREMENTAL"
+
+    def test_compactar_requer_admin(self, cliente_autenticado):
+        """Usuário comum não pode compactar o banco"""
+        from util import db_util
+        modo = db_util.obter_espaco_banco()["auto_vacuum"]
+
+        response = cliente_autenticado.post("/admin/backups/compactar", follow_redirects=False)
+
+        assert response.status_code in [status.HTTP_303_SEE_OTHER, status.HTTP_403_FORBIDDEN]
+        assert db_util.obter_espaco_banco()["auto_vacuum"] == modo
+
     def test_cliente_nao_pode_criar_backup(self, cliente_autenticado):
         """Cliente não deve poder criar backup"""
         response = cliente_autenticado.post("/admin/backups/criar", follow_redirects=False)
@@ -309,3 +333,70 @@ class TestFluxoCompletoBackup:
 
         # Deve ter mais backups
         assert len(backups_2) > len(backups_1)
+
+
+class TestBackupComWal:
+    """Backup e restauração pela API de backup do SQLite, com o banco em modo WAL"""
+
+    @pytest.fixture
+    def banco_wal(self, tmp_path, monkeypatch):
+        from util import backup_util, db_util
+
+        caminho = str(tmp_path / "wal.db")
+        monkeypatch.setattr(db_util, "DATABASE_PATH", caminho)
+        monkeypatch.setattr(backup_util, "DATABASE_PATH", caminho)
+        monkeypatch.setattr(backup_util, "BACKUP_DIR", tmp_path / "backups")
+        db_util.fechar_pool()
+        with db_util.get_connection() as conn:
+            conn.execute("CREATE TABLE item (valor TEXT)")
+            conn.execute("INSERT INTO item VALUES ('original')")
+        yield caminho
+        db_util.fechar_pool()
+
+    def _valores(self, caminho: str) -> list:
+        import sqlite3
+        conn = sqlite3.connect(caminho)
+        try:
+            return [linha[0] for linha in conn.execute("SELECT valor FROM item ORDER BY rowid")]
+        finally:
+            conn.close()
+
+    def test_backup_inclui_dados_ainda_no_wal(self, banco_wal):
+        """Com um leitor segurando o WAL (checkpoint impossível), o backup não perde dados"""
+        import sqlite3
+        from util import backup_util, db_util
+
+        leitor = sqlite3.connect(banco_wal, isolation_level=None)
+        leitor.execute("BEGIN")
+        leitor.execute("SELECT * FROM item").fetchall()
+        try:
+            with db_util.get_connection() as conn:
+                conn.execute("INSERT INTO item VALUES ('no_wal')")
+
+            sucesso, _ = backup_util.criar_backup()
+        finally:
+            leitor.close()
+
+        assert sucesso
+        backup = backup_util.listar_backups()[0]
+        assert self._valores(backup.caminho_completo) == ["original", "no_wal"]
+
+    def test_restauracao_visivel_para_outras_conexoes(self, banco_wal):
+        """Conexão de outro worker continua válida e lê o conteúdo restaurado"""
+        import sqlite3
+        from util import backup_util, db_util
+
+        backup_util.criar_backup()
+        nome = backup_util.listar_backups()[0].nome_arquivo
+        with db_util.get_connection() as conn:
+            conn.execute("INSERT INTO item VALUES ('depois_do_backup')")
+        outro_worker = sqlite3.connect(banco_wal)
+        try:
+            assert len(outro_worker.execute("SELECT * FROM item").fetchall()) == 2
+
+            sucesso, _, _ = backup_util.restaurar_backup(nome, criar_backup_antes=False)
+
+            assert sucesso
+            assert [linha[0] for linha in outro_worker.execute("SELECT valor FROM item")] == ["original"]
+        finally:
+            outro_worker.close()
@@ -128,6 +128,19 @@ class TestObterPorId:
         assert area is None
 
 
+class TestObterPorIds:
+    """Testes para busca de várias áreas em uma consulta"""
+
+    def test_obter_varias_areas(self, limpar_banco_dados):
+        """Deve retornar dicionário por ID, ignorando IDs inexistentes"""
+        ids = [area_repo.inserir(Area(id_area=0, nome=f"Área {i}", descricao="")) for i in range(3)]
+
+        areas = area_repo.obter_por_ids([ids[1], ids[2], 999])
+
+        assert set(areas) == {ids[1], ids[2]}
+        assert areas[ids[1]].nome == "Área 1"
+
+
 class TestObterTodas:
     """Testes para listagem de todas as áreas"""
 
@@ -0,0 +1,124 @@
+"""
+Testes para o carregamento em lote de entidades (util/batch_loader.py).
+Cobre agrupamento em uma chamada, memorização por requisição e erros.
+"""
+import asyncio
+import gc
+from types import SimpleNamespace
+
+import pytest
+
+from model.area_model import Area
+from repo import area_repo
+from util.batch_loader import CarregadorLote, obter_carregador
+from util.db_async import ExecutorBanco
+
+
+@pytest.fixture
+def executor():
+    """Executor isolado para os lotes"""
+    executor = ExecutorBanco(max_threads=2, max_fila=10)
+    yield executor
+    executor.encerrar()
+
+
+class FuncaoLoteFalsa:
+    """Função de lote que registra as chamadas recebidas"""
+
+    def __init__(self, dados: dict):
+        self.dados = dados
+        self.chamadas = []
+
+    def __call__(self, ids):
+        self.chamadas.append(sorted(ids))
+        return {i: self.dados[i] for i in ids if i in self.dados}
+
+
+class TestCarregadorLote:
+    """Testes de agrupamento e memorização"""
+
+    async def test_agrupa_pedidos_simultaneos(self, executor):
+        """Pedidos feitos juntos devem virar uma única chamada, com a ordem preservada"""
+        funcao = FuncaoLoteFalsa({1: "a", 2: "b", 3: "c"})
+        carregador = CarregadorLote(funcao, executor)
+
+        resultado = await carregador.carregar_muitos([3, 1, 3, None, 2, 99])
+
+        assert resultado == ["c", "a", "c", None, "b", None]
+        assert funcao.chamadas == [[1, 2, 3, 99]]
+
+    async def test_memoriza_chaves_ja_carregadas(self, executor):
+        """Chaves já carregadas não devem ser consultadas de novo"""
+        funcao = FuncaoLoteFalsa({1: "a", 2: "b"})
+        carregador = CarregadorLote(funcao, executor)
+
+        await carregador.carregar(1)
+        assert await carregador.carregar_muitos([1, 2]) == ["a", "b"]
+
+        assert funcao.chamadas == [[1], [2]]
+        assert carregador.lotes == 2
+
+    async def test_corrotinas_independentes_compartilham_lote(self, executor):
+        """Carregadores usados por corrotinas diferentes no mesmo gather entram no mesmo lote"""
+        funcao = FuncaoLoteFalsa({1: "a", 2: "b"})
+        carregador = CarregadorLote(funcao, executor)
+
+        resultado = await asyncio.gather(carregador.carregar(1), carregador.carregar(2))
+
+        assert resultado == ["a", "b"]
+        assert len(funcao.chamadas) == 1
+
+    async def test_erro_propaga_e_nao_fica_memorizado(self, executor):
+        """Falha do lote deve chegar a todos e permitir nova tentativa"""
+        falhar = True
+
+        def funcao(ids):
+            if falhar:
+                raise RuntimeError("banco indisponível")
+            return {i: i * 10 for i in ids}
+
+        carregador = CarregadorLote(funcao, executor)
+        with pytest.raises(RuntimeError):
+            await carregador.carregar_muitos([1, 2])
+
+        falhar = False
+        assert await carregador.carregar_muitos([1, 2]) == [10, 20]
+
+    async def test_tarefa_do_lote_referenciada_ate_terminar(self, executor):
+        """O despacho não pode ser coletado pelo GC enquanto a consulta roda"""
+        tarefas_durante = []
+
+        def funcao(ids):
+            tarefas_durante.append(len(carregador._tarefas))
+            gc.collect()
+            return {i: i for i in ids}
+
+        carregador = CarregadorLote(funcao, executor)
+
+        assert await carregador.carregar_muitos([1, 2]) == [1, 2]
+        assert tarefas_durante == [1]
+        assert not carregador._tarefas
+
+
+class TestObterCarregador:
+    """Testes do carregador por requisição"""
+
+    def test_mesmo_carregador_na_mesma_requisicao(self):
+        """Mesma função na mesma requisição deve reaproveitar o carregador"""
+        request = SimpleNamespace(state=SimpleNamespace())
+        outra_request = SimpleNamespace(state=SimpleNamespace())
+
+        carregador = obter_carregador(request, area_repo.obter_por_ids)
+
+        assert obter_carregador(request, area_repo.obter_por_ids) is carregador
+        assert obter_carregador(outra_request, area_repo.obter_por_ids) is not carregador
+
+    async def test_carrega_areas_do_banco(self, executor):
+        """Integração com area_repo.obter_por_ids"""
+        ids = [area_repo.inserir(Area(id_area=0, nome=f"Área {i}", descricao="")) for i in range(3)]
+        carregador = CarregadorLote(area_repo.obter_por_ids, executor)
+
+        areas = await carregador.carregar_muitos(ids + [999999])
+
+        assert [a.nome for a in areas[:3]] == ["Área 0", "Área 1", "Área 2"]
+        assert areas[3] is None
@@ -0,0 +1,107 @@
+"""
+Testes da tag {% cache %} (util/cache_fragmentos.py).
+"""
+import re
+
+import pytest
+from jinja2 import DictLoader, Environment
+from starlette.requests import Request
+
+from util.cache_fragmentos import CacheFragmentosExtension, cache_fragmentos
+from util.config_cache import config
+from util.template_util import obter_templates
+
+
+def _request(usuario_id=None, caminho: str = "/", perfil: str = "Cliente") -> Request:
+    sessao = {"usuario_logado": {"id": usuario_id, "nome": f"U{usuario_id}", "perfil": perfil}} if usuario_id else {}
+    return Request({"type": "http", "method": "GET", "path": caminho, "query_string": b"", "headers": [],
+                    "session": sessao})
+
+
+@pytest.fixture
+def renderizar():
+    """Renderiza templates com a extensão, contando quantas vezes o corpo foi avaliado"""
+    cache_fragmentos.limpar()
+    renderizacoes = []
+    env = Environment(loader=DictLoader({
+        "menu.html": '{% cache "menu" %}<nav>{{ contar() }}</nav>{% endcache %}',
+        "ttl.html": '{% cache ("menu", secao), 0 %}{{ contar() }}{% endcache %}',
+        "compartilhado.html": '{% cache ("menu", secao), none, false %}{{ contar() }}{% endcache %}',
+    }), extensions=[CacheFragmentosExtension])
+    env.globals["contar"] = lambda: renderizacoes.append(1) or len(renderizacoes)
+
+    def _renderizar(nome: str, usuario_id=None, **contexto) -> str:
+        return env.get_template(nome).render(request=_request(usuario_id), **contexto)
+
+    _renderizar.renderizacoes = renderizacoes
+    yield _renderizar
+    cache_fragmentos.limpar()
+
+
+class TestCacheFragmentos:
+    """Testes de acerto, chave e invalidação"""
+
+    def test_segunda_renderizacao_vem_do_cache(self, renderizar):
+        estatisticas = cache_fragmentos.obter_estatisticas()
+
+        assert renderizar("menu.html", 1) == "<nav>1</nav>"
+        assert renderizar("menu.html", 1) == "<nav>1</nav>"
+
+        depois = cache_fragmentos.obter_estatisticas()
+        assert len(renderizar.renderizacoes) == 1
+        assert depois["acertos"] - estatisticas["acertos"] == 1
+        assert depois["faltas"] - estatisticas["faltas"] == 1
+
+    def test_fragmento_separado_por_usuario(self, renderizar):
+        renderizar("menu.html", 1)
+
+        assert renderizar("menu.html", 2) == "<nav>2</nav>"
+        assert renderizar("menu.html") == "<nav>3</nav>"
+        assert renderizar("menu.html", 1) == "<nav>1</nav>"
+
+    def test_mudanca_de_configuracao_invalida(self, renderizar):
+        renderizar("menu.html", 1)
+
+        config.limpar()
+
+        assert renderizar("menu.html", 1) == "<nav>2</nav>"
+
+    def test_ttl_zero_nao_guarda(self, renderizar):
+        renderizar("ttl.html", 1, secao="a")
+
+        assert renderizar("ttl.html", 1, secao="a") == "2"
+
+    def test_fragmento_compartilhado_entre_usuarios(self, renderizar):
+        renderizar("compartilhado.html", 1, secao="a")
+
+        assert renderizar("compartilhado.html", 2, secao="a") == "1"
+        assert renderizar("compartilhado.html", 2, secao="b") == "2"
+
+
+class TestNavbarPrivada:
+    """Links da navbar (base_privada.html) em cache por seção e perfil"""
+
+    def _links_ativos(self, html: str) -> list:
+        return re.findall(r'nav-link active"\s*href="([^"]+)"', html)
+
+    def test_usuarios_da_mesma_secao_compartilham_fragmento(self):
+        cache_fragmentos.limpar()
+        template = obter_templates().env.get_template("base_privada.html")
+
+        primeiro = template.render(request=_request(1, "/tarefas/listar"))
+        antes = cache_fragmentos.obter_estatisticas()["acertos"]
+        segundo = template.render(request=_request(2, "/tarefas/editar/7"))
+
+        assert cache_fragmentos.obter_estatisticas()["acertos"] - antes == 1
+        assert self._links_ativos(primeiro) == self._links_ativos(segundo) == ["/tarefas/listar"]
+
+    def test_secao_e_perfil_separam_fragmentos(self):
+        cache_fragmentos.limpar()
+        template = obter_templates().env.get_template("base_privada.html")
+        template.render(request=_request(1, "/tarefas/listar"))
+
+        perfil = template.render(request=_request(1, "/usuario/perfil/visualizar"))
+        admin = template.render(request=_request(3, "/admin/backups/listar", "Administrador"))
+
+        assert self._links_ativos(perfil) == ["/usuario/perfil/visualizar"]
+        assert self._links_ativos(admin) == ["/admin/backups/listar"]
@@ -0,0 +1,68 @@
+"""
+Testes para o cache com expiração (util/cache_util.py).
+"""
+import time
+
+import pytest
+
+from util.cache_util import CacheTTL
+
+
+class TestCacheTTL:
+    """Testes de gravação, expiração e limite de itens"""
+
+    def test_obter_e_definir(self):
+        """Valor gravado deve ser retornado até expirar"""
+        cache = CacheTTL(ttl_segundos=60)
+
+        assert cache.obter("a") is None
+        cache.definir("a", 1)
+
+        assert cache.obter("a") == 1
+        assert cache.obter_estatisticas()["acertos"] == 1
+        assert cache.obter_estatisticas()["faltas"] == 1
+
+    def test_item_expira(self):
+        """Item deve sumir após o TTL"""
+        cache = CacheTTL(ttl_segundos=0.05)
+        cache.definir("a", 1)
+
+        time.sleep(0.1)
+
+        assert cache.obter("a") is None
+        assert cache.obter_estatisticas()["itens"] == 0
+
+    def test_descarta_menos_usado_ao_exceder_limite(self):
+        """Acima de max_itens, o item usado há mais tempo deve ser descartado"""
+        cache = CacheTTL(ttl_segundos=60, max_itens=2)
+        cache.definir("a", 1)
+        cache.definir("b", 2)
+        cache.obter("a")
+        cache.definir("c", 3)
+
+        assert cache.obter("b") is None
+        assert cache.obter("a") == 1
+        assert cache.obter("c") == 3
+
+    def test_ttl_zero_desativa(self):
+        """Com TTL zero nada deve ser armazenado"""
+        cache = CacheTTL(ttl_segundos=0)
+        cache.definir("a", 1)
+
+        assert cache.obter("a") is None
+
+    def test_ttl_por_item(self):
+        """TTL informado em definir prevalece sobre o do cache"""
+        cache = CacheTTL(ttl_segundos=60)
+        cache.definir("curto", 1, ttl_segundos=0.05)
+        cache.definir("nunca", 2, ttl_segundos=0)
+
+        time.sleep(0.1)
+
+        assert cache.obter("curto") is None
+        assert cache.obter("nunca") is None
+
+    def test_max_itens_invalido(self):
+        """max_itens deve ser positivo"""
+        with pytest.raises(ValueError):
+            CacheTTL(ttl_segundos=1, max_itens=0)
@@ -0,0 +1,380 @@
+"""
+Testes das rotas de chat (routes/chat_routes.py).
+Cobre criação de salas, envio/listagem de mensagens e contadores de não lidas.
+"""
+import asyncio
+
+from fastapi import status
+from starlette.requests import Request
+
+from model.usuario_model import Usuario
+from repo import usuario_repo, chat_mensagem_repo, chat_participante_repo, chat_sala_repo
+from routes import chat_routes
+from sql.chat_participante_sql import RECALCULAR_NAO_LIDAS
+from util.db_util import get_connection
+from util.perfis import Perfil
+from util.security import criar_hash_senha
+
+
+def _obter_id(email: str) -> int:
+    """Obtém ID de usuário pelo e-mail"""
+    return usuario_repo.obter_por_email(email).id
+
+
+def _inserir_usuario(nome: str, email: str, senha: str = "Senha@123") -> int:
+    """Insere usuário direto no banco (sem passar pelo rate limit de cadastro)"""
+    return usuario_repo.inserir(Usuario(
+        id=0,
+        nome=nome,
+        email=email,
+        senha=criar_hash_senha(senha),
+        perfil=Perfil.ESTUDANTE.value
+    ))
+
+
+def _criar_sala_com_participantes(usuario1_id: int, usuario2_id: int) -> str:
+    """Cria sala e participantes direto no banco"""
+    sala_id = chat_sala_repo.criar_ou_obter_sala(usuario1_id, usuario2_id).id
+    chat_participante_repo.adicionar_participante(sala_id, usuario1_id)
+    chat_participante_repo.adicionar_participante(sala_id, usuario2_id)
+    return sala_id
+
+
+def _request_stream(usuario_id: int, headers: dict, desconectado: bool = False) -> Request:
+    """Requisição autenticada para chamar a rota /chat/stream diretamente"""
+    async def receive():
+        if desconectado:
+            return {"type": "http.disconnect"}
+        await asyncio.Event().wait()
+
+    return Request({
+        "type": "http",
+        "method": "GET",
+        "path": "/chat/stream",
+        "query_string": b"",
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+        "session": {"usuario_logado": {"id": usuario_id, "perfil": Perfil.ESTUDANTE.value}},
+    }, receive)
+
+
+class TestSalas:
+    """Testes de criação de salas"""
+
+    def test_criar_sala_entre_usuarios(self, client, dois_usuarios, fazer_login):
+        """Deve criar sala com ID determinístico entre dois usuários"""
+        usuario1, usuario2 = dois_usuarios
+        fazer_login(usuario1["email"], usuario1["senha"])
+        id1, id2 = _obter_id(usuario1["email"]), _obter_id(usuario2["email"])
+
+        response = client.post("/chat/salas", data={"outro_usuario_id": id2})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["sala_id"] == f"{min(id1, id2)}_{max(id1, id2)}"
+
+
+class TestMensagens:
+    """Testes de envio e listagem de mensagens"""
+
+    def test_enviar_e_listar_mensagens(self, client, dois_usuarios, fazer_login):
+        """Mensagens enviadas devem aparecer na listagem da sala"""
+        usuario1, usuario2 = dois_usuarios
+        fazer_login(usuario1["email"], usuario1["senha"])
+        sala_id = client.post(
+            "/chat/salas", data={"outro_usuario_id": _obter_id(usuario2["email"])}
+        ).json()["sala_id"]
+
+        for texto in ["Olá", "Tudo bem?"]:
+            response = client.post("/chat/mensagens", data={"sala_id": sala_id, "mensagem": texto})
+            assert response.status_code == status.HTTP_200_OK
+
+        response = client.get(f"/chat/mensagens/{sala_id}")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [m["mensagem"] for m in response.json()["mensagens"]] == ["Olá", "Tudo bem?"]
+        assert response.json()["proximo_cursor"] is None
+
+    def test_paginacao_por_cursor(self, client, dois_usuarios, fazer_login):
+        """before_id deve percorrer o histórico para trás sem repetir nem pular mensagens"""
+        usuario1, usuario2 = dois_usuarios
+        fazer_login(usuario1["email"], usuario1["senha"])
+        id1 = _obter_id(usuario1["email"])
+        sala_id = client.post(
+            "/chat/salas", data={"outro_usuario_id": _obter_id(usuario2["email"])}
+        ).json()["sala_id"]
+        ids = [chat_mensagem_repo.inserir(sala_id, id1, f"Msg {i}").id for i in range(5)]
+
+        pagina = client.get(f"/chat/mensagens/{sala_id}?limit=2").json()
+        assert [m["id"] for m in pagina["mensagens"]] == ids[3:]
+        assert pagina["proximo_cursor"] == ids[3]
+
+        # Mensagem nova não desloca a página seguinte
+        chat_mensagem_repo.inserir(sala_id, id1, "Nova")
+        pagina = client.get(f"/chat/mensagens/{sala_id}?limit=2&before_id={pagina['proximo_cursor']}").json()
+        assert [m["id"] for m in pagina["mensagens"]] == ids[1:3]
+
+        pagina = client.get(f"/chat/mensagens/{sala_id}?limit=2&before_id={pagina['proximo_cursor']}").json()
+        assert [m["id"] for m in pagina["mensagens"]] == ids[:1]
+        assert pagina["proximo_cursor"] is None
+
+    def test_paginacao_apos_cursor(self, client, dois_usuarios, fazer_login):
+        """after_id deve trazer as mensagens seguintes em ordem crescente"""
+        usuario1, usuario2 = dois_usuarios
+        fazer_login(usuario1["email"], usuario1["senha"])
+        id1 = _obter_id(usuario1["email"])
+        sala_id = client.post(
+            "/chat/salas", data={"outro_usuario_id": _obter_id(usuario2["email"])}
+        ).json()["sala_id"]
+        ids = [chat_mensagem_repo.inserir(sala_id, id1, f"Msg {i}").id for i in range(4)]
+
+        pagina = client.get(f"/chat/mensagens/{sala_id}?limit=2&after_id={ids[0]}").json()
+        assert [m["id"] for m in pagina["mensagens"]] == ids[1:3]
+        assert pagina["proximo_cursor"] == ids[2]
+
+        response = client.get(f"/chat/mensagens/{sala_id}?before_id={ids[3]}&after_id={ids[0]}")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_contador_nao_lidas(self, client, dois_usuarios, fazer_login):
+        """Destinatário deve ver mensagens não lidas até marcá-las como lidas"""
+        usuario1, usuario2 = dois_usuarios
+        fazer_login(usuario1["email"], usuario1["senha"])
+        sala_id = client.post(
+            "/chat/salas", data={"outro_usuario_id": _obter_id(usuario2["email"])}
+        ).json()["sala_id"]
+        client.post("/chat/mensagens", data={"sala_id": sala_id, "mensagem": "Oi"})
+        client.post("/chat/mensagens", data={"sala_id": sala_id, "mensagem": "Oi de novo"})
+
+        fazer_login(usuario2["email"], usuario2["senha"])
+        assert client.get("/chat/mensagens/nao-lidas/total").json()["total"] == 2
+
+        client.post(f"/chat/mensagens/lidas/{sala_id}")
+        assert client.get("/chat/mensagens/nao-lidas/total").json()["total"] == 0
+
+
+class TestContadorNaoLidas:
+    """Testes do contador materializado de não lidas em chat_participante"""
+
+    def _criar_sala(self, client, fazer_login, dois_usuarios):
+        usuario1, usuario2 = dois_usuarios
+        fazer_login(usuario1["email"], usuario1["senha"])
+        id1, id2 = _obter_id(usuario1["email"]), _obter_id(usuario2["email"])
+        sala_id = client.post("/chat/salas", data={"outro_usuario_id": id2}).json()["sala_id"]
+        return sala_id, id1, id2
+
+    def test_contador_acompanha_insercao_leitura_e_exclusao(self, client, dois_usuarios, fazer_login):
+        """Inserir incrementa só os outros participantes, ler zera e excluir não lida decrementa"""
+        sala_id, id1, id2 = self._criar_sala(client, fazer_login, dois_usuarios)
+
+        mensagens = [chat_mensagem_repo.inserir(sala_id, id1, f"Msg {i}") for i in range(3)]
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, id2) == 3
+        assert chat_participante_repo.contar_mensagens_nao_lidas(sala_id, id1) == 0
+
+        chat_mensagem_repo.excluir(mensagens[0].id)
+        assert chat_participante_repo.contar_nao_lidas_total(id2) == 2
+
+        chat_mensagem_repo.marcar_como_lidas(sala_id, id2)
+        assert chat_participante_repo.contar_nao_lidas_total(id2) == 0
+
+        # Excluir mensagem já lida não deve deixar o contador negativo
+        chat_mensagem_repo.excluir(mensagens[1].id)
+        assert chat_participante_repo.contar_nao_lidas_total(id2) == 0
+
+    def test_contador_igual_ao_recalculo(self, client, dois_usuarios, fazer_login):
+        """Contador mantido incrementalmente deve bater com a contagem a partir das mensagens"""
+        sala_id, id1, id2 = self._criar_sala(client, fazer_login, dois_usuarios)
+        chat_mensagem_repo.inserir(sala_id, id1, "Oi")
+        chat_mensagem_repo.inserir(sala_id, id2, "Olá")
+        chat_participante_repo.atualizar_ultima_leitura(sala_id, id1)
+        chat_mensagem_repo.inserir(sala_id, id2, "Tudo bem?")
+
+        antes = {(p.usuario_id, p.nao_lidas) for p in chat_participante_repo.listar_por_sala(sala_id)}
+        with get_connection() as conn:
+            conn.execute(RECALCULAR_NAO_LIDAS)
+        depois = {(p.usuario_id, p.nao_lidas) for p in chat_participante_repo.listar_por_sala(sala_id)}
+
+        assert antes == depois == {(id1, 1), (id2, 1)}
+
+
+class TestConversas:
+    """Testes de listagem de conversas"""
+
+    def test_listar_conversas(self, client, dois_usuarios, fazer_login):
+        """Conversa deve trazer o outro participante e a última mensagem"""
+        usuario1, usuario2 = dois_usuarios
+        fazer_login(usuario1["email"], usuario1["senha"])
+        sala_id = client.post(
+            "/chat/salas", data={"outro_usuario_id": _obter_id(usuario2["email"])}
+        ).json()["sala_id"]
+        client.post("/chat/mensagens", data={"sala_id": sala_id, "mensagem": "Primeira"})
+        client.post("/chat/mensagens", data={"sala_id": sala_id, "mensagem": "Última"})
+
+        fazer_login(usuario2["email"], usuario2["senha"])
+        conversas = client.get("/chat/conversas").json()
+
+        assert len(conversas) == 1
+        assert conversas[0]["sala_id"] == sala_id
+        assert conversas[0]["outro_usuario"]["email"] == usuario1["email"]
+        assert conversas[0]["ultima_mensagem"]["mensagem"] == "Última"
+        assert conversas[0]["nao_lidas"] == 2
+
+    def test_conversas_ordenadas_e_paginadas(self, client, fazer_login):
+        """Conversas devem vir da mais recente para a mais antiga, paginadas no banco"""
+        dono_id = _inserir_usuario("Dono", "dono@example.com")
+        contatos = [_inserir_usuario(f"Contato {i}", f"contato{i}@example.com") for i in range(3)]
+
+        fazer_login("dono@example.com", "Senha@123")
+        for contato_id in contatos:
+            sala_id = client.post("/chat/salas", data={"outro_usuario_id": contato_id}).json()["sala_id"]
+            client.post("/chat/mensagens", data={"sala_id": sala_id, "mensagem": f"Oi {contato_id}"})
+
+        primeira_pagina = client.get("/chat/conversas?limit=2&offset=0").json()
+        segunda_pagina = client.get("/chat/conversas?limit=2&offset=2").json()
+
+        ids = [c["outro_usuario"]["id"] for c in primeira_pagina + segunda_pagina]
+        assert ids == list(reversed(contatos))
+        assert len(primeira_pagina) == 2
+        assert primeira_pagina[0]["ultima_mensagem"]["usuario_id"] == dono_id
+        assert primeira_pagina[0]["nao_lidas"] == 0
+
+
+class TestRetomadaStream:
+    """Testes de IDs de evento, Last-Event-ID e heartbeat do stream SSE"""
+
+    def test_listar_por_usuario_depois_de(self):
+        """Retomada traz mensagens posteriores de todas as salas do usuário, e só delas"""
+        id1, id2, id3 = (_inserir_usuario(f"U{i}", f"u{i}@example.com") for i in range(3))
+        sala_12 = _criar_sala_com_participantes(id1, id2)
+        sala_23 = _criar_sala_com_participantes(id2, id3)
+        primeira = chat_mensagem_repo.inserir(sala_12, id1, "antes")
+        segunda = chat_mensagem_repo.inserir(sala_23, id2, "outra sala")
+        terceira = chat_mensagem_repo.inserir(sala_12, id2, "depois")
+
+        assert [m.id for m in chat_mensagem_repo.listar_por_usuario_depois_de(id1, primeira.id)] == [terceira.id]
+        assert [m.id for m in chat_mensagem_repo.listar_por_usuario_depois_de(id2, 0)] == [
+            primeira.id, segunda.id, terceira.id
+        ]
+        assert len(chat_mensagem_repo.listar_por_usuario_depois_de(id2, 0, limit=2)) == 2
+
+    def test_formato_dos_eventos(self):
+        """Mensagens levam id SSE; demais eventos não"""
+        evento = {"tipo": "nova_mensagem", "mensagem": {"id": 42}}
+
+        assert chat_routes._formatar_sse(evento).startswith("id: 42\ndata: ")
+        assert chat_routes._formatar_sse({"tipo": "atualizar_contador"}).startswith("data: ")
+
+    async def test_reenvia_mensagens_perdidas(self, monkeypatch):
+        """Com Last-Event-ID, o stream reenvia o que foi enviado durante a desconexão"""
+        monkeypatch.setattr(chat_routes, "CHAT_SSE_HEARTBEAT_SEGUNDOS", 0.05)
+        id1, id2 = _inserir_usuario("U1", "u1@example.com"), _inserir_usuario("U2", "u2@example.com")
+        sala_id = _criar_sala_com_participantes(id1, id2)
+        ultima_recebida = chat_mensagem_repo.inserir(sala_id, id2, "recebida")
+        perdidas = [chat_mensagem_repo.inserir(sala_id, id2, f"perdida {i}") for i in range(2)]
+
+        response = await chat_routes.stream_mensagens(
+            request=_request_stream(id1, {"Last-Event-ID": str(ultima_recebida.id)})
+        )
+        stream = response.body_iterator
+        try:
+            assert (await stream.__anext__()).startswith("retry: ")
+            reenvio = await stream.__anext__()
+            assert await asyncio.wait_for(stream.__anext__(), 1) == ": heartbeat\n\n"
+        finally:
+            await stream.aclose()
+            await chat_routes.chat_manager.encerrar()
+
+        assert [linha for linha in reenvio.split("\n") if linha.startswith("id: ")] == [
+            f"id: {m.id}" for m in perdidas
+        ]
+
+    async def test_libera_conexao_fechada(self, monkeypatch):
+        """No heartbeat, conexão já encerrada pelo cliente é liberada"""
+        monkeypatch.setattr(chat_routes, "CHAT_SSE_HEARTBEAT_SEGUNDOS", 0.05)
+        usuario_id = _inserir_usuario("U1", "u1@example.com")
+
+        response = await chat_routes.stream_mensagens(request=_request_stream(usuario_id, {}, desconectado=True))
+        partes = [parte async for parte in response.body_iterator]
+        await chat_routes.chat_manager.encerrar()
+
+        assert len(partes) == 1 and partes[0].startswith("retry: ")
+        assert not chat_routes.chat_manager.is_connected(usuario_id)
+
+
+class TestPresencaEDigitando:
+    """Testes das rotas de presença e digitação"""
+
+    def test_consultar_presenca(self, client, dois_usuarios, fazer_login):
+        """Consulta em lote retorna o estado de cada contato"""
+        usuario1, usuario2 = dois_usuarios
+        fazer_login(usuario1["email"], usuario1["senha"])
+        id2 = _obter_id(usuario2["email"])
+        client.post("/chat/salas", data={"outro_usuario_id": id2})
+
+        response = client.get(f"/chat/presenca?ids={id2},999999")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {"presenca": {str(id2): False}}
+
+    def test_presenca_de_quem_nao_e_contato_omitida(self, client, dois_usuarios, fazer_login):
+        """Sem sala em comum, a presença do outro usuário não é informada"""
+        usuario1, usuario2 = dois_usuarios
+        fazer_login(usuario1["email"], usuario1["senha"])
+
+        response = client.get(f"/chat/presenca?ids={_obter_id(usuario2['email'])}")
+
+        assert response.json() == {"presenca": {}}
+
+    def test_presenca_desativada(self, client, dois_usuarios, fazer_login, monkeypatch):
+        """Com barramento entre workers, a presença não é informada"""
+        monkeypatch.setattr(chat_routes.chat_manager, "presenca_ativa", False)
+        usuario1, usuario2 = dois_usuarios
+        fazer_login(usuario1["email"], usuario1["senha"])
+        id2 = _obter_id(usuario2["email"])
+        client.post("/chat/salas", data={"outro_usuario_id": id2})
+
+        response = client.get(f"/chat/presenca?ids={id2}")
+
+        assert response.json() == {"presenca": {}}
+
+    def test_consultar_presenca_ids_invalidos(self, client, dois_usuarios, fazer_login):
+        """IDs não numéricos ou em excesso são recusados"""
+        usuario1, _ = dois_usuarios
+        fazer_login(usuario1["email"], usuario1["senha"])
+
+        assert client.get("/chat/presenca?ids=1,abc").status_code == status.HTTP_400_BAD_REQUEST
+        ids = ",".join(str(i) for i in range(chat_routes.PRESENCA_MAX_IDS + 1))
+        assert client.get(f"/chat/presenca?ids={ids}").status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_digitando_limitado(self, client, dois_usuarios, fazer_login):
+        """Segundo aviso dentro do intervalo não é publicado"""
+        usuario1, usuario2 = dois_usuarios
+        fazer_login(usuario1["email"], usuario1["senha"])
+        sala_id = client.post(
+            "/chat/salas", data={"outro_usuario_id": _obter_id(usuario2["email"])}
+        ).json()["sala_id"]
+
+        primeiro = client.post(f"/chat/digitando/{sala_id}")
+        segundo = client.post(f"/chat/digitando/{sala_id}")
+
+        assert primeiro.json() == {"publicado": True}
+        assert segundo.json() == {"publicado": False}
+
+    def test_digitando_em_sala_alheia(self, client, dois_usuarios, fazer_login):
+        """Não participante não pode publicar digitação"""
+        usuario1, _ = dois_usuarios
+        fazer_login(usuario1["email"], usuario1["senha"])
+
+        response = client.post("/chat/digitando/998_999", follow_redirects=False)
+
+        assert response.status_code in [status.HTTP_303_SEE_OTHER, status.HTTP_403_FORBIDDEN]
+
+    def test_digitando_em_sala_alheia_sempre_recusado(self, client, dois_usuarios, fazer_login):
+        """Tentativas recusadas não contam para o limite de digitação"""
+        usuario1, usuario2 = dois_usuarios
+        fazer_login(usuario1["email"], usuario1["senha"])
+        id1, id2 = _obter_id(usuario1["email"]), _obter_id(usuario2["email"])
+        sala_alheia = f"{min(id1, id2) + 1000}_{max(id1, id2) + 1000}"
+
+        respostas = [client.post(f"/chat/digitando/{sala_alheia}", follow_redirects=False) for _ in range(2)]
+
+        assert respostas[0].status_code in [status.HTTP_303_SEE_OTHER, status.HTTP_403_FORBIDDEN]
+        assert respostas[1].status_code == respostas[0].status_code
+        assert not chat_routes.chat_manager.digitando_recente(id1, sala_alheia)
@@ -0,0 +1,100 @@
+"""
+Testes da fila limitada de eventos SSE (util/chat_fila.py).
+"""
+import asyncio
+
+import pytest
+
+from util.chat_fila import COALESCIDO, DESCARTADO, ENFILEIRADO, FilaEventos
+
+
+def _contador(sala_id: str, total: int) -> dict:
+    return {"tipo": "atualizar_contador", "sala_id": sala_id, "total": total}
+
+
+class TestFilaEventos:
+    """Testes de limite, política de descarte e agrupamento"""
+
+    def test_mantem_ordem_de_chegada(self):
+        fila = FilaEventos(10)
+        for i in range(3):
+            assert fila.colocar({"id": i}) == ENFILEIRADO
+
+        assert [fila.get_nowait()["id"] for _ in range(3)] == [0, 1, 2]
+        assert fila.empty()
+
+    def test_descartar_antigo(self):
+        fila = FilaEventos(2, politica="descartar_antigo")
+        fila.colocar({"id": 1})
+        fila.colocar({"id": 2})
+
+        assert fila.colocar({"id": 3}) == DESCARTADO
+        assert [fila.get_nowait()["id"] for _ in range(2)] == [2, 3]
+
+    def test_descartar_novo(self):
+        fila = FilaEventos(2, politica="descartar_novo")
+        fila.colocar({"id": 1})
+        fila.colocar({"id": 2})
+
+        assert fila.colocar({"id": 3}) == DESCARTADO
+        assert [fila.get_nowait()["id"] for _ in range(2)] == [1, 2]
+
+    def test_agrupa_contador_da_mesma_sala(self):
+        fila = FilaEventos(10)
+        fila.colocar(_contador("1_2", 1))
+        fila.colocar({"tipo": "nova_mensagem", "sala_id": "1_2"})
+
+        assert fila.colocar(_contador("1_2", 5)) == COALESCIDO
+        assert fila.colocar(_contador("1_3", 2)) == ENFILEIRADO
+
+        eventos = [fila.get_nowait() for _ in range(fila.qsize())]
+        # O agrupado fica na posição original, com o valor mais recente
+        assert eventos == [_contador("1_2", 5), {"tipo": "nova_mensagem", "sala_id": "1_2"}, _contador("1_3", 2)]
+
+    def test_agrupa_de_novo_apos_envio(self):
+        fila = FilaEventos(10)
+        fila.colocar(_contador("1_2", 1))
+        fila.get_nowait()
+
+        assert fila.colocar(_contador("1_2", 2)) == ENFILEIRADO
+
+    def test_descarte_do_agrupado_libera_a_chave(self):
+        fila = FilaEventos(1)
+        fila.colocar(_contador("1_2", 1))
+        fila.colocar({"id": 1})
+
+        assert fila.colocar(_contador("1_2", 2)) == DESCARTADO
+        assert fila.get_nowait() == _contador("1_2", 2)
+
+    def test_parametros_invalidos(self):
+        with pytest.raises(ValueError):
+            FilaEventos(0)
+        with pytest.raises(ValueError):
+            FilaEventos(10, politica="bloquear")
+
+    def test_get_nowait_vazia(self):
+        with pytest.raises(asyncio.QueueEmpty):
+            FilaEventos(1).get_nowait()
+
+
+class TestObterLote:
+    """Testes da leitura em lote usada pelo stream SSE"""
+
+    async def test_devolve_todos_os_pendentes(self):
+        fila = FilaEventos(10)
+        for i in range(5):
+            fila.colocar({"id": i})
+
+        assert [e["id"] for e in await fila.obter_lote(3)] == [0, 1, 2]
+        assert [e["id"] for e in await fila.obter_lote(3)] == [3, 4]
+
+    async def test_aguarda_primeiro_evento(self):
+        fila = FilaEventos(10)
+        tarefa = asyncio.create_task(fila.obter_lote(10))
+        await asyncio.sleep(0.01)
+        assert not tarefa.done()
+
+        fila.colocar({"id": 1})
+        fila.colocar({"id": 2})
+
+        assert await asyncio.wait_for(tarefa, 1) == [{"id": 1}, {"id": 2}]
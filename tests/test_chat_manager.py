@@ -0,0 +1,218 @@
+"""
+Testes do gerenciador de conexões SSE do chat (util/chat_manager.py).
+"""
+import asyncio
+
+import pytest
+
+from util.chat_manager import ChatManager
+from util.chat_pubsub import BarramentoLocal, BarramentoSQLite
+
+
+@pytest.fixture
+async def criar_manager():
+    """
+    Fábrica de ChatManager isolado do singleton global, com barramento em processo.
+    Encerra os managers criados (e seus avisos de offline pendentes) ao final do teste.
+    """
+    criados = []
+
+    def _criar(tamanho_fila: int = 100, contatos: dict = None, **kwargs) -> ChatManager:
+        contatos = contatos or {}
+        manager = ChatManager(
+            barramento=BarramentoLocal(),
+            tamanho_fila=tamanho_fila,
+            listar_contatos=lambda usuario_id: contatos.get(usuario_id, []),
+            **kwargs
+        )
+        criados.append(manager)
+        return manager
+
+    yield _criar
+
+    for manager in criados:
+        await manager.encerrar()
+
+
+def _eventos(fila) -> list:
+    """Retira todos os eventos pendentes da fila"""
+    return [fila.get_nowait() for _ in range(fila.qsize())]
+
+
+class TestConexoesMultiplas:
+    """Testes de várias conexões SSE simultâneas do mesmo usuário"""
+
+    async def test_todas_as_abas_recebem(self, criar_manager):
+        manager = criar_manager()
+        aba1 = await manager.connect(1)
+        aba2 = await manager.connect(1)
+
+        await manager.broadcast_para_sala("1_2", {"tipo": "nova_mensagem"})
+
+        assert aba1 is not aba2
+        assert aba1.get_nowait() == {"tipo": "nova_mensagem"}
+        assert aba2.get_nowait() == {"tipo": "nova_mensagem"}
+
+    async def test_desconectar_uma_aba_mantem_a_outra(self, criar_manager):
+        manager = criar_manager()
+        aba1 = await manager.connect(1)
+        aba2 = await manager.connect(1)
+
+        await manager.disconnect(1, aba1)
+        await manager.broadcast_para_sala("1_2", {"tipo": "nova_mensagem"})
+
+        assert manager.is_connected(1)
+        assert aba1.empty()
+        assert aba2.get_nowait() == {"tipo": "nova_mensagem"}
+
+    async def test_desconectar_ultima_aba_remove_usuario(self, criar_manager):
+        manager = criar_manager()
+        aba = await manager.connect(1)
+
+        await manager.disconnect(1, aba)
+
+        assert not manager.is_connected(1)
+        assert manager.obter_estatisticas()["total_usuarios_ativos"] == 0
+
+    async def test_desconectar_sem_fila_remove_todas(self, criar_manager):
+        manager = criar_manager()
+        await manager.connect(1)
+        await manager.connect(1)
+
+        await manager.disconnect(1)
+
+        assert not manager.is_connected(1)
+
+    async def test_fila_cheia_nao_bloqueia_as_demais(self, criar_manager):
+        manager = criar_manager(tamanho_fila=1)
+        lenta = await manager.connect(1)
+        rapida = await manager.connect(2)
+
+        await manager.broadcast_para_sala("1_2", {"id": 1})
+        rapida.get_nowait()
+        await manager.broadcast_para_sala("1_2", {"id": 2})
+
+        assert lenta.qsize() == 1
+        assert lenta.get_nowait() == {"id": 2}
+        assert rapida.get_nowait() == {"id": 2}
+        assert manager.obter_estatisticas()["eventos"]["descartados"] == 1
+
+    async def test_estatisticas_contam_conexoes(self, criar_manager):
+        manager = criar_manager()
+        await manager.connect(1)
+        await manager.connect(1)
+        await manager.connect(2)
+
+        estatisticas = manager.obter_estatisticas()
+
+        assert estatisticas["total_conexoes"] == 3
+        assert estatisticas["total_usuarios_ativos"] == 2
+        assert estatisticas["conexoes_por_usuario"] == {1: 2, 2: 1}
+
+    async def test_metricas_de_agrupamento(self, criar_manager):
+        manager = criar_manager()
+        fila = await manager.connect(1)
+
+        await manager.broadcast_para_sala("1_2", {"tipo": "atualizar_contador", "sala_id": "1_2"})
+        await manager.broadcast_para_sala("1_2", {"tipo": "atualizar_contador", "sala_id": "1_2"})
+
+        assert fila.qsize() == 1
+        assert manager.obter_estatisticas()["eventos"] == {"enfileirados": 1, "coalescidos": 1, "descartados": 0}
+
+
+class TestPresenca:
+    """Testes dos eventos e da consulta de presença"""
+
+    async def test_anuncia_online_e_offline_aos_contatos(self, criar_manager):
+        manager = criar_manager(contatos={1: [2]}, atraso_offline=0.05)
+        fila_contato = await manager.connect(2)
+
+        aba = await manager.connect(1)
+        await asyncio.sleep(0.01)
+        await manager.disconnect(1, aba)
+        await asyncio.sleep(0.1)
+
+        assert _eventos(fila_contato) == [
+            {"tipo": "presenca", "usuario_id": 1, "online": True},
+            {"tipo": "presenca", "usuario_id": 1, "online": False},
+        ]
+
+    async def test_reconexao_rapida_nao_gera_eventos(self, criar_manager):
+        manager = criar_manager(contatos={1: [2]}, atraso_offline=0.1)
+        fila_contato = await manager.connect(2)
+        aba = await manager.connect(1)
+        await asyncio.sleep(0.01)
+        _eventos(fila_contato)
+
+        await manager.disconnect(1, aba)
+        await manager.connect(1)
+        await asyncio.sleep(0.2)
+
+        assert _eventos(fila_contato) == []
+        assert manager.obter_presenca([1]) == {1: True}
+
+    async def test_segunda_aba_nao_repete_online(self, criar_manager):
+        manager = criar_manager(contatos={1: [2]})
+        fila_contato = await manager.connect(2)
+
+        await manager.connect(1)
+        await manager.connect(1)
+        await asyncio.sleep(0.01)
+
+        assert len(_eventos(fila_contato)) == 1
+
+    async def test_consulta_em_lote(self, criar_manager):
+        manager = criar_manager(atraso_offline=0.05)
+        await manager.connect(1)
+        aba = await manager.connect(2)
+        await manager.disconnect(2, aba)
+
+        # Aviso de offline ainda pendente: continua online
+        assert manager.obter_presenca([1, 2, 3]) == {1: True, 2: True, 3: False}
+        await asyncio.sleep(0.1)
+        assert manager.obter_presenca([2]) == {2: False}
+
+    async def test_desativada_com_barramento_entre_workers(self, criar_manager):
+        manager = criar_manager(contatos={1: [2]}, atraso_offline=0.01, presenca=False)
+        fila_contato = await manager.connect(2)
+
+        aba = await manager.connect(1)
+        await manager.disconnect(1, aba)
+        await asyncio.sleep(0.05)
+
+        assert _eventos(fila_contato) == []
+        assert manager.obter_presenca([1, 2]) == {}
+
+    def test_ativada_apenas_com_barramento_local(self):
+        assert ChatManager(barramento=BarramentoLocal()).presenca_ativa
+        assert not ChatManager(barramento=BarramentoSQLite()).presenca_ativa
+
+
+class TestDigitando:
+    """Testes do limite e da entrega de eventos de digitação"""
+
+    def test_limita_por_usuario_e_sala(self, criar_manager):
+        manager = criar_manager(intervalo_digitando=60)
+
+        assert manager.registrar_digitando(1, "1_2")
+        assert not manager.registrar_digitando(1, "1_2")
+        assert manager.registrar_digitando(1, "1_3")
+        assert manager.registrar_digitando(2, "1_2")
+
+    def test_consulta_nao_registra(self, criar_manager):
+        manager = criar_manager(intervalo_digitando=60)
+
+        assert not manager.digitando_recente(1, "1_2")
+        assert not manager.digitando_recente(1, "1_2")
+        manager.registrar_digitando(1, "1_2")
+        assert manager.digitando_recente(1, "1_2")
+
+    async def test_evento_vai_apenas_ao_outro_participante(self, criar_manager):
+        manager = criar_manager()
+        fila_autor = await manager.connect(1)
+        fila_outro = await manager.connect(2)
+
+        await manager.publicar_digitando(1, "1_2")
+
+        assert fila_autor.empty()
+        assert fila_outro.get_nowait() == {"tipo": "digitando", "sala_id": "1_2", "usuario_id": 1}
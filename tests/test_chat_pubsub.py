@@ -0,0 +1,133 @@
+"""
+Testes do barramento de eventos do chat (util/chat_pubsub.py).
+"""
+import asyncio
+
+import pytest
+
+from repo import chat_evento_repo
+from util.chat_manager import ChatManager
+from util.chat_pubsub import BarramentoChat, BarramentoLocal, BarramentoSQLite, criar_barramento
+
+
+class _Coletor:
+    """Função de entrega que registra (usuario_id, evento) recebidos"""
+
+    def __init__(self):
+        self.recebidos = []
+
+    async def __call__(self, usuario_id: int, evento: dict):
+        self.recebidos.append((usuario_id, evento))
+
+
+async def _aguardar(condicao, timeout: float = 2.0):
+    """Aguarda até a condição ser verdadeira ou o tempo esgotar"""
+    limite = asyncio.get_running_loop().time() + timeout
+    while not condicao():
+        if asyncio.get_running_loop().time() > limite:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+class TestBarramentoLocal:
+    """Testes do barramento em processo"""
+
+    async def test_entrega_para_cada_usuario(self):
+        barramento = BarramentoLocal()
+        coletor = _Coletor()
+        await barramento.iniciar(coletor)
+
+        await barramento.publicar([1, 2], {"tipo": "nova_mensagem"})
+
+        assert coletor.recebidos == [(1, {"tipo": "nova_mensagem"}), (2, {"tipo": "nova_mensagem"})]
+        assert barramento.obter_estatisticas()["publicados"] == 1
+
+
+class TestBarramentoSQLite:
+    """Testes do barramento entre processos via tabela chat_evento"""
+
+    async def test_evento_chega_ao_outro_worker_sem_duplicar(self):
+        worker_a = BarramentoSQLite(intervalo_segundos=0.02)
+        worker_b = BarramentoSQLite(intervalo_segundos=0.02)
+        coletor_a, coletor_b = _Coletor(), _Coletor()
+        await worker_a.iniciar(coletor_a)
+        await worker_b.iniciar(coletor_b)
+        try:
+            await worker_a.publicar([1, 2], {"tipo": "nova_mensagem", "id": 7})
+
+            assert await _aguardar(lambda: len(coletor_b.recebidos) == 2)
+            await asyncio.sleep(0.1)
+
+            assert coletor_b.recebidos == [(1, {"tipo": "nova_mensagem", "id": 7}),
+                                           (2, {"tipo": "nova_mensagem", "id": 7})]
+            # O worker que publicou entrega direto, sem reler o próprio evento
+            assert len(coletor_a.recebidos) == 2
+            assert worker_a.obter_estatisticas()["recebidos"] == 0
+        finally:
+            await worker_a.encerrar()
+            await worker_b.encerrar()
+
+    async def test_ignora_eventos_anteriores_ao_inicio(self):
+        chat_evento_repo.criar_tabela()
+        chat_evento_repo.inserir([1], {"tipo": "antigo"}, "outro-worker")
+
+        barramento = BarramentoSQLite(intervalo_segundos=0.02)
+        coletor = _Coletor()
+        await barramento.iniciar(coletor)
+        try:
+            await asyncio.sleep(0.1)
+            assert coletor.recebidos == []
+        finally:
+            await barramento.encerrar()
+
+    async def test_remove_eventos_expirados(self):
+        barramento = BarramentoSQLite(intervalo_segundos=0.02, retencao_segundos=0)
+        await barramento.iniciar(_Coletor())
+        try:
+            # publicar só retorna depois de gravar o evento
+            await barramento.publicar([1], {"tipo": "nova_mensagem"})
+
+            assert await _aguardar(lambda: chat_evento_repo.listar_apos(0, "outro-worker") == [])
+        finally:
+            await barramento.encerrar()
+
+
+class TestChatManagerBarramento:
+    """Testes do broadcast do ChatManager através do barramento"""
+
+    async def test_broadcast_entrega_aos_conectados(self):
+        manager = ChatManager(barramento=BarramentoLocal())
+        fila = await manager.connect(1)
+
+        await manager.broadcast_para_sala("1_2", {"tipo": "nova_mensagem"})
+
+        assert fila.get_nowait() == {"tipo": "nova_mensagem"}
+        assert manager.obter_estatisticas()["barramento"]["publicados"] == 1
+        await manager.encerrar()
+
+    async def test_sala_invalida_nao_publica(self):
+        manager = ChatManager(barramento=BarramentoLocal())
+
+        await manager.broadcast_para_sala("invalida", {"tipo": "nova_mensagem"})
+
+        assert manager.obter_estatisticas()["barramento"]["publicados"] == 0
+
+
+class TestCriarBarramento:
+    """Testes da fábrica de barramentos"""
+
+    def test_tipos_suportados(self):
+        assert isinstance(criar_barramento("local"), BarramentoLocal)
+        assert isinstance(criar_barramento("sqlite"), BarramentoSQLite)
+
+    def test_tipo_invalido(self):
+        with pytest.raises(ValueError):
+            criar_barramento("kafka")
+
+    def test_implementacao_precisa_definir_publicar(self):
+        class SemPublicar(BarramentoChat):
+            pass
+
+        with pytest.raises(TypeError):
+            SemPublicar()
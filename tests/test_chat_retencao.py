@@ -0,0 +1,214 @@
+"""
+Testes da retenção de mensagens do chat (util/chat_retencao.py,
+chat_mensagem_repo.arquivar_lote e leitura transparente do arquivo).
+"""
+from datetime import timedelta
+
+import pytest
+
+from model.usuario_model import Usuario
+from repo import chat_mensagem_repo, chat_participante_repo, chat_sala_repo, usuario_repo
+from util import db_util
+from util.chat_retencao import AgendadorRetencao, arquivar_mensagens
+from util.datetime_util import agora
+from util.db_util import get_connection
+
+
+def _inserir_usuario(email: str) -> int:
+    """Insere usuário direto no banco"""
+    return usuario_repo.inserir(Usuario(id=0, nome=email, email=email, senha="x", perfil="ESTUDANTE"))
+
+
+def _contar(tabela: str) -> int:
+    with get_connection() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0]
+
+
+@pytest.fixture
+def sala_com_mensagens():
+    """Sala com 10 mensagens: 8 enviadas há 200 dias e as 2 últimas agora"""
+    id1, id2 = _inserir_usuario("a@example.com"), _inserir_usuario("b@example.com")
+    sala_id = chat_sala_repo.criar_ou_obter_sala(id1, id2).id
+    chat_participante_repo.adicionar_participante(sala_id, id1)
+    chat_participante_repo.adicionar_participante(sala_id, id2)
+
+    ids = [chat_mensagem_repo.inserir(sala_id, id1, f"m{i}").id for i in range(10)]
+    with get_connection() as conn:
+        conn.execute(
+            "UPDATE chat_mensagem SET data_envio = ? WHERE id <= ?",
+            (agora() - timedelta(days=200), ids[7])
+        )
+    return sala_id, ids
+
+
+class TestArquivamento:
+    """Testes do job de arquivamento"""
+
+    def test_arquiva_fora_da_janela_em_lotes(self, sala_com_mensagens):
+        """Mensagens além das N mais recentes e antigas o suficiente vão para o arquivo"""
+        sala_id, ids = sala_com_mensagens
+
+        arquivadas = arquivar_mensagens(manter=3, idade_dias=30, lote=2)
+
+        assert arquivadas == 7
+        assert _contar("chat_mensagem") == 3
+        assert _contar("chat_mensagem_arquivo") == 7
+        assert chat_mensagem_repo.contar_por_sala(sala_id) == 10
+
+    def test_mensagens_recentes_ficam_mesmo_fora_da_janela(self, sala_com_mensagens):
+        """Idade mínima prevalece sobre a janela por sala"""
+        arquivadas = arquivar_mensagens(manter=1, idade_dias=30, lote=100)
+
+        # As 2 mensagens de agora ficam; as 8 antigas saem
+        assert arquivadas == 8
+        assert _contar("chat_mensagem") == 2
+
+    def test_sala_dentro_da_janela_nao_e_tocada(self, sala_com_mensagens):
+        assert arquivar_mensagens(manter=50, idade_dias=30, lote=100) == 0
+
+    def test_execucao_repetida_nao_duplica(self, sala_com_mensagens):
+        arquivar_mensagens(manter=3, idade_dias=30, lote=100)
+
+        assert arquivar_mensagens(manter=3, idade_dias=30, lote=100) == 0
+        assert _contar("chat_mensagem_arquivo") == 7
+
+
+class TestLeituraDoArquivo:
+    """Testes da paginação contínua entre tabela principal e arquivo"""
+
+    def test_rolar_para_tras_atravessa_o_arquivo(self, sala_com_mensagens):
+        sala_id, ids = sala_com_mensagens
+        arquivar_mensagens(manter=3, idade_dias=30, lote=100)
+
+        paginas = []
+        before_id = None
+        while True:
+            pagina = chat_mensagem_repo.listar_por_sala(sala_id, limit=4, before_id=before_id)
+            if not pagina:
+                break
+            paginas.append([m.id for m in pagina])
+            before_id = pagina[0].id
+
+        assert paginas == [ids[6:10], ids[2:6], ids[0:2]]
+
+    def test_buscar_novas_a_partir_do_arquivo(self, sala_com_mensagens):
+        sala_id, ids = sala_com_mensagens
+        arquivar_mensagens(manter=3, idade_dias=30, lote=100)
+
+        pagina = chat_mensagem_repo.listar_por_sala(sala_id, limit=4, after_id=ids[4])
+
+        assert [m.id for m in pagina] == ids[5:9]
+
+    def test_sala_totalmente_arquivada(self, sala_com_mensagens):
+        sala_id, ids = sala_com_mensagens
+        with get_connection() as conn:
+            conn.execute("UPDATE chat_mensagem SET data_envio = ?", (agora() - timedelta(days=200),))
+        arquivar_mensagens(manter=0, idade_dias=30, lote=100)
+
+        assert [m.id for m in chat_mensagem_repo.listar_por_sala(sala_id, limit=3)] == ids[7:10]
+
+    def test_excluir_sala_remove_arquivadas(self, sala_com_mensagens):
+        sala_id, _ = sala_com_mensagens
+        arquivar_mensagens(manter=3, idade_dias=30, lote=100)
+
+        chat_sala_repo.excluir(sala_id)
+
+        assert _contar("chat_mensagem_arquivo") == 0
+
+
+class TestEscritaNoArquivo:
+    """Mensagens arquivadas continuam sendo marcadas como lidas e podem ser excluídas"""
+
+    def test_marcar_como_lidas_alcanca_o_arquivo(self, sala_com_mensagens):
+        sala_id, ids = sala_com_mensagens
+        arquivar_mensagens(manter=3, idade_dias=30, lote=100)
+        with get_connection() as conn:
+            leitor = conn.execute(
+                "SELECT usuario_id FROM chat_participante WHERE sala_id = ? AND usuario_id != "
+                "(SELECT usuario_id FROM chat_mensagem WHERE id = ?)", (sala_id, ids[-1])
+            ).fetchone()[0]
+
+        chat_mensagem_repo.marcar_como_lidas(sala_id, leitor)
+
+        mensagens = chat_mensagem_repo.listar_por_sala(sala_id, limit=10)
+        assert len(mensagens) == 10
+        assert all(m.lida_em is not None for m in mensagens)
+
+    def test_excluir_mensagem_arquivada(self, sala_com_mensagens):
+        sala_id, ids = sala_com_mensagens
+        arquivar_mensagens(manter=3, idade_dias=30, lote=100)
+
+        assert chat_mensagem_repo.excluir(ids[0])
+        assert not chat_mensagem_repo.excluir(ids[0])
+        assert ids[0] not in [m.id for m in chat_mensagem_repo.listar_por_sala(sala_id, limit=10)]
+        assert _contar("chat_mensagem_arquivo") == 6
+
+
+class TestLiberarEspaco:
+    """Testes de incremental_vacuum e da conversão explícita (db_util)"""
+
+    @pytest.fixture
+    def banco_temporario(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(db_util, "DATABASE_PATH", str(tmp_path / "vacuum.db"))
+        yield
+        db_util.fechar_pool()
+
+    def _encher_e_esvaziar(self):
+        with get_connection() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS lixo (dado TEXT)")
+            conn.executemany("INSERT INTO lixo VALUES (?)", [("x" * 1000,)] * 2000)
+        with get_connection() as conn:
+            conn.execute("DELETE FROM lixo")
+
+    def test_job_nunca_executa_vacuum_completo(self, banco_temporario):
+        self._encher_e_esvaziar()
+
+        resultado = db_util.liberar_espaco(paginas=100, limiar_livres=0.2)
+
+        assert resultado["acao"] == "conversao_pendente"
+        assert resultado["paginas_livres_depois"] == resultado["paginas_livres_antes"]
+        assert db_util.obter_espaco_banco()["auto_vacuum"] == "NONE"
+
+    def test_conversao_explicita_ativa_modo_incremental(self, banco_temporario):
+        self._encher_e_esvaziar()
+
+        resultado = db_util.converter_para_vacuum_incremental()
+
+        assert resultado["auto_vacuum"] == "INCREMENTAL"
+        assert resultado["paginas_depois"] < resultado["paginas_antes"]
+        assert db_util.obter_espaco_banco()["paginas_livres"] == 0
+
+    def test_incremental_libera_no_maximo_n_paginas(self, banco_temporario):
+        self._encher_e_esvaziar()
+        db_util.converter_para_vacuum_incremental()
+        self._encher_e_esvaziar()
+
+        resultado = db_util.liberar_espaco(paginas=100, limiar_livres=0.2)
+
+        assert resultado["acao"] == "incremental"
+        assert resultado["paginas_livres_antes"] - resultado["paginas_livres_depois"] == 100
+
+    def test_abaixo_do_limiar_nao_faz_nada(self, banco_temporario):
+        self._encher_e_esvaziar()
+
+        assert db_util.liberar_espaco(paginas=100, limiar_livres=1.1)["acao"] == "nenhuma"
+
+
+class TestAgendadorRetencao:
+    """Testes do agendamento do job"""
+
+    async def test_desativado_com_intervalo_zero(self):
+        agendador = AgendadorRetencao(intervalo_minutos=0)
+
+        await agendador.iniciar()
+
+        assert not agendador.obter_estatisticas()["ativo"]
+
+    async def test_iniciar_e_encerrar(self):
+        agendador = AgendadorRetencao(intervalo_minutos=60)
+
+        await agendador.iniciar()
+        assert agendador.obter_estatisticas()["ativo"]
+
+        await agendador.encerrar()
+        assert not agendador.obter_estatisticas()["ativo"]
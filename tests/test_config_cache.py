@@ -0,0 +1,212 @@
+"""
+Testes do cache de configurações (util/config_cache.py): carga em lote,
+propagação entre workers pela versão no banco e TTL.
+"""
+import sqlite3
+import threading
+
+import pytest
+
+from repo import configuracao_repo
+from util.config import CONFIG_CACHE_TTL_SEGUNDOS, CONFIG_CACHE_VERIFICAR_SEGUNDOS
+from util.config_cache import ConfigCache, config
+
+
+class _Relogio:
+    """Relógio monotônico controlado pelo teste (segundos)"""
+
+    def __init__(self):
+        self.agora = 1000.0
+
+    def __call__(self) -> float:
+        return self.agora
+
+    def avancar(self, segundos: float):
+        self.agora += segundos
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    relogio = _Relogio()
+    monkeypatch.setattr(ConfigCache, "_relogio", relogio)
+    config.limpar()
+    yield relogio
+    config.limpar()
+
+
+def _gravar_em_outro_worker(chave: str, valor: str):
+    """Escrita direta no banco, sem passar pelo cache deste processo"""
+    configuracao_repo.inserir_ou_atualizar(chave, valor)
+
+
+class TestCargaEmLote:
+    """Testes da carga de todas as configurações em uma consulta"""
+
+    def test_uma_consulta_atende_todas_as_chaves(self, relogio, monkeypatch):
+        _gravar_em_outro_worker("teste_a", "1")
+        _gravar_em_outro_worker("teste_b", "2")
+        cargas = []
+        obter_valores = configuracao_repo.obter_valores
+        monkeypatch.setattr(configuracao_repo, "obter_valores", lambda: cargas.append(1) or obter_valores())
+        monkeypatch.setattr(configuracao_repo, "obter_por_chave",
+                            lambda chave: pytest.fail("consulta por chave"))
+
+        valores = [config.obter("teste_a"), config.obter("teste_b"), config.obter("inexistente", "x")]
+
+        assert valores == ["1", "2", "x"]
+        assert len(cargas) == 1
+
+
+class TestPropagacaoEntreWorkers:
+    """Testes da versão mantida por gatilhos na tabela configuracao_versao"""
+
+    def test_gatilhos_incrementam_versao(self):
+        versao = configuracao_repo.obter_versao()
+
+        configuracao_repo.inserir_ou_atualizar("teste_versao", "1")
+        configuracao_repo.inserir_ou_atualizar("teste_versao", "2")
+
+        assert configuracao_repo.obter_versao() == versao + 2
+
+    def test_alteracao_externa_aparece_apos_intervalo(self, relogio):
+        _gravar_em_outro_worker("teste_tema", "claro")
+        assert config.obter("teste_tema") == "claro"
+        versao_local = config.versao
+
+        _gravar_em_outro_worker("teste_tema", "escuro")
+        # Dentro do intervalo, nem a versão do banco é consultada
+        assert config.obter("teste_tema") == "claro"
+
+        relogio.avancar(CONFIG_CACHE_VERIFICAR_SEGUNDOS)
+        assert config.obter("teste_tema") == "escuro"
+        assert config.obter_versao() == versao_local + 1
+
+    def test_sem_mudanca_de_versao_nao_recarrega(self, relogio, monkeypatch):
+        config.obter("qualquer")
+        monkeypatch.setattr(configuracao_repo, "obter_valores",
+                            lambda: pytest.fail("recarga sem mudança de versão"))
+
+        relogio.avancar(CONFIG_CACHE_VERIFICAR_SEGUNDOS)
+
+        assert config.obter("qualquer", "padrao") == "padrao"
+
+    def test_ttl_recarrega_mesmo_sem_mudanca_de_versao(self, relogio, monkeypatch):
+        monkeypatch.setattr(configuracao_repo, "obter_versao", lambda: 42)
+        assert config.obter("teste_ttl", "padrao") == "padrao"
+        _gravar_em_outro_worker("teste_ttl", "novo")
+
+        relogio.avancar(CONFIG_CACHE_VERIFICAR_SEGUNDOS)
+        assert config.obter("teste_ttl", "padrao") == "padrao"
+
+        relogio.avancar(CONFIG_CACHE_TTL_SEGUNDOS)
+        assert config.obter("teste_ttl", "padrao") == "novo"
+
+    def test_falha_no_banco_mantem_valores(self, relogio, monkeypatch):
+        _gravar_em_outro_worker("teste_falha", "1")
+        assert config.obter("teste_falha") == "1"
+
+        def falhar():
+            raise sqlite3.OperationalError("database is locked")
+        monkeypatch.setattr(configuracao_repo, "obter_versao", falhar)
+        relogio.avancar(CONFIG_CACHE_VERIFICAR_SEGUNDOS)
+
+        assert config.obter("teste_falha") == "1"
+
+
+class TestConcorrencia:
+    """Leituras simultâneas de várias threads (executor do banco e event loop)"""
+
+    def test_apenas_uma_thread_consulta_o_banco(self, relogio, monkeypatch):
+        anterior = config.obter_snapshot()
+        relogio.avancar(CONFIG_CACHE_VERIFICAR_SEGUNDOS)
+        consultando = threading.Event()
+        liberar = threading.Event()
+        consultas = []
+
+        def obter_versao_lento():
+            consultas.append(1)
+            consultando.set()
+            liberar.wait(5)
+            return config._versao_banco
+
+        monkeypatch.setattr(configuracao_repo, "obter_versao", obter_versao_lento)
+        verificadora = threading.Thread(target=config.obter_snapshot)
+        verificadora.start()
+        assert consultando.wait(5)
+
+        # Enquanto a verificação está em andamento, as demais threads não esperam nem consultam
+        resultados = []
+        leitoras = [threading.Thread(target=lambda: resultados.append(config.obter_snapshot())) for _ in range(8)]
+        for leitora in leitoras:
+            leitora.start()
+        for leitora in leitoras:
+            leitora.join(5)
+        liberar.set()
+        verificadora.join(5)
+
+        assert len(consultas) == 1
+        assert len(resultados) == 8 and all(r is anterior for r in resultados)
+
+    def test_primeira_carga_feita_uma_vez(self, relogio, monkeypatch):
+        cargas = []
+        obter_valores = configuracao_repo.obter_valores
+
+        def obter_valores_lento():
+            cargas.append(1)
+            liberar.wait(0.2)
+            return obter_valores()
+
+        liberar = threading.Event()
+        monkeypatch.setattr(configuracao_repo, "obter_valores", obter_valores_lento)
+        resultados = []
+        leitoras = [threading.Thread(target=lambda: resultados.append(config.obter_snapshot())) for _ in range(8)]
+        for leitora in leitoras:
+            leitora.start()
+        for leitora in leitoras:
+            leitora.join(5)
+
+        assert len(cargas) == 1
+        assert len(resultados) == 8 and all(r is resultados[0] for r in resultados)
+
+
+class TestSnapshot:
+    """Testes do snapshot imutável e tipado"""
+
+    def test_valores_convertidos_na_carga(self, relogio):
+        _gravar_em_outro_worker("teste_int", "15")
+        _gravar_em_outro_worker("teste_bool", "Sim")
+        _gravar_em_outro_worker("teste_texto", "abc")
+
+        snapshot = config.carregar()
+
+        assert snapshot.inteiros["teste_int"] == 15
+        assert snapshot.decimais["teste_int"] == 15.0
+        assert snapshot.booleanos["teste_bool"] is True
+        assert "teste_texto" not in snapshot.inteiros
+        assert config.obter_int("teste_texto", 7) == 7
+        assert config.obter_bool("inexistente", True) is True
+
+    def test_padroes_do_repositorio(self, relogio):
+        chave, valor, _ = configuracao_repo.CONFIGS_PADRAO[0]
+
+        assert config.obter(chave) == valor
+
+        _gravar_em_outro_worker(chave, "Outro")
+        assert config.carregar().textos[chave] == "Outro"
+
+    def test_snapshot_imutavel_e_trocado_por_inteiro(self, relogio):
+        _gravar_em_outro_worker("teste_troca", "1")
+        anterior = config.obter_snapshot()
+
+        with pytest.raises(TypeError):
+            anterior.inteiros["teste_troca"] = 2
+        with pytest.raises(AttributeError):
+            anterior.versao = 0
+
+        _gravar_em_outro_worker("teste_troca", "2")
+        relogio.avancar(CONFIG_CACHE_VERIFICAR_SEGUNDOS)
+        atual = config.obter_snapshot()
+
+        assert atual is not anterior
+        assert (anterior.inteiros["teste_troca"], atual.inteiros["teste_troca"]) == (1, 2)
+        assert atual.versao == config.versao
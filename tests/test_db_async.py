@@ -0,0 +1,147 @@
+"""
+Testes para a camada assíncrona de acesso ao banco (util/db_async.py).
+Cobre execução fora do event loop, limite de concorrência, fila e fachada de repositório.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+
+from repo import usuario_repo
+from util.db_async import ExecutorBanco, RepoAsync
+from util.exceptions import BancoSobrecarregadoError
+
+
+@pytest.fixture
+def executor():
+    """Executor isolado com 2 threads e fila de 1"""
+    executor = ExecutorBanco(max_threads=2, max_fila=1)
+    yield executor
+    executor.encerrar()
+
+
+class TestExecutar:
+    """Testes de execução de funções síncronas"""
+
+    async def test_executa_em_outra_thread(self, executor):
+        """Função deve rodar em thread do executor, não na do event loop"""
+        nome_thread = await executor.executar(lambda: threading.current_thread().name)
+
+        assert nome_thread.startswith("db")
+        assert nome_thread != threading.current_thread().name
+
+    async def test_repassa_argumentos_e_excecoes(self, executor):
+        """Argumentos devem ser repassados e exceções propagadas"""
+        assert await executor.executar(pow, 2, exp=10) == 1024
+
+        with pytest.raises(ZeroDivisionError):
+            await executor.executar(lambda: 1 / 0)
+
+        assert executor.obter_estatisticas()["erros"] == 1
+
+    async def test_event_loop_nao_bloqueia(self, executor):
+        """Outras corrotinas devem progredir enquanto a consulta executa"""
+        batidas = 0
+
+        async def batimento():
+            nonlocal batidas
+            while True:
+                batidas += 1
+                await asyncio.sleep(0.01)
+
+        tarefa = asyncio.create_task(batimento())
+        await executor.executar(time.sleep, 0.2)
+        tarefa.cancel()
+
+        assert batidas >= 5
+
+
+class TestLimites:
+    """Testes de concorrência limitada e rejeição"""
+
+    async def test_concorrencia_limitada(self, executor):
+        """No máximo max_threads chamadas devem rodar ao mesmo tempo"""
+        ativos = 0
+        pico = 0
+        lock = threading.Lock()
+
+        def consulta():
+            nonlocal ativos, pico
+            with lock:
+                ativos += 1
+                pico = max(pico, ativos)
+            time.sleep(0.05)
+            with lock:
+                ativos -= 1
+
+        # 3 chamadas: 2 executando + 1 na fila (dentro do limite)
+        await asyncio.gather(*(executor.executar(consulta) for _ in range(3)))
+
+        assert pico == 2
+        stats = executor.obter_estatisticas()
+        assert stats["executadas"] == 3
+        assert stats["maior_fila"] >= 1
+        assert stats["na_fila"] == 0
+
+    async def test_rejeita_quando_fila_cheia(self, executor):
+        """Chamadas além de threads + fila devem receber 503"""
+        liberar = threading.Event()
+        ocupadas = [asyncio.ensure_future(executor.executar(liberar.wait)) for _ in range(2)]
+        # Dar tempo para as duas threads iniciarem
+        while executor.obter_estatisticas()["em_execucao"] < 2:
+            await asyncio.sleep(0.01)
+        na_fila = asyncio.ensure_future(executor.executar(lambda: None))
+        await asyncio.sleep(0)
+
+        with pytest.raises(BancoSobrecarregadoError) as exc_info:
+            await executor.executar(lambda: None)
+
+        assert exc_info.value.status_code == 503
+        assert executor.obter_estatisticas()["rejeitadas"] == 1
+        liberar.set()
+        await asyncio.gather(*ocupadas, na_fila)
+
+    async def test_cancelar_chamada_na_fila_libera_a_fila(self):
+        """Chamada cancelada antes de executar não deve continuar contando na fila"""
+        executor = ExecutorBanco(max_threads=1, max_fila=1)
+        try:
+            liberar = threading.Event()
+            ocupada = asyncio.ensure_future(executor.executar(liberar.wait))
+            while executor.obter_estatisticas()["em_execucao"] < 1:
+                await asyncio.sleep(0.01)
+            executadas = []
+            na_fila = asyncio.ensure_future(executor.executar(executadas.append, 1))
+            await asyncio.sleep(0)
+            assert executor.obter_estatisticas()["na_fila"] == 1
+
+            na_fila.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await na_fila
+            liberar.set()
+            await ocupada
+
+            stats = executor.obter_estatisticas()
+            assert stats["na_fila"] == 0
+            assert stats["em_execucao"] == 0
+            assert executadas == []
+            # Sem contagem presa, novas chamadas são aceitas normalmente
+            assert await executor.executar(lambda: 42) == 42
+        finally:
+            executor.encerrar()
+
+
+class TestRepoAsync:
+    """Testes da fachada assíncrona de repositório"""
+
+    async def test_fachada_chama_funcao_do_repositorio(self, executor):
+        """Funções do módulo devem ser aguardáveis com o mesmo retorno"""
+        usuario_db = RepoAsync(usuario_repo, executor)
+
+        assert await usuario_db.obter_por_id(999999) is None
+        assert await usuario_db.obter_quantidade() == usuario_repo.obter_quantidade()
+
+    def test_atributo_privado_nao_exposto(self):
+        """Funções privadas do módulo não devem ser expostas"""
+        with pytest.raises(AttributeError):
+            RepoAsync(usuario_repo)._row_to_usuario
@@ -0,0 +1,190 @@
+"""
+Testes para o pool de conexões e o perfil de PRAGMAs (util/db_util.py).
+Cobre reutilização, overflow, timeout, health check, escopo de transação e WAL.
+"""
+import sqlite3
+import threading
+
+import pytest
+
+from util.db_util import (
+    PoolConexoes,
+    get_connection,
+    obter_estatisticas_pool,
+    verificar_pragmas,
+)
+
+
+@pytest.fixture
+def pool(tmp_path):
+    """Pool isolado apontando para um banco temporário"""
+    pool = PoolConexoes(str(tmp_path / "pool.db"), tamanho=2, max_overflow=1, timeout=0.2)
+    with pool.transacao() as conn:
+        conn.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, nome TEXT)")
+    yield pool
+    pool.fechar()
+
+
+class TestReutilizacao:
+    """Testes de reaproveitamento de conexões"""
+
+    def test_conexao_devolvida_e_reutilizada(self, pool):
+        """Checkouts sequenciais devem reutilizar a mesma conexão"""
+        with pool.transacao() as conn1:
+            pass
+        with pool.transacao() as conn2:
+            pass
+
+        assert conn1 is conn2
+        stats = pool.obter_estatisticas()
+        assert stats["criadas"] == 1
+        assert stats["reutilizadas"] >= 2
+        assert stats["em_uso"] == 0
+
+    def test_conexao_configurada(self, pool):
+        """Conexões do pool devem ter foreign keys e row_factory configurados"""
+        with pool.transacao() as conn:
+            assert conn.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+            assert conn.row_factory is sqlite3.Row
+
+    def test_get_connection_usa_pool(self):
+        """get_connection deve reaproveitar conexões do pool global"""
+        with get_connection() as conn:
+            conn.execute("SELECT 1")
+        criadas_antes = obter_estatisticas_pool()["criadas"]
+
+        with get_connection() as conn:
+            conn.execute("SELECT 1")
+
+        assert obter_estatisticas_pool()["criadas"] == criadas_antes
+
+
+class TestTransacao:
+    """Testes do checkout com escopo de transação"""
+
+    def test_commit_ao_sair(self, pool):
+        """Alterações devem ser confirmadas ao sair do bloco"""
+        with pool.transacao() as conn:
+            conn.execute("INSERT INTO item (nome) VALUES ('a')")
+
+        with pool.transacao() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM item").fetchone()[0] == 1
+
+    def test_rollback_em_excecao(self, pool):
+        """Exceção dentro do bloco deve desfazer alterações"""
+        with pytest.raises(RuntimeError):
+            with pool.transacao() as conn:
+                conn.execute("INSERT INTO item (nome) VALUES ('a')")
+                raise RuntimeError("falha")
+
+        with pool.transacao() as conn:
+            assert conn.execute("SELECT COUNT(*) FROM item").fetchone()[0] == 0
+            assert not conn.in_transaction
+
+
+class TestLimites:
+    """Testes de overflow e timeout"""
+
+    def test_overflow_fechado_ao_devolver(self, pool):
+        """Conexões além do tamanho do pool não devem ficar ociosas"""
+        conexoes = [pool.obter() for _ in range(3)]
+        assert pool.obter_estatisticas()["abertas"] == 3
+
+        for conn in conexoes:
+            pool.devolver(conn)
+
+        stats = pool.obter_estatisticas()
+        assert stats["ociosas"] == 2
+        assert stats["abertas"] == 2
+
+    def test_timeout_quando_esgotado(self, pool):
+        """Deve falhar com TimeoutError quando não há conexão livre"""
+        conexoes = [pool.obter() for _ in range(3)]
+
+        with pytest.raises(TimeoutError):
+            pool.obter()
+
+        assert pool.obter_estatisticas()["timeouts"] == 1
+        for conn in conexoes:
+            pool.devolver(conn)
+
+    def test_espera_conexao_devolvida(self, pool):
+        """Thread aguardando deve receber conexão devolvida por outra"""
+        pool.timeout = 2
+        conexoes = [pool.obter() for _ in range(3)]
+        resultado = {}
+
+        def aguardar():
+            resultado["conn"] = pool.obter()
+
+        thread = threading.Thread(target=aguardar)
+        thread.start()
+        pool.devolver(conexoes.pop())
+        thread.join(timeout=5)
+
+        assert resultado["conn"] is not None
+        assert pool.obter_estatisticas()["esperas"] == 1
+        for conn in conexoes + [resultado["conn"]]:
+            pool.devolver(conn)
+
+
+class TestHealthCheck:
+    """Testes de validação e descarte de conexões"""
+
+    def test_conexao_quebrada_substituida(self, pool):
+        """Conexão ociosa inválida deve ser descartada no checkout"""
+        pool.ping_segundos = 0
+        conn = pool.obter()
+        pool.devolver(conn)
+        conn.close()  # Simula conexão quebrada enquanto ociosa
+
+        nova = pool.obter()
+        assert nova is not conn
+        assert nova.execute("SELECT 1").fetchone()[0] == 1
+        assert pool.obter_estatisticas()["descartadas"] == 1
+        pool.devolver(nova)
+
+    def test_fechar_descarta_conexoes_em_uso(self, pool):
+        """Conexões em uso durante fechar() não devem voltar ao pool"""
+        conn = pool.obter()
+        pool.fechar()
+        pool.devolver(conn)
+
+        stats = pool.obter_estatisticas()
+        assert stats["ociosas"] == 0
+        assert stats["abertas"] == 0
+
+
+class TestPragmas:
+    """Testes do perfil de PRAGMAs aplicado às conexões"""
+
+    def test_conexao_em_modo_wal(self, pool):
+        """Conexões do pool devem usar WAL e synchronous NORMAL"""
+        with pool.transacao() as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] > 0
+
+    def test_leitor_nao_bloqueado_por_escritor(self, pool):
+        """Em WAL, leitura deve funcionar com transação de escrita aberta"""
+        escritor = pool.obter()
+        leitor = pool.obter()
+        try:
+            escritor.execute("INSERT INTO item (nome) VALUES ('pendente')")
+            assert escritor.in_transaction
+
+            total = leitor.execute("SELECT COUNT(*) FROM item").fetchone()[0]
+            assert total == 0
+        finally:
+            escritor.rollback()
+            pool.devolver(escritor)
+            pool.devolver(leitor)
+
+    def test_verificar_pragmas_banco_da_aplicacao(self):
+        """Startup check deve reportar os valores efetivos como aplicados"""
+        resultado = verificar_pragmas()
+
+        assert resultado["journal_mode"]["efetivo"] == "WAL"
+        assert resultado["foreign_keys"]["ok"] is True
+        assert resultado["synchronous"]["ok"] is True
+        assert resultado["temp_store"]["ok"] is True
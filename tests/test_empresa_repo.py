@@ -166,6 +166,26 @@ class TestObterPorId:
         assert empresa_obtida.data_cadastro is not None
 
 
+class TestObterPorIds:
+    """Testes para busca de várias empresas em uma consulta"""
+
+    def test_obter_varias_empresas(self, limpar_banco_dados):
+        """Deve retornar dicionário por ID, ignorando IDs inexistentes e repetidos"""
+        ids = [
+            empresa_repo.inserir(Empresa(id_empresa=0, nome=f"Empresa {i}", cnpj=f"00.000.000/000{i}-00", descricao=""))
+            for i in range(3)
+        ]
+
+        empresas = empresa_repo.obter_por_ids([ids[0], ids[2], ids[2], 999])
+
+        assert set(empresas) == {ids[0], ids[2]}
+        assert empresas[ids[2]].nome == "Empresa 2"
+
+    def test_lista_vazia(self, limpar_banco_dados):
+        """Lista vazia não deve consultar o banco"""
+        assert empresa_repo.obter_por_ids([]) == {}
+
+
 class TestObterTodas:
     """Testes para listagem de todas as empresas"""
 
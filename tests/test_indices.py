@@ -0,0 +1,155 @@
+"""
+Testes dos índices do banco (sql/indices_sql.py e repo/indices_repo.py).
+Roda EXPLAIN QUERY PLAN sobre cada statement de sql/*.py e falha quando
+uma consulta varre por inteiro uma tabela que cresce com o uso.
+"""
+import importlib
+import pkgutil
+import re
+import sqlite3
+
+import pytest
+
+import sql
+from repo import indices_repo
+from sql import indices_sql
+from util.db_util import get_connection
+
+# Tabelas que crescem com o uso do sistema (varredura completa é inaceitável)
+TABELAS_GRANDES = {
+    "usuario",
+    "tarefa",
+    "vaga",
+    "candidatura",
+    "chamado",
+    "chamado_interacao",
+    "chat_sala",
+    "chat_participante",
+    "chat_mensagem",
+    "chat_mensagem_arquivo",
+    "rate_limit",
+}
+
+# Statements que varrem a tabela de propósito, com o motivo
+VARREDURAS_PERMITIDAS = {
+    "usuario_sql.OBTER_TODOS": "listagem administrativa de todos os usuários",
+    "vaga_sql.OBTER_TODAS": "listagem administrativa de todas as vagas",
+    "chamado_sql.OBTER_TODOS": "fila de chamados do administrador, ordenada por prioridade calculada",
+    "chat_participante_sql.RECALCULAR_NAO_LIDAS": "migração única ao criar a coluna nao_lidas",
+}
+
+_PADRAO_TABELA = re.compile(r"\b(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+_PALAVRAS_RESERVADAS = {"where", "on", "set", "left", "inner", "join", "order", "group", "limit", "values"}
+
+
+def _modulos_sql():
+    """Importa todos os módulos do pacote sql"""
+    return [
+        importlib.import_module(f"sql.{modulo.name}")
+        for modulo in pkgutil.iter_modules(sql.__path__)
+    ]
+
+
+def _statements():
+    """Lista (nome, sql) de todos os statements DML dos módulos sql"""
+    statements = []
+    for modulo in _modulos_sql():
+        nome_modulo = modulo.__name__.split(".")[-1]
+        for nome, valor in vars(modulo).items():
+            if not nome.isupper() or not isinstance(valor, str):
+                continue
+            if re.match(r"\s*(SELECT|INSERT|UPDATE|DELETE|WITH)\b", valor, re.IGNORECASE):
+                statements.append((f"{nome_modulo}.{nome}", valor))
+    return statements
+
+
+def _apelidos(statement: str) -> dict:
+    """Mapeia apelido (ou nome) -> tabela a partir das cláusulas FROM/JOIN"""
+    apelidos = {}
+    for tabela, apelido in _PADRAO_TABELA.findall(statement):
+        apelidos[tabela] = tabela
+        if apelido and apelido.lower() not in _PALAVRAS_RESERVADAS:
+            apelidos[apelido] = tabela
+    return apelidos
+
+
+@pytest.fixture(scope="module")
+def banco_com_indices():
+    """Banco em memória com todas as tabelas e índices do sistema"""
+    conn = sqlite3.connect(":memory:")
+    for modulo in _modulos_sql():
+        for nome, valor in vars(modulo).items():
+            if nome.startswith("CRIAR_TABELA") and isinstance(valor, str):
+                conn.execute(valor)
+    for indice in indices_sql.TODOS_INDICES:
+        conn.execute(indice)
+
+    indices_parciais = {
+        row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND sql LIKE '%WHERE%'"
+        )
+    }
+    yield conn, indices_parciais
+    conn.close()
+
+
+def _varreduras_completas(conn, statement: str, indices_parciais: set) -> list:
+    """
+    Retorna as etapas do plano que leem uma tabela grande por inteiro.
+
+    Varredura de índice de cobertura (ex: COUNT(*)) ou de índice parcial é aceita;
+    varredura da tabela ou de índice comum (que acessa todas as linhas) não.
+    """
+    plano = conn.execute("EXPLAIN QUERY PLAN " + statement, [None] * statement.count("?")).fetchall()
+    apelidos = _apelidos(statement)
+    varreduras = []
+    for linha in plano:
+        detalhe = linha[3]
+        match = re.match(r"SCAN (\w+)(?: USING INDEX (\w+))?$", detalhe)
+        if not match:
+            continue
+        tabela = apelidos.get(match.group(1), match.group(1))
+        if tabela in TABELAS_GRANDES and match.group(2) not in indices_parciais:
+            varreduras.append(detalhe)
+    return varreduras
+
+
+class TestPlanosDeConsulta:
+    """Testes de plano de consulta dos statements de sql/*.py"""
+
+    @pytest.mark.parametrize("nome,statement", _statements(), ids=[n for n, _ in _statements()])
+    def test_sem_varredura_completa(self, banco_com_indices, nome, statement):
+        """Statements não devem varrer tabelas grandes por inteiro"""
+        if nome in VARREDURAS_PERMITIDAS:
+            pytest.skip(VARREDURAS_PERMITIDAS[nome])
+        conn, indices_parciais = banco_com_indices
+
+        varreduras = _varreduras_completas(conn, statement, indices_parciais)
+
+        assert not varreduras, f"{nome} faz varredura completa: {varreduras}"
+
+    def test_varreduras_permitidas_existem(self):
+        """Exceções devem apontar para statements que ainda existem"""
+        nomes = {nome for nome, _ in _statements()}
+        assert set(VARREDURAS_PERMITIDAS) <= nomes
+
+
+class TestCriarIndices:
+    """Testes de criação dos índices no banco da aplicação"""
+
+    def test_cria_todos_os_indices(self, client):
+        """criar_indices deve registrar todos os índices de TODOS_INDICES"""
+        indices_repo.criar_indices()
+
+        esperados = {
+            re.search(r"IF NOT EXISTS (\w+)", indice).group(1)
+            for indice in indices_sql.TODOS_INDICES
+        }
+        with get_connection() as conn:
+            existentes = {
+                row["name"] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'index'"
+                )
+            }
+
+        assert esperados <= existentes
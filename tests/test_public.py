@@ -136,6 +136,32 @@ class TestHealthCheck:
         response = client.get("/health")
         assert response.status_code == status.HTTP_200_OK
 
+    def test_health_check_publico_nao_expoe_estatisticas(self, client):
+        """Health check público deve conter apenas o status"""
+        response = client.get("/health")
+        assert response.json() == {"status": "healthy"}
+
+    def test_health_detalhes_exige_login(self, client):
+        """Estatísticas detalhadas não devem ser servidas a anônimos"""
+        response = client.get("/health/detalhes", follow_redirects=False)
+        assert response.status_code == status.HTTP_303_SEE_OTHER
+        assert "/login" in response.headers["location"]
+
+    def test_health_detalhes_exige_admin(self, cliente_autenticado):
+        """Usuário comum não deve ver as estatísticas detalhadas"""
+        response = cliente_autenticado.get("/health/detalhes", follow_redirects=False)
+        assert response.status_code == status.HTTP_303_SEE_OTHER
+
+    def test_health_detalhes_para_admin(self, admin_autenticado):
+        """Administrador deve ver as estatísticas do banco e dos caches"""
+        response = admin_autenticado.get("/health/detalhes")
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["status"] == "healthy"
+        assert "banco" in data
+        assert "executor_banco" in data
+        assert "cache_paginas" in data
+
 
 class TestErros:
     """Testes de páginas de erro"""
@@ -151,3 +177,65 @@ class TestErros:
         assert response.status_code == status.HTTP_404_NOT_FOUND
         # Deve ter alguma mensagem sobre não encontrado
         assert "404" in response.text or "não encontrad" in response.text.lower()
+
+
+class TestCachePaginasPublicas:
+    """Testes do cache de páginas para visitantes anônimos (util/cache_paginas.py)"""
+
+    @pytest.fixture(autouse=True)
+    def cache_vazio(self):
+        from util.cache_paginas import cache_paginas
+        cache_paginas.limpar()
+        yield cache_paginas
+        cache_paginas.limpar()
+
+    def test_anonimo_recebe_pagina_do_cache_com_etag(self, client, cache_vazio):
+        primeira = client.get("/sobre")
+        segunda = client.get("/sobre")
+
+        assert primeira.text == segunda.text
+        assert primeira.headers["etag"] == segunda.headers["etag"]
+        assert primeira.headers["etag"].startswith('"')
+        assert cache_vazio.obter_estatisticas()["itens"] == 1
+
+    def test_if_none_match_retorna_304(self, client):
+        etag = client.get("/").headers["etag"]
+
+        response = client.get("/", headers={"If-None-Match": f'W/"outro", {etag}'})
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_etag_desatualizado_retorna_pagina(self, client):
+        response = client.get("/", headers={"If-None-Match": '"desatualizado"'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.text) > 100
+
+    def test_usuario_logado_nao_usa_cache(self, cliente_autenticado, cache_vazio):
+        response = cliente_autenticado.get("/sobre")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "etag" not in response.headers
+        assert cache_vazio.obter_estatisticas()["itens"] == 0
+
+    def test_mensagem_flash_nao_vai_para_o_cache(self, cliente_autenticado, cache_vazio):
+        """Após o logout a home exibe a mensagem, que não pode ser servida a outros visitantes"""
+        cliente_autenticado.get("/logout", follow_redirects=False)
+
+        response = cliente_autenticado.get("/")
+
+        assert "Logout realizado" in response.text
+        assert "etag" not in response.headers
+        assert cache_vazio.obter_estatisticas()["itens"] == 0
+
+    def test_aplicar_tema_invalida_cache(self, client, admin_autenticado, cache_vazio):
+        from pathlib import Path
+        if not Path("static/css/bootswatch/original.bootstrap.min.css").exists():
+            pytest.skip("Tema 'original' não disponível")
+        cache_vazio.definir(("/sobre", "antigo", 0), (b"antiga", '"antiga"', "text/html"))
+
+        admin_autenticado.post("/admin/tema/aplicar", data={"tema": "original"})
+
+        assert cache_vazio.obter_estatisticas()["itens"] == 0
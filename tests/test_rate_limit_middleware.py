@@ -0,0 +1,175 @@
+"""
+Testes do middleware de rate limiting (util/rate_limit_middleware.py).
+"""
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from util import rate_limit_middleware
+from util.db_async import ExecutorBanco
+from util.exceptions import BancoSobrecarregadoError
+from util.rate_limit_armazenamento import ArmazenamentoMemoria, ArmazenamentoRateLimit
+from util.rate_limit_middleware import RateLimitMiddleware, RegraRateLimit
+from util.rate_limiter import RateLimiter
+
+
+def _criar_app(regras):
+    """App mínimo que conta as requisições que chegaram aos handlers"""
+    chamadas = []
+
+    async def handler(request):
+        chamadas.append(request.url.path)
+        return PlainTextResponse("ok")
+
+    app = Starlette(routes=[
+        Route("/pagina", handler, methods=["GET", "POST"]),
+        Route("/itens/{item_id}", handler),
+        Route("/livre", handler),
+    ])
+    app.add_middleware(RateLimitMiddleware, regras=regras)
+    return TestClient(app), chamadas
+
+
+class TestRegraRateLimit:
+    """Testes da correspondência de regras"""
+
+    def test_padrao_com_parametro(self):
+        regra = RegraRateLimit("/itens/{item_id}", RateLimiter())
+
+        assert regra.corresponde("GET", "/itens/42")
+        assert not regra.corresponde("GET", "/itens/42/detalhes")
+        assert not regra.corresponde("POST", "/itens/42")
+
+    def test_get_inclui_head(self):
+        assert RegraRateLimit("/pagina", RateLimiter()).corresponde("HEAD", "/pagina")
+
+    def test_formato_invalido(self):
+        with pytest.raises(ValueError):
+            RegraRateLimit("/pagina", RateLimiter(), formato="xml")
+
+
+class TestRateLimitMiddleware:
+    """Testes do bloqueio antes do roteamento"""
+
+    def test_bloqueia_sem_chegar_ao_handler(self):
+        client, chamadas = _criar_app([RegraRateLimit("/pagina", RateLimiter(max_tentativas=2, janela_minutos=1))])
+
+        respostas = [client.get("/pagina") for _ in range(3)]
+
+        assert [r.status_code for r in respostas] == [200, 200, 429]
+        assert chamadas == ["/pagina", "/pagina"]
+        assert respostas[2].headers["retry-after"] == "30"
+        assert "text/html" in respostas[2].headers["content-type"]
+        assert "Muitas Requisições" in respostas[2].text
+
+    def test_resposta_json(self):
+        client, _ = _criar_app([RegraRateLimit("/itens/{item_id}", RateLimiter(max_tentativas=1), formato="json")])
+        client.get("/itens/1")
+
+        resposta = client.get("/itens/2")
+
+        assert resposta.status_code == 429
+        assert resposta.json() == {"detail": "Muitas requisições. Aguarde alguns minutos."}
+
+    def test_metodo_e_rotas_fora_das_regras_nao_sao_limitados(self):
+        client, chamadas = _criar_app([RegraRateLimit("/pagina", RateLimiter(max_tentativas=1), metodos=["POST"])])
+
+        client.post("/pagina")
+        respostas = [client.get("/pagina"), client.get("/livre"), client.post("/pagina")]
+
+        assert [r.status_code for r in respostas] == [200, 200, 429]
+        assert len(chamadas) == 3
+
+    def test_primeira_regra_que_corresponde_decide(self):
+        restrito = RateLimiter(max_tentativas=1)
+        client, _ = _criar_app([
+            RegraRateLimit("/itens/{item_id}", restrito),
+            RegraRateLimit("/itens/{item_id}", RateLimiter(max_tentativas=100)),
+        ])
+
+        assert [client.get("/itens/1").status_code for _ in range(2)] == [200, 429]
+
+
+class _ArmazenamentoExterno(ArmazenamentoRateLimit):
+    """Armazenamento fora do processo simulado: registra a thread de cada consumo"""
+
+    def __init__(self):
+        self.memoria = ArmazenamentoMemoria()
+        self.threads = []
+
+    def consumir(self, *args):
+        self.threads.append(threading.current_thread())
+        return self.memoria.consumir(*args)
+
+    def consultar(self, *args):
+        return self.memoria.consultar(*args)
+
+    def limpar(self, identificador=None):
+        self.memoria.limpar(identificador)
+
+
+class TestArmazenamentoExterno:
+    """Limiters cujo armazenamento faz E/S são verificados no executor do banco"""
+
+    @pytest.fixture
+    def executor(self, monkeypatch):
+        executor = ExecutorBanco(max_threads=1)
+        monkeypatch.setattr(rate_limit_middleware, "executor_banco", executor)
+        yield executor
+        executor.encerrar()
+
+    def test_verificacao_fora_do_loop(self, executor):
+        armazenamento = _ArmazenamentoExterno()
+        limiter = RateLimiter(max_tentativas=1, janela_minutos=1, armazenamento=armazenamento)
+        client, _ = _criar_app([RegraRateLimit("/pagina", limiter)])
+
+        assert [client.get("/pagina").status_code for _ in range(2)] == [200, 429]
+        assert all(thread.name.startswith("db") for thread in armazenamento.threads)
+        assert executor.obter_estatisticas()["executadas"] == 2
+
+    def test_memoria_verificada_no_loop(self, executor):
+        client, _ = _criar_app([RegraRateLimit("/pagina", RateLimiter(max_tentativas=1))])
+
+        client.get("/pagina")
+
+        assert executor.obter_estatisticas()["executadas"] == 0
+
+    def test_executor_sobrecarregado_permite_requisicao(self, executor, monkeypatch):
+        async def sobrecarregado(*args):
+            raise BancoSobrecarregadoError(0)
+        monkeypatch.setattr(executor, "executar", sobrecarregado)
+        limiter = RateLimiter(max_tentativas=1, armazenamento=_ArmazenamentoExterno())
+        client, chamadas = _criar_app([RegraRateLimit("/pagina", limiter)])
+
+        assert client.get("/pagina").status_code == 200
+        assert chamadas == ["/pagina"]
+
+
+class TestRegrasDaAplicacao:
+    """Testes das regras registradas em main.py"""
+
+    def test_pagina_publica_bloqueada_com_pagina_pre_renderizada(self, client):
+        from routes.public_routes import public_limiter
+        while public_limiter.verificar("testclient"):
+            pass
+
+        resposta = client.get("/sobre")
+
+        assert resposta.status_code == 429
+        assert "Muitas Requisições" in resposta.text
+        # Rejeitada antes do SessionMiddleware: nenhum cookie de sessão emitido
+        assert "set-cookie" not in resposta.headers
+
+    def test_api_do_chat_bloqueada_em_json(self, client):
+        from routes.chat_routes import busca_usuarios_limiter
+        while busca_usuarios_limiter.verificar("testclient"):
+            pass
+
+        resposta = client.get("/chat/usuarios/buscar?q=ab", follow_redirects=False)
+
+        assert resposta.status_code == 429
+        assert resposta.json()["detail"].startswith("Muitas requisições")
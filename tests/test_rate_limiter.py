@@ -0,0 +1,365 @@
+"""
+Testes do rate limiter (util/rate_limiter.py).
+"""
+import multiprocessing
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytest
+
+from repo import configuracao_repo, rate_limit_repo
+from util import db_util
+from util.config_cache import config
+from util.rate_limit_armazenamento import (
+    ArmazenamentoMemoria, ArmazenamentoRateLimit, ArmazenamentoSQLite, criar_armazenamento
+)
+from util.rate_limiter import DynamicRateLimiter, RateLimiter
+
+
+class _Relogio:
+    """Relógio controlado pelo teste (segundos)"""
+
+    def __init__(self):
+        self.agora = 1000.0
+
+    def __call__(self) -> float:
+        return self.agora
+
+    def avancar(self, segundos: float):
+        self.agora += segundos
+
+
+@pytest.fixture
+def relogio():
+    return _Relogio()
+
+
+class TestTokenBucket:
+    """Testes do limite por identificador"""
+
+    def test_bloqueia_apos_max_tentativas(self, relogio):
+        limiter = RateLimiter(max_tentativas=3, janela_minutos=1, relogio=relogio)
+
+        assert [limiter.verificar("ip") for _ in range(4)] == [True, True, True, False]
+        assert limiter.verificar("outro-ip")
+
+    def test_reabastece_proporcionalmente_ao_tempo(self, relogio):
+        limiter = RateLimiter(max_tentativas=3, janela_minutos=1, relogio=relogio)
+        for _ in range(3):
+            limiter.verificar("ip")
+
+        relogio.avancar(19)
+        assert not limiter.verificar("ip")
+
+        # Uma ficha a cada 20 segundos (3 por minuto)
+        relogio.avancar(1)
+        assert limiter.verificar("ip")
+        assert not limiter.verificar("ip")
+
+    def test_restantes_e_tempo_reset(self, relogio):
+        limiter = RateLimiter(max_tentativas=2, janela_minutos=1, relogio=relogio)
+
+        assert limiter.obter_tentativas_restantes("ip") == 2
+        assert limiter.obter_tempo_reset("ip") is None
+
+        limiter.verificar("ip")
+        limiter.verificar("ip")
+
+        assert limiter.obter_tentativas_restantes("ip") == 0
+        assert limiter.obter_tempo_reset("ip") == timedelta(seconds=30)
+
+    def test_limpar_identificador(self, relogio):
+        limiter = RateLimiter(max_tentativas=1, janela_minutos=1, relogio=relogio)
+        limiter.verificar("ip")
+
+        limiter.limpar("ip")
+
+        assert limiter.verificar("ip")
+
+
+class TestDescarteDeChaves:
+    """Testes da memória limitada por identificadores"""
+
+    def test_descarta_identificadores_ociosos(self, relogio):
+        limiter = RateLimiter(max_tentativas=5, janela_minutos=1, relogio=relogio)
+        for i in range(100):
+            limiter.verificar(f"ip-{i}")
+
+        relogio.avancar(60)
+        limiter.verificar("novo")
+
+        assert list(limiter.armazenamento.estados) == ["novo"]
+
+    def test_identificador_ativo_nao_e_descartado(self, relogio):
+        limiter = RateLimiter(max_tentativas=1, janela_minutos=1, relogio=relogio)
+        limiter.verificar("ativo")
+        relogio.avancar(59)
+
+        # Ainda sem ficha: o estado precisa continuar registrado
+        assert not limiter.verificar("ativo")
+        assert "ativo" in limiter.armazenamento.estados
+
+    def test_respeita_max_chaves(self, relogio):
+        limiter = RateLimiter(max_tentativas=5, janela_minutos=1, max_chaves=10, relogio=relogio)
+
+        for i in range(25):
+            limiter.verificar(f"ip-{i}")
+
+        estados = limiter.armazenamento.estados
+        assert len(estados) == 10
+        assert "ip-24" in estados and "ip-0" not in estados
+        assert limiter.obter_estatisticas()["descartadas"] == 15
+
+    def test_max_chaves_invalido(self):
+        with pytest.raises(ValueError):
+            RateLimiter(max_chaves=0)
+
+
+class TestDynamicRateLimiter:
+    """Testes da releitura de limites apenas quando as configurações mudam"""
+
+    @pytest.fixture
+    def limiter(self):
+        config.limpar()
+        yield DynamicRateLimiter("rate_limit_teste_max", "rate_limit_teste_minutos",
+                                 padrao_max=2, padrao_minutos=1, nome="teste")
+        config.limpar()
+
+    def test_nao_rele_configuracao_a_cada_verificacao(self, limiter, monkeypatch):
+        leituras = []
+        obter_int = config.obter_int
+        monkeypatch.setattr(config, "obter_int", lambda chave, padrao: leituras.append(chave) or obter_int(chave, padrao))
+
+        for _ in range(10):
+            limiter.verificar("ip")
+            limiter.obter_tentativas_restantes("ip")
+
+        assert leituras == ["rate_limit_teste_max", "rate_limit_teste_minutos"]
+
+    def test_aplica_configuracao_salva(self, limiter):
+        limiter.verificar("ip")
+        assert limiter.max_tentativas == 2
+
+        configuracao_repo.inserir_ou_atualizar("rate_limit_teste_max", "7")
+        config.limpar()
+        limiter.verificar("ip")
+        assert limiter.max_tentativas == 7
+
+    def test_limpar_chave_incrementa_versao(self):
+        versao = config.versao
+
+        config.limpar_chave("qualquer")
+
+        assert config.versao == versao + 1
+
+
+def _verificar_em_processo(caminho_banco: str, vezes: int, fila) -> None:
+    """
+    Executado em processo filho (spawn): conta as tentativas permitidas no
+    limiter compartilhado e as falhas do armazenamento, que permitiriam
+    requisições a mais sem erro visível.
+    """
+    db_util.DATABASE_PATH = caminho_banco
+    armazenamento = ArmazenamentoSQLite("compartilhado")
+    limiter = RateLimiter(max_tentativas=100, janela_minutos=60, nome="compartilhado",
+                          armazenamento=armazenamento)
+    permitidas = sum(limiter.verificar("ip") for _ in range(vezes))
+    db_util.fechar_pool()
+    fila.put((permitidas, armazenamento.falhas))
+
+
+class TestArmazenamentoSQLite:
+    """Testes do armazenamento compartilhado entre workers (tabela rate_limit)"""
+
+    @pytest.fixture
+    def banco_temporario(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(db_util, "DATABASE_PATH", str(tmp_path / "rate_limit.db"))
+        yield
+        db_util.fechar_pool()
+
+    def _limiter(self, relogio, nome: str = "login", max_tentativas: int = 3) -> RateLimiter:
+        return RateLimiter(max_tentativas=max_tentativas, janela_minutos=1, nome=nome,
+                           relogio=relogio, armazenamento=ArmazenamentoSQLite(nome))
+
+    def test_limite_compartilhado_entre_instancias(self, banco_temporario, relogio):
+        worker_a = self._limiter(relogio)
+        worker_b = self._limiter(relogio)
+
+        resultados = [worker_a.verificar("ip"), worker_b.verificar("ip"),
+                      worker_a.verificar("ip"), worker_b.verificar("ip")]
+
+        assert resultados == [True, True, True, False]
+        assert worker_a.obter_tentativas_restantes("ip") == 0
+
+    def test_reabastece_e_separa_limiters(self, banco_temporario, relogio):
+        login = self._limiter(relogio, max_tentativas=1)
+        cadastro = self._limiter(relogio, nome="cadastro", max_tentativas=1)
+        login.verificar("ip")
+
+        assert not login.verificar("ip")
+        assert cadastro.verificar("ip")
+        assert login.obter_tempo_reset("ip") == timedelta(seconds=60)
+
+        relogio.avancar(60)
+        assert login.verificar("ip")
+
+    def test_descarta_ociosos_e_limpa(self, banco_temporario, relogio):
+        limiter = self._limiter(relogio)
+        limiter.verificar("ip-1")
+        relogio.avancar(61)
+        limiter.verificar("ip-2")
+
+        assert limiter.obter_estatisticas()["chaves"] == 1
+
+        limiter.limpar()
+        assert limiter.obter_estatisticas()["chaves"] == 0
+
+    def test_incremento_atomico_entre_processos(self, banco_temporario):
+        # spawn: os filhos não herdam as threads do pool e do executor do processo de testes
+        contexto = multiprocessing.get_context("spawn")
+        fila = contexto.Queue()
+        processos = [
+            contexto.Process(target=_verificar_em_processo, args=(db_util.DATABASE_PATH, 60, fila))
+            for _ in range(4)
+        ]
+        for processo in processos:
+            processo.start()
+        resultados = [fila.get(timeout=60) for _ in processos]
+        for processo in processos:
+            processo.join()
+
+        # 240 tentativas concorrentes, capacidade 100: nenhuma ficha a mais e
+        # nenhuma permitida por falha do banco (ex: "database is locked")
+        assert sum(falhas for _, falhas in resultados) == 0
+        assert sum(permitidas for permitidas, _ in resultados) == 100
+
+    def test_falha_no_banco_permite_requisicao(self, monkeypatch, relogio):
+        armazenamento = ArmazenamentoSQLite("login")
+        monkeypatch.setattr(db_util, "DATABASE_PATH", "/caminho/inexistente/banco.db")
+        db_util.fechar_pool()
+        try:
+            limiter = RateLimiter(max_tentativas=1, janela_minutos=1, relogio=relogio, armazenamento=armazenamento)
+
+            assert limiter.verificar("ip")
+            assert limiter.obter_tentativas_restantes("ip") == 1
+            assert limiter.obter_estatisticas()["chaves"] is None
+            limiter.limpar("ip")
+            assert armazenamento.falhas == 4
+        finally:
+            monkeypatch.undo()
+            db_util.fechar_pool()
+
+    def test_erro_que_nao_e_do_banco_nao_e_engolido(self, banco_temporario, monkeypatch):
+        armazenamento = ArmazenamentoSQLite("login")
+        def falhar(*args):
+            raise TypeError("bug")
+        monkeypatch.setattr(rate_limit_repo, "consumir", falhar)
+
+        with pytest.raises(TypeError):
+            armazenamento.consumir("ip", 1, 60, 0.0)
+        assert armazenamento.falhas == 0
+
+
+class TestCriarArmazenamento:
+    """Testes da fábrica de armazenamentos"""
+
+    def test_tipos_suportados(self):
+        assert isinstance(criar_armazenamento("memoria"), ArmazenamentoMemoria)
+        assert isinstance(criar_armazenamento("sqlite", "login"), ArmazenamentoSQLite)
+
+    def test_tipo_invalido(self):
+        with pytest.raises(ValueError):
+            criar_armazenamento("redis")
+
+    def test_implementacao_precisa_definir_operacoes(self):
+        class SemConsumir(ArmazenamentoRateLimit):
+            def consultar(self, identificador, capacidade, janela_segundos, agora):
+                return None
+
+            def limpar(self, identificador=None):
+                pass
+
+        with pytest.raises(TypeError):
+            SemConsumir()
+
+    def test_dynamic_aceita_armazenamento(self):
+        armazenamento = ArmazenamentoMemoria()
+        limiter = DynamicRateLimiter("rate_limit_login_max", "rate_limit_login_minutos", armazenamento=armazenamento)
+
+        limiter.verificar("ip")
+
+        assert "ip" in armazenamento.estados
+
+
+class _RateLimiterLista:
+    """
+    Implementação anterior do RateLimiter (lista de datetimes por
+    identificador, sem descarte), mantida apenas como referência do benchmark.
+    """
+
+    def __init__(self, max_tentativas: int, janela_minutos: int):
+        self.max_tentativas = max_tentativas
+        self.janela = timedelta(minutes=janela_minutos)
+        self.tentativas = defaultdict(list)
+
+    def verificar(self, identificador: str) -> bool:
+        agora = datetime.now()
+        self.tentativas[identificador] = [
+            t for t in self.tentativas[identificador] if agora - t < self.janela
+        ]
+        if len(self.tentativas[identificador]) >= self.max_tentativas:
+            return False
+        self.tentativas[identificador].append(agora)
+        return True
+
+
+@pytest.mark.slow
+class TestRateLimiterDesempenho:
+    """Benchmark com 100 mil IPs distintos: implementação anterior x token bucket"""
+
+    QUANTIDADE = 100_000
+    TENTATIVAS_POR_IP = 5
+
+    def _carga(self, limiter):
+        ips = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(self.QUANTIDADE)]
+        for _ in range(self.TENTATIVAS_POR_IP):
+            for ip in ips:
+                limiter.verificar(ip)
+
+    def _medir_tempo(self, limiter) -> float:
+        inicio = time.perf_counter()
+        self._carga(limiter)
+        return time.perf_counter() - inicio
+
+    def _medir_memoria(self, limiter) -> int:
+        """Bytes retidos pelo limiter ao fim da carga"""
+        tracemalloc.start()
+        antes = tracemalloc.take_snapshot()
+        self._carga(limiter)
+        depois = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        return sum(s.size_diff for s in depois.compare_to(antes, "filename"))
+
+    def test_memoria_limitada_sem_perder_desempenho(self):
+        lista = _RateLimiterLista(max_tentativas=10, janela_minutos=1)
+        bucket = RateLimiter(max_tentativas=10, janela_minutos=1, max_chaves=10_000)
+
+        tempo_lista = self._medir_tempo(lista)
+        tempo_bucket = self._medir_tempo(bucket)
+        lista.tentativas.clear()
+        bucket.limpar()
+        memoria_lista = self._medir_memoria(lista)
+        memoria_bucket = self._medir_memoria(bucket)
+
+        medicoes = (
+            f"{self.QUANTIDADE} IPs x {self.TENTATIVAS_POR_IP}: "
+            f"lista {tempo_lista:.2f}s / {memoria_lista / 1e6:.1f} MB, "
+            f"token bucket {tempo_bucket:.2f}s / {memoria_bucket / 1e6:.1f} MB"
+        )
+        assert len(lista.tentativas) == self.QUANTIDADE
+        assert len(bucket.armazenamento.estados) == 10_000
+        assert memoria_bucket < memoria_lista / 5, medicoes
+        # Tempos próximos: o ganho é de memória, não pode haver regressão de CPU
+        assert tempo_bucket < tempo_lista * 1.5, medicoes
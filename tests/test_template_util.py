@@ -0,0 +1,45 @@
+"""
+Testes do ambiente Jinja2 compartilhado (util/template_util.py).
+"""
+from pathlib import Path
+
+from util import template_util
+from util.template_util import criar_templates, obter_templates, precompilar_templates
+
+
+class TestAmbienteCompartilhado:
+    """Testes do Environment único, com cache de bytecode"""
+
+    def test_routers_recebem_a_mesma_instancia(self):
+        from routes import auth_routes, public_routes, tarefas_routes
+
+        assert auth_routes.templates is public_routes.templates_public is tarefas_routes.templates
+        assert criar_templates("templates/admin") is obter_templates()
+
+    def test_template_compilado_uma_vez(self):
+        env = obter_templates().env
+
+        assert env.get_template("errors/404.html") is env.get_template("errors/404.html")
+
+    def test_precompila_todos_os_templates(self):
+        total = len(list(Path(template_util.PASTA_TEMPLATES).rglob("*.html")))
+
+        assert precompilar_templates() == total
+        assert len(obter_templates().env.cache) >= total
+
+    def test_bytecode_gravado_em_disco(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(template_util, "TEMPLATES_BYTECODE_CACHE_DIR", str(tmp_path / "bytecode"))
+        env = template_util._criar_ambiente()
+
+        env.get_template("errors/404.html")
+
+        assert any((tmp_path / "bytecode").iterdir())
+
+    def test_auto_reload_conforme_configuracao(self, monkeypatch):
+        monkeypatch.setattr(template_util, "TEMPLATES_AUTO_RELOAD", False)
+        monkeypatch.setattr(template_util, "TEMPLATES_BYTECODE_CACHE", False)
+
+        env = template_util._criar_ambiente()
+
+        assert env.auto_reload is False
+        assert env.bytecode_cache is None
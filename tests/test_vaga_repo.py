@@ -2,13 +2,18 @@
 Testes para o repositório de vagas (vaga_repo).
 Cobre operações CRUD, validações, buscas e integridade de dados.
 """
+import time
+
 import pytest
 from model.vaga_model import Vaga
 from model.area_model import Area
 from model.empresa_model import Empresa
 from model.usuario_model import Usuario
 from repo import vaga_repo, area_repo, empresa_repo, usuario_repo
+from util import db_util
+from util.db_util import get_connection
 from util.security import criar_hash_senha
+from sql.vaga_sql import INSERIR as INSERIR_VAGA
 
 
 @pytest.fixture
@@ -492,6 +497,220 @@ class TestBuscar:
         assert len(vagas) == 2
 
 
+class TestBuscarTexto:
+    """Testes para busca textual (FTS5) de vagas"""
+
+    @pytest.fixture
+    def vagas_texto(self, area_teste, empresa_teste, recrutador_teste):
+        """Cria vagas com textos variados e índice FTS"""
+        vaga_repo.criar_tabela()
+        dados = [
+            ("Desenvolvedor Python", "Atuar no backend da plataforma", "Python e SQL", "SP", "Remoto", 4000.0),
+            ("Técnico em Eletrônica", "Manutenção de placas", "Curso técnico", "RJ", "Presencial", 2500.0),
+            ("Analista de Dados", "Relatórios com Python", "Estatística", "SP", "Híbrido", 3500.0),
+        ]
+        ids = []
+        for titulo, descricao, requisitos, uf, modalidade, salario in dados:
+            ids.append(vaga_repo.inserir(Vaga(
+                id_vaga=0, id_area=area_teste, id_empresa=empresa_teste,
+                id_recrutador=recrutador_teste, status_vaga="aberta",
+                titulo=titulo, descricao=descricao, numero_vagas=1,
+                salario=salario, requisitos=requisitos, uf=uf, modalidade=modalidade
+            )))
+        return ids
+
+    def test_busca_em_titulo_descricao_e_requisitos(self, vagas_texto):
+        """Deve encontrar o termo em qualquer campo textual, título com mais peso"""
+        vagas = vaga_repo.buscar_texto("python")
+
+        assert [v.id_vaga for v in vagas] == [vagas_texto[0], vagas_texto[2]]
+
+    def test_busca_ignora_acentos(self, vagas_texto):
+        """Termo sem acento deve encontrar texto acentuado e vice-versa"""
+        assert [v.id_vaga for v in vaga_repo.buscar_texto("tecnico")] == [vagas_texto[1]]
+        assert [v.id_vaga for v in vaga_repo.buscar_texto("estatistica")] == [vagas_texto[2]]
+
+    def test_busca_por_prefixo(self, vagas_texto):
+        """Prefixo deve encontrar palavras completas"""
+        vagas = vaga_repo.buscar_texto("desenv")
+
+        assert [v.id_vaga for v in vagas] == [vagas_texto[0]]
+
+    def test_busca_combinada_com_filtros(self, vagas_texto):
+        """Filtros de buscar() devem se aplicar junto com o texto"""
+        assert [v.id_vaga for v in vaga_repo.buscar_texto("python", modalidade="Híbrido")] == [vagas_texto[2]]
+        assert [v.id_vaga for v in vaga_repo.buscar_texto("python", salario_min=3800.0)] == [vagas_texto[0]]
+        assert vaga_repo.buscar_texto("python", uf="RJ") == []
+
+    def test_busca_acompanha_alteracao_e_exclusao(self, vagas_texto):
+        """Triggers devem manter o índice sincronizado com a tabela"""
+        vaga = vaga_repo.obter_por_id(vagas_texto[1])
+        vaga.titulo = "Engenheiro de Software"
+        vaga_repo.alterar(vaga)
+        vaga_repo.excluir(vagas_texto[0])
+
+        assert [v.id_vaga for v in vaga_repo.buscar_texto("engenheiro")] == [vagas_texto[1]]
+        assert vaga_repo.buscar_texto("eletronica") == []
+        assert [v.id_vaga for v in vaga_repo.buscar_texto("python")] == [vagas_texto[2]]
+
+    def test_termo_com_operadores_nao_gera_erro(self, vagas_texto):
+        """Aspas e operadores FTS digitados pelo usuário devem ser tratados como texto"""
+        vagas = vaga_repo.buscar_texto('python" (dados*')
+
+        assert [v.id_vaga for v in vagas] == [vagas_texto[2]]
+
+    def test_termo_vazio_equivale_a_buscar(self, vagas_texto):
+        """Sem palavras no termo, deve aplicar apenas os filtros"""
+        assert len(vaga_repo.buscar_texto("  ", uf="SP")) == 2
+
+
+@pytest.mark.slow
+class TestBuscarTextoDesempenho:
+    """Benchmark da busca textual com 100 mil vagas"""
+
+    QUANTIDADE = 100_000
+    PALAVRAS = [
+        "desenvolvedor", "python", "java", "analista", "dados", "suporte", "técnico",
+        "vendas", "marketing", "financeiro", "engenharia", "logística", "design",
+        "administração", "estágio", "júnior", "sênior", "pleno", "cloud", "segurança",
+    ]
+
+    @pytest.fixture
+    def banco_grande(self, tmp_path, monkeypatch):
+        """Banco separado com 100 mil vagas abertas"""
+        monkeypatch.setattr(db_util, "DATABASE_PATH", str(tmp_path / "benchmark.db"))
+        usuario_repo.criar_tabela()
+        area_repo.criar_tabela()
+        empresa_repo.criar_tabela()
+        vaga_repo.criar_tabela()
+        id_area = area_repo.inserir(Area(id_area=0, nome="Geral", descricao=""))
+        id_empresa = empresa_repo.inserir(Empresa(id_empresa=0, nome="Empresa", cnpj="00.000.000/0001-00", descricao=""))
+        id_recrutador = usuario_repo.inserir(Usuario(
+            id=0, nome="Recrutador", email="bench@test.com", senha="x", perfil="RECRUTADOR"
+        ))
+
+        n = len(self.PALAVRAS)
+        linhas = (
+            (
+                id_area, id_empresa, id_recrutador, "aberta",
+                f"{self.PALAVRAS[i % n]} {self.PALAVRAS[(i * 7) % n]} {i}",
+                f"Vaga de {self.PALAVRAS[(i * 3) % n]} com foco em {self.PALAVRAS[(i * 11) % n]}",
+                1, float(1000 + i % 9000),
+                f"Conhecimento em {self.PALAVRAS[(i * 13) % n]}",
+                None, None, ["Remoto", "Presencial", "Híbrido"][(i // 3) % 3], "Cidade", ["SP", "RJ", "MG", "ES"][(i // 7) % 4]
+            )
+            for i in range(self.QUANTIDADE)
+        )
+        with get_connection() as conn:
+            conn.executemany(INSERIR_VAGA, linhas)
+        yield
+        db_util.fechar_pool()
+
+    def test_latencia_com_100_mil_vagas(self, banco_grande):
+        """Consultas ranqueadas devem responder em poucos milissegundos"""
+        consultas = [
+            {"termo": "python"},
+            {"termo": "tecnico estagio"},
+            {"termo": "desenv"},
+            {"termo": "analista", "uf": "SP", "modalidade": "Remoto"},
+            {"termo": "financeiro", "salario_min": 8000.0},
+        ]
+        tempos = {}
+        for filtros in consultas:
+            vaga_repo.buscar_texto(limit=20, **filtros)  # aquecimento
+            inicio = time.perf_counter()
+            for _ in range(10):
+                vagas = vaga_repo.buscar_texto(limit=20, **filtros)
+            tempos[filtros["termo"]] = (time.perf_counter() - inicio) / 10 * 1000
+            assert vagas
+
+        lentas = {termo: round(ms, 1) for termo, ms in tempos.items() if ms >= 500}
+        assert not lentas, f"buscar_texto com {self.QUANTIDADE} vagas acima de 500 ms/consulta: {lentas}"
+
+
+class TestObterFacetas:
+    """Testes para contagens por faceta da busca de vagas"""
+
+    @pytest.fixture
+    def vagas_facetas(self, area_teste, empresa_teste, recrutador_teste):
+        """Cria vagas em duas áreas, UFs, modalidades e faixas salariais"""
+        vaga_repo.criar_tabela()
+        vaga_repo.limpar_cache_facetas()
+        id_area2 = area_repo.inserir(Area(id_area=0, nome="Saúde", descricao=""))
+        dados = [
+            (area_teste, "Desenvolvedor Python", "SP", "Remoto", 4000.0, "aberta"),
+            (area_teste, "Analista de Dados", "SP", "Presencial", 2000.0, "aberta"),
+            (area_teste, "Suporte Técnico", "RJ", "Remoto", 0.0, "aberta"),
+            (id_area2, "Enfermeiro", "SP", "Presencial", 6000.0, "aberta"),
+            (id_area2, "Técnico de Enfermagem", "MG", "Presencial", 2500.0, "fechada"),
+        ]
+        for id_area, titulo, uf, modalidade, salario, status_vaga in dados:
+            vaga_repo.inserir(Vaga(
+                id_vaga=0, id_area=id_area, id_empresa=empresa_teste,
+                id_recrutador=recrutador_teste, status_vaga=status_vaga,
+                titulo=titulo, descricao="", numero_vagas=1,
+                salario=salario, uf=uf, modalidade=modalidade
+            ))
+        return area_teste, id_area2
+
+    def test_facetas_sem_filtros(self, vagas_facetas):
+        """Deve contar apenas vagas abertas em cada faceta"""
+        area_ti, area_saude = vagas_facetas
+
+        facetas = vaga_repo.obter_facetas()
+
+        assert facetas.total == 4
+        assert facetas.por_area == {area_ti: 3, area_saude: 1}
+        assert facetas.nomes_area[area_saude] == "Saúde"
+        assert facetas.por_uf == {"SP": 3, "RJ": 1}
+        assert facetas.por_modalidade == {"Remoto": 2, "Presencial": 2}
+        assert facetas.por_faixa_salarial == {
+            "a_combinar": 1, "ate_1500": 0, "1500_3000": 1, "3000_5000": 1, "acima_5000": 1
+        }
+
+    def test_faceta_ignora_o_proprio_filtro(self, vagas_facetas):
+        """Com UF selecionada, por_uf mostra as alternativas e as demais facetas são filtradas"""
+        area_ti, area_saude = vagas_facetas
+
+        facetas = vaga_repo.obter_facetas(uf="SP")
+
+        assert facetas.total == 3
+        assert facetas.por_uf == {"SP": 3, "RJ": 1}
+        assert facetas.por_area == {area_ti: 2, area_saude: 1}
+        assert facetas.por_modalidade == {"Remoto": 1, "Presencial": 2}
+
+    def test_facetas_com_texto_e_salario(self, vagas_facetas):
+        """Termo e salário mínimo restringem todas as facetas"""
+        area_ti, _ = vagas_facetas
+
+        assert vaga_repo.obter_facetas(termo="tecnico").por_area == {area_ti: 1}
+        assert vaga_repo.obter_facetas(salario_min=3000.0).total == 2
+
+    def test_resultado_em_cache_nao_pode_ser_alterado(self, vagas_facetas):
+        """A instância em cache é compartilhada: alterá-la não pode vazar para outra busca"""
+        facetas = vaga_repo.obter_facetas()
+
+        with pytest.raises(TypeError):
+            facetas.por_uf["SP"] = 0
+        with pytest.raises(AttributeError):
+            facetas.total = 0
+
+        assert vaga_repo.obter_facetas().por_uf == {"SP": 3, "RJ": 1}
+        assert vaga_repo.obter_facetas().total == 4
+
+    def test_cache_descartado_ao_alterar_vaga(self, vagas_facetas, area_teste, empresa_teste, recrutador_teste):
+        """Resultado em cache não deve sobreviver a uma inserção de vaga"""
+        assert vaga_repo.obter_facetas().total == 4
+
+        vaga_repo.inserir(Vaga(
+            id_vaga=0, id_area=area_teste, id_empresa=empresa_teste,
+            id_recrutador=recrutador_teste, status_vaga="aberta",
+            titulo="Nova", descricao="", numero_vagas=1, salario=0.0
+        ))
+
+        assert vaga_repo.obter_facetas().total == 5
+
+
 class TestObterQuantidade:
     """Testes para contagem de vagas"""
 
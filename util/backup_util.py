@@ -5,7 +5,6 @@ Fornece funções para criar, listar, restaurar e excluir backups do banco de da
 Os backups são armazenados no diretório 'backups/' com nomenclatura padronizada.
 """
 import os
-import shutil
 import sqlite3
 from pathlib import Path
 from datetime import datetime
@@ -13,6 +12,7 @@ from typing import Optional, List
 from dataclasses import dataclass
 
 from util.config import DATABASE_PATH
+from util.db_util import copiar_banco_para, restaurar_banco_de
 from util.logger_config import logger
 from util.datetime_util import agora
 
@@ -216,8 +216,8 @@ def criar_backup(automatico: bool = False) -> tuple[bool, str]:
         nome_backup = agora().strftime(formato)
         caminho_backup = BACKUP_DIR / nome_backup
 
-        # Copiar arquivo do banco de dados
-        shutil.copy2(db_path, caminho_backup)
+        # Instantâneo consistente, incluindo o que ainda está no WAL
+        copiar_banco_para(str(caminho_backup))
 
         # Obter tamanho do backup
         tamanho = caminho_backup.stat().st_size
@@ -342,9 +342,9 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
                 logger.warning(f"Falha ao criar backup de segurança: {msg}")
                 # Continua mesmo se falhar o backup automático
 
-        # Restaurar backup (copiar sobre o arquivo atual)
-        db_path = Path(DATABASE_PATH)
-        shutil.copy2(caminho_backup, db_path)
+        # Restaurar backup dentro do banco em uso (nunca copiando o arquivo por
+        # fora: outros workers mantêm -wal/-shm abertos sobre ele)
+        restaurar_banco_de(str(caminho_backup))
 
         # VALIDAÇÃO PÓS-RESTAURAÇÃO: Verificar se banco restaurado está válido
         logger.info("Verificando integridade do banco após restauração...")
@@ -353,7 +353,7 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
             logger.error("Banco corrompido após restauração! Executando rollback...")
 
             if caminho_backup_seguranca and caminho_backup_seguranca.exists():
-                shutil.copy2(caminho_backup_seguranca, db_path)
+                restaurar_banco_de(str(caminho_backup_seguranca))
                 mensagem = f"Restauração falhou! Banco revertido para estado anterior. Backup '{nome_arquivo}' pode estar corrompido."
                 logger.error(mensagem)
                 return False, mensagem, nome_backup_automatico
@@ -374,8 +374,7 @@ def restaurar_backup(nome_arquivo: str, criar_backup_antes: bool = True) -> tupl
         # Tentar rollback em caso de exceção
         if caminho_backup_seguranca and caminho_backup_seguranca.exists():
             try:
-                db_path = Path(DATABASE_PATH)
-                shutil.copy2(caminho_backup_seguranca, db_path)
+                restaurar_banco_de(str(caminho_backup_seguranca))
                 logger.info("Rollback executado com sucesso após exceção")
                 mensagem += " (Banco revertido para estado anterior)"
             except Exception as rollback_error:
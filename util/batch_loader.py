@@ -0,0 +1,156 @@
+"""
+Carregamento em lote de entidades relacionadas (padrão DataLoader).
+
+Enriquecer uma lista (ex: nome da área e da empresa de cada vaga) chamando
+obter_por_id item a item gera N+1 consultas. O CarregadorLote junta os IDs
+pedidos na mesma volta do event loop e resolve todos com uma única chamada
+`obter_por_ids` (um `WHERE id IN (...)` por tipo de entidade), guardando os
+resultados durante a requisição para não buscar o mesmo ID duas vezes.
+
+Uso em uma rota:
+    from util.batch_loader import obter_carregador
+
+    areas = obter_carregador(request, area_repo.obter_por_ids)
+    empresas = obter_carregador(request, empresa_repo.obter_por_ids)
+
+    # Duas consultas, independentemente do tamanho da lista
+    areas_vagas, empresas_vagas = await asyncio.gather(
+        areas.carregar_muitos([v.id_area for v in vagas]),
+        empresas.carregar_muitos([v.id_empresa for v in vagas]),
+    )
+"""
+
+import asyncio
+from typing import Callable, Dict, Generic, Hashable, Iterable, List, Optional, Set, TypeVar
+
+from fastapi import Request
+
+from util.db_async import ExecutorBanco, executor_banco
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Função de repositório que recebe vários IDs e devolve {id: entidade}
+FuncaoLote = Callable[[List[K]], Dict[K, V]]
+
+
+class CarregadorLote(Generic[K, V]):
+    """
+    Agrupa pedidos individuais de entidades em uma consulta por lote.
+
+    Chamadas a `carregar` feitas antes de o event loop seguir em frente
+    (ex: dentro de um asyncio.gather) entram no mesmo lote. Cada chave é
+    buscada no máximo uma vez por instância, então a instância deve viver
+    apenas durante uma requisição (ver obter_carregador).
+    """
+
+    def __init__(self, funcao_lote: FuncaoLote, executor: Optional[ExecutorBanco] = None):
+        """
+        Inicializa o carregador.
+
+        Args:
+            funcao_lote: Função síncrona ids -> {id: entidade} (ex: area_repo.obter_por_ids)
+            executor: Executor de banco (padrão: executor global das rotas)
+        """
+        self._funcao_lote = funcao_lote
+        self._executor = executor or executor_banco
+        self._memo: Dict[K, "asyncio.Future[Optional[V]]"] = {}
+        self._pendentes: Dict[K, "asyncio.Future[Optional[V]]"] = {}
+        # O event loop guarda tarefas só por referência fraca: sem esta, o
+        # despacho poderia ser coletado no meio e quem aguarda nunca acordaria
+        self._tarefas: Set[asyncio.Task] = set()
+        self.lotes = 0
+
+    async def carregar(self, chave: Optional[K]) -> Optional[V]:
+        """
+        Obtém uma entidade pela chave, juntando-se ao lote em formação.
+
+        Args:
+            chave: ID da entidade (None retorna None sem consultar)
+
+        Returns:
+            Entidade encontrada ou None
+        """
+        if chave is None:
+            return None
+
+        futuro = self._memo.get(chave)
+        if futuro is None:
+            loop = asyncio.get_running_loop()
+            futuro = loop.create_future()
+            self._memo[chave] = futuro
+            if not self._pendentes:
+                # Despacha depois que as demais tarefas prontas registrarem suas chaves
+                loop.call_soon(self._agendar_despacho)
+            self._pendentes[chave] = futuro
+
+        return await asyncio.shield(futuro)
+
+    async def carregar_muitos(self, chaves: Iterable[Optional[K]]) -> List[Optional[V]]:
+        """
+        Obtém várias entidades, na mesma ordem das chaves.
+
+        Args:
+            chaves: IDs das entidades (podem se repetir ou ser None)
+
+        Returns:
+            Lista com a entidade (ou None) de cada chave
+        """
+        return list(await asyncio.gather(*(self.carregar(chave) for chave in chaves)))
+
+    def _agendar_despacho(self) -> None:
+        """Cria a tarefa do lote, mantendo referência até terminar."""
+        tarefa = asyncio.ensure_future(self._despachar())
+        self._tarefas.add(tarefa)
+        tarefa.add_done_callback(self._tarefas.discard)
+
+    async def _despachar(self) -> None:
+        """Executa a consulta do lote pendente e resolve quem aguarda."""
+        lote, self._pendentes = self._pendentes, {}
+        if not lote:
+            return
+
+        self.lotes += 1
+        try:
+            resultado = await self._executor.executar(self._funcao_lote, list(lote))
+        except Exception as e:
+            for chave, futuro in lote.items():
+                # Falha não fica memorizada: nova tentativa consulta de novo
+                self._memo.pop(chave, None)
+                if not futuro.done():
+                    futuro.set_exception(e)
+            return
+
+        for chave, futuro in lote.items():
+            if not futuro.done():
+                futuro.set_result(resultado.get(chave))
+
+    def limpar(self) -> None:
+        """Esquece as entidades já carregadas (ex: após alterá-las)."""
+        self._memo = {chave: futuro for chave, futuro in self._memo.items() if chave in self._pendentes}
+
+
+def obter_carregador(request: Request, funcao_lote: FuncaoLote) -> CarregadorLote:
+    """
+    Obtém o carregador da requisição para uma função de lote.
+
+    A mesma função na mesma requisição sempre devolve o mesmo carregador,
+    então entidades já buscadas (mesmo por outro trecho da rota) são reaproveitadas.
+
+    Args:
+        request: Requisição atual
+        funcao_lote: Função ids -> {id: entidade} do repositório
+
+    Returns:
+        CarregadorLote exclusivo desta requisição
+    """
+    carregadores = getattr(request.state, "carregadores_lote", None)
+    if carregadores is None:
+        carregadores = {}
+        request.state.carregadores_lote = carregadores
+
+    carregador = carregadores.get(funcao_lote)
+    if carregador is None:
+        carregador = CarregadorLote(funcao_lote)
+        carregadores[funcao_lote] = carregador
+    return carregador
@@ -0,0 +1,104 @@
+"""
+Cache de fragmentos de template renderizados.
+
+Extensão Jinja2 que adiciona a tag {% cache %}: o HTML produzido pelo
+bloco é guardado e reaproveitado nas próximas renderizações, sem avaliar
+de novo condicionais, includes e consultas à sessão.
+
+Uso (em qualquer template, inclusive templates/components/*.html):
+    {% cache "menu_usuario" %} ... {% endcache %}
+    {% cache ("links", request.path), 600 %} ... {% endcache %}
+    {% cache ("links", secao, perfil), none, false %} ... {% endcache %}
+
+A chave informada (string ou tupla) é sempre combinada com o nome do
+template e a versão das configurações (ConfigCache.obter_versao), então
+uma alteração de configuração (ex: tema) invalida todos os fragmentos.
+O segundo argumento é o tempo de vida em segundos (padrão:
+TEMPLATES_CACHE_FRAGMENTOS_TTL_SEGUNDOS; none = padrão). O terceiro,
+por_usuario (padrão: true), acrescenta o id do usuário logado
+(request.session["usuario_logado"]) à chave; use false em fragmentos
+que não dependem do usuário, para que todos compartilhem a mesma entrada.
+
+Só use a tag em trechos que dependam apenas da chave, do usuário e das
+configurações: o que mais variar (caminho, nome, perfil) deve fazer parte
+da chave. Prefira chaves de poucos valores (seção do menu, não o caminho
+completo), ou quase toda renderização será uma falta. O cache é por
+processo, como util/cache_util.CacheTTL.
+"""
+
+from typing import Any, Callable, Hashable, Optional
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+from jinja2.parser import Parser
+from jinja2.runtime import Context
+
+from util.cache_util import CacheTTL
+from util.config import TEMPLATES_CACHE_FRAGMENTOS_MAX_ITENS, TEMPLATES_CACHE_FRAGMENTOS_TTL_SEGUNDOS
+from util.config_cache import config
+
+# Instância global (métricas em /health)
+cache_fragmentos = CacheTTL(
+    ttl_segundos=TEMPLATES_CACHE_FRAGMENTOS_TTL_SEGUNDOS,
+    max_itens=TEMPLATES_CACHE_FRAGMENTOS_MAX_ITENS
+)
+
+
+def _obter_usuario_id(contexto: Context) -> Optional[int]:
+    """Id do usuário logado na requisição do contexto (None para visitantes)."""
+    request = contexto.get("request")
+    if request is None:
+        return None
+    # Lê do scope: request.session exige o SessionMiddleware
+    usuario = (request.scope.get("session") or {}).get("usuario_logado")
+    return usuario.get("id") if usuario else None
+
+
+class CacheFragmentosExtension(Extension):
+    """Tag {% cache chave[, ttl[, por_usuario]] %} ... {% endcache %}"""
+
+    tags = {"cache"}
+
+    def parse(self, parser: Parser) -> nodes.Node:
+        lineno = next(parser.stream).lineno
+
+        chave = parser.parse_expression()
+        ttl = parser.parse_expression() if parser.stream.skip_if("comma") else nodes.Const(None)
+        por_usuario = parser.parse_expression() if parser.stream.skip_if("comma") else nodes.Const(True)
+        corpo = parser.parse_statements(("name:endcache",), drop_needle=True)
+
+        args = [nodes.ContextReference(), nodes.Const(parser.name), chave, ttl, por_usuario]
+        return nodes.CallBlock(self.call_method("_renderizar", args), [], [], corpo).set_lineno(lineno)
+
+    def _renderizar(
+        self,
+        contexto: Context,
+        template: Optional[str],
+        chave: Hashable,
+        ttl_segundos: Optional[float],
+        por_usuario: bool = True,
+        *,
+        caller: Callable[[], Any]
+    ) -> Any:
+        """
+        Retorna o fragmento do cache ou renderiza o bloco e o guarda.
+
+        Args:
+            contexto: Contexto da renderização (para obter o usuário)
+            template: Nome do template que contém a tag
+            chave: Chave informada na tag (deve ser hashable)
+            ttl_segundos: Tempo de vida informado na tag (None = padrão)
+            por_usuario: Se o fragmento é separado por usuário logado (padrão
+                         também para bytecode compilado antes do argumento existir)
+            caller: Renderiza o corpo do bloco
+
+        Returns:
+            HTML do fragmento
+        """
+        usuario_id = _obter_usuario_id(contexto) if por_usuario else None
+        chave_completa = (template, chave, usuario_id, config.obter_versao())
+        html = cache_fragmentos.obter(chave_completa)
+        if html is None:
+            html = caller()
+            cache_fragmentos.definir(chave_completa, html, ttl_segundos)
+        return html
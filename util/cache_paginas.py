@@ -0,0 +1,93 @@
+"""
+Cache de páginas públicas inteiras para visitantes anônimos.
+
+As páginas públicas (/, /index, /sobre) são iguais para todo visitante
+sem login e sem mensagens flash pendentes. Nesses casos a página é
+renderizada uma vez e os bytes são reaproveitados, com ETag forte: um
+navegador que reenvia o ETag em If-None-Match recebe 304 sem corpo.
+
+A chave é (caminho, tema, versão das configurações), então qualquer
+alteração de configuração, em qualquer worker, gera páginas novas;
+post_aplicar_tema também limpa o cache explicitamente.
+
+Uso (routes/public_routes.py):
+    @router.get("/sobre")
+    async def sobre(request: Request):
+        return responder_pagina_publica(request, templates_public, "sobre.html")
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, status
+from fastapi.responses import Response
+from fastapi.templating import Jinja2Templates
+
+from util.cache_util import CacheTTL
+from util.config import PAGINAS_CACHE_TTL_SEGUNDOS, PAGINAS_CACHE_MAX_ITENS
+from util.config_cache import config
+
+# Instância global (métricas em /health, limpa ao aplicar tema)
+cache_paginas = CacheTTL(ttl_segundos=PAGINAS_CACHE_TTL_SEGUNDOS, max_itens=PAGINAS_CACHE_MAX_ITENS)
+
+# Sempre revalidar: a mesma URL muda de conteúdo quando o visitante faz login
+_CACHE_CONTROL = "no-cache"
+
+
+def _visitante_anonimo(request: Request) -> bool:
+    """True se a página não depende da sessão (sem login e sem mensagens flash)."""
+    sessao = request.session
+    return not sessao.get("usuario_logado") and not sessao.get("mensagens")
+
+
+def _calcular_etag(corpo: bytes) -> str:
+    """ETag forte a partir do conteúdo."""
+    return f'"{hashlib.sha256(corpo).hexdigest()[:32]}"'
+
+
+def _etag_corresponde(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Compara o cabeçalho If-None-Match com o ETag atual.
+
+    Usa comparação fraca (ignora o prefixo W/), como exige a RFC 9110
+    para If-None-Match, e aceita "*" e listas separadas por vírgula.
+    """
+    if not if_none_match:
+        return False
+    for candidato in if_none_match.split(","):
+        candidato = candidato.strip()
+        if candidato == "*" or candidato.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def responder_pagina_publica(request: Request, templates: Jinja2Templates, nome_template: str) -> Response:
+    """
+    Responde uma página pública, do cache quando o visitante é anônimo.
+
+    Args:
+        request: Requisição atual
+        templates: Instância de templates usada para renderizar
+        nome_template: Template da página (contexto: apenas request)
+
+    Returns:
+        200 com a página (e ETag, se anônimo) ou 304 se o ETag enviado
+        pelo navegador ainda é válido
+    """
+    if not _visitante_anonimo(request):
+        return templates.TemplateResponse(nome_template, {"request": request})
+
+    chave = (request.url.path, config.obter("theme", ""), config.obter_versao())
+    pagina = cache_paginas.obter(chave)
+    if pagina is None:
+        resposta = templates.TemplateResponse(nome_template, {"request": request})
+        if resposta.status_code != status.HTTP_200_OK:
+            return resposta
+        pagina = (bytes(resposta.body), _calcular_etag(resposta.body), resposta.media_type)
+        cache_paginas.definir(chave, pagina)
+
+    corpo, etag, media_type = pagina
+    cabecalhos = {"ETag": etag, "Cache-Control": _CACHE_CONTROL, "Vary": "Cookie"}
+    if _etag_corresponde(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabecalhos)
+    return Response(content=corpo, media_type=media_type, headers=cabecalhos)
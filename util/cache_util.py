@@ -0,0 +1,113 @@
+"""
+Cache em memória com expiração por tempo (TTL).
+
+Para resultados caros e tolerantes a alguns segundos de atraso
+(contagens, agregações), evitando repetir a mesma consulta a cada requisição.
+O cache é por processo: cada worker mantém o seu.
+
+Exemplo de uso:
+    from util.cache_util import CacheTTL
+
+    _cache = CacheTTL(ttl_segundos=30, max_itens=256)
+
+    def contar(filtros: tuple) -> dict:
+        resultado = _cache.obter(filtros)
+        if resultado is None:
+            resultado = consulta_cara(filtros)
+            _cache.definir(filtros, resultado)
+        return resultado
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class CacheTTL:
+    """
+    Cache chave -> valor com expiração e limite de itens.
+
+    Itens expiram `ttl_segundos` após gravados. Ao exceder `max_itens`,
+    o item usado há mais tempo é descartado. Seguro para uso entre threads.
+    """
+
+    def __init__(self, ttl_segundos: float, max_itens: int = 256):
+        """
+        Inicializa o cache.
+
+        Args:
+            ttl_segundos: Tempo de vida de cada item (0 desativa o cache)
+            max_itens: Número máximo de itens mantidos
+        """
+        if max_itens <= 0:
+            raise ValueError("max_itens deve ser positivo")
+
+        self.ttl_segundos = ttl_segundos
+        self.max_itens = max_itens
+        self._itens: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._acertos = 0
+        self._faltas = 0
+
+    def obter(self, chave: Hashable) -> Optional[Any]:
+        """
+        Obtém um valor do cache.
+
+        Args:
+            chave: Chave do item
+
+        Returns:
+            Valor armazenado, ou None se ausente ou expirado
+        """
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None or item[0] <= time.monotonic():
+                if item is not None:
+                    del self._itens[chave]
+                self._faltas += 1
+                return None
+
+            self._itens.move_to_end(chave)
+            self._acertos += 1
+            return item[1]
+
+    def definir(self, chave: Hashable, valor: Any, ttl_segundos: Optional[float] = None) -> None:
+        """
+        Grava um valor no cache.
+
+        Args:
+            chave: Chave do item
+            valor: Valor a armazenar
+            ttl_segundos: Tempo de vida deste item (padrão: o do cache)
+        """
+        ttl = self.ttl_segundos if ttl_segundos is None else ttl_segundos
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._itens[chave] = (time.monotonic() + ttl, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def limpar(self) -> None:
+        """Remove todos os itens (ex: após alteração dos dados de origem)."""
+        with self._lock:
+            self._itens.clear()
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna métricas do cache.
+
+        Returns:
+            Dicionário com itens, acertos e faltas
+        """
+        with self._lock:
+            return {
+                "itens": len(self._itens),
+                "max_itens": self.max_itens,
+                "ttl_segundos": self.ttl_segundos,
+                "acertos": self._acertos,
+                "faltas": self._faltas,
+            }
@@ -0,0 +1,149 @@
+"""
+Fila limitada de eventos de uma conexão SSE do chat.
+
+Um cliente lento ou travado não pode acumular eventos na memória para
+sempre. Cada conexão tem uma FilaEventos com tamanho máximo e uma política
+para quando ela enche:
+    - "descartar_antigo": remove o evento pendente mais antigo (padrão; o
+      cliente recupera o histórico pela paginação de mensagens)
+    - "descartar_novo": recusa o evento que chegou
+
+Eventos de tipos agrupáveis (ex: "atualizar_contador") que ainda não foram
+enviados são substituídos pelo mais recente da mesma sala, em vez de ocupar
+uma posição nova: o cliente só precisa do último.
+"""
+
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+# Resultado de FilaEventos.colocar
+ENFILEIRADO = "enfileirados"
+COALESCIDO = "coalescidos"
+DESCARTADO = "descartados"
+
+POLITICAS = ("descartar_antigo", "descartar_novo")
+
+
+class FilaEventos:
+    """
+    Fila assíncrona de eventos com limite, agrupamento e descarte.
+
+    Produtores usam `colocar` (nunca bloqueia); o stream SSE usa
+    `obter_lote`, que espera o primeiro evento e devolve todos os
+    pendentes de uma vez (até `max_itens`).
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        politica: str = "descartar_antigo",
+        tipos_agrupaveis: Iterable[str] = ("atualizar_contador",)
+    ):
+        """
+        Inicializa a fila.
+
+        Args:
+            maxsize: Máximo de eventos pendentes
+            politica: "descartar_antigo" ou "descartar_novo"
+            tipos_agrupaveis: Valores de evento["tipo"] que podem ser agrupados
+
+        Raises:
+            ValueError: Se maxsize não for positivo ou a política for desconhecida
+        """
+        if maxsize <= 0:
+            raise ValueError("maxsize deve ser positivo")
+        if politica not in POLITICAS:
+            raise ValueError(f"Política de fila inválida: {politica!r} (use {' ou '.join(POLITICAS)})")
+
+        self.maxsize = maxsize
+        self.politica = politica
+        self.tipos_agrupaveis = frozenset(tipos_agrupaveis)
+        # Cada posição é uma lista [evento] para permitir substituir o evento no lugar
+        self._itens: Deque[List[dict]] = deque()
+        self._agrupados: Dict[Tuple, List[dict]] = {}
+        self._disponivel = asyncio.Event()
+
+    def _chave_agrupamento(self, evento: dict) -> Optional[Tuple]:
+        """Chave (tipo, sala_id) de eventos agrupáveis, ou None."""
+        tipo = evento.get("tipo")
+        if tipo in self.tipos_agrupaveis:
+            return (tipo, evento.get("sala_id"))
+        return None
+
+    def _remover_mais_antigo(self) -> None:
+        """Retira o primeiro item, mantendo o índice de agrupamento coerente."""
+        item = self._itens.popleft()
+        chave = self._chave_agrupamento(item[0])
+        if chave is not None and self._agrupados.get(chave) is item:
+            del self._agrupados[chave]
+
+    def colocar(self, evento: dict) -> str:
+        """
+        Adiciona um evento sem bloquear.
+
+        Args:
+            evento: Dicionário com dados do evento
+
+        Returns:
+            ENFILEIRADO, COALESCIDO (substituiu um pendente) ou DESCARTADO
+            (fila cheia: o novo evento, ou o mais antigo, foi perdido)
+        """
+        chave = self._chave_agrupamento(evento)
+        if chave is not None and chave in self._agrupados:
+            self._agrupados[chave][0] = evento
+            return COALESCIDO
+
+        resultado = ENFILEIRADO
+        if len(self._itens) >= self.maxsize:
+            if self.politica == "descartar_novo":
+                return DESCARTADO
+            self._remover_mais_antigo()
+            resultado = DESCARTADO
+
+        item = [evento]
+        self._itens.append(item)
+        if chave is not None:
+            self._agrupados[chave] = item
+        self._disponivel.set()
+        return resultado
+
+    def get_nowait(self) -> dict:
+        """
+        Retira o evento mais antigo sem esperar.
+
+        Raises:
+            asyncio.QueueEmpty: Se não houver eventos pendentes
+        """
+        if not self._itens:
+            raise asyncio.QueueEmpty()
+        evento = self._itens[0][0]
+        self._remover_mais_antigo()
+        return evento
+
+    async def obter_lote(self, max_itens: int) -> List[dict]:
+        """
+        Aguarda eventos e retorna os pendentes, em ordem de chegada.
+
+        Args:
+            max_itens: Máximo de eventos devolvidos de uma vez
+
+        Returns:
+            Lista com pelo menos um evento
+        """
+        while not self._itens:
+            self._disponivel.clear()
+            await self._disponivel.wait()
+
+        lote = []
+        while self._itens and len(lote) < max_itens:
+            lote.append(self.get_nowait())
+        return lote
+
+    def qsize(self) -> int:
+        """Quantidade de eventos pendentes."""
+        return len(self._itens)
+
+    def empty(self) -> bool:
+        """Indica se não há eventos pendentes."""
+        return not self._itens
@@ -1,59 +1,168 @@
 """
 Gerenciador de conexões SSE do chat.
 Mantém conexões ativas e faz broadcast de mensagens para usuários conectados.
+Também publica eventos de presença (online/offline) e de digitação.
 """
 import asyncio
-from typing import Dict, Set
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from repo import chat_participante_repo
+from util.chat_fila import COALESCIDO, DESCARTADO, ENFILEIRADO, POLITICAS, FilaEventos
+from util.chat_pubsub import BarramentoChat, BarramentoLocal, criar_barramento
+from util.config import (
+    CHAT_SSE_FILA_MAX,
+    CHAT_SSE_POLITICA_FILA_CHEIA,
+    CHAT_SSE_EVENTOS_AGRUPAVEIS,
+    CHAT_PRESENCA_ATRASO_OFFLINE_SEGUNDOS,
+    CHAT_DIGITANDO_INTERVALO_SEGUNDOS
+)
+from util.db_async import executar_db
 from util.logger_config import logger
 
+# Acima deste número de registros, entradas vencidas do limite de "digitando" são descartadas
+_MAX_REGISTROS_DIGITANDO = 10000
+
 
 class ChatManager:
     """
     Gerencia conexões SSE para o sistema de chat.
 
-    Cada usuário tem UMA conexão SSE que recebe mensagens de TODAS as suas salas.
-    Quando uma mensagem é enviada em uma sala, o ChatManager faz broadcast
-    para ambos os participantes da sala (se estiverem conectados).
+    Cada conexão SSE recebe mensagens de TODAS as salas do usuário. Um usuário
+    pode ter várias conexões simultâneas (uma por aba), cada uma com sua
+    própria fila limitada. Quando uma mensagem é enviada em uma sala, o
+    ChatManager faz broadcast para todas as conexões dos dois participantes.
+
+    O broadcast passa pelo barramento configurado (util/chat_pubsub.py), que
+    leva o evento a todos os workers; cada um entrega às conexões que mantém.
+
+    Presença: quando um usuário abre a primeira conexão, seus contatos
+    (quem tem sala com ele) recebem {"tipo": "presenca", "online": true}.
+    O aviso de offline só sai se ele continuar sem conexões após
+    `atraso_offline` segundos, então recarregar a página não gera eventos.
+
+    A presença considera só as conexões deste worker: com vários workers,
+    um usuário conectado em outro processo pareceria offline aqui. Por
+    isso ela só é ativada com o barramento local (CHAT_PUBSUB_BACKEND=local,
+    um único worker); com outro barramento, nenhum evento de presença é
+    publicado e obter_presenca não informa ninguém.
     """
 
-    def __init__(self):
-        # Dicionário de filas: usuario_id -> asyncio.Queue
-        self._connections: Dict[int, asyncio.Queue] = {}
-        # Set de usuários com conexão ativa
-        self._active_connections: Set[int] = set()
+    def __init__(
+        self,
+        barramento: Optional[BarramentoChat] = None,
+        tamanho_fila: int = CHAT_SSE_FILA_MAX,
+        politica_fila: str = CHAT_SSE_POLITICA_FILA_CHEIA,
+        atraso_offline: float = CHAT_PRESENCA_ATRASO_OFFLINE_SEGUNDOS,
+        intervalo_digitando: float = CHAT_DIGITANDO_INTERVALO_SEGUNDOS,
+        listar_contatos: Callable[[int], List[int]] = chat_participante_repo.listar_contatos,
+        presenca: Optional[bool] = None
+    ):
+        if politica_fila not in POLITICAS:
+            raise ValueError(f"CHAT_SSE_POLITICA_FILA_CHEIA inválida: {politica_fila!r}")
+
+        # Filas das conexões de cada usuário: usuario_id -> {FilaEventos, ...}
+        self._connections: Dict[int, Set[FilaEventos]] = {}
+        # Limite de eventos pendentes por conexão e o que fazer quando enche
+        self._tamanho_fila = tamanho_fila
+        self._politica_fila = politica_fila
+        # Contadores de entrega (ver util/chat_fila.py)
+        self._metricas = {ENFILEIRADO: 0, COALESCIDO: 0, DESCARTADO: 0}
+        # Pub/sub entre workers (iniciado sob demanda, dentro do event loop)
+        self._barramento = barramento or criar_barramento()
+        self._barramento_iniciado = False
+        # Presença e digitação (presença, por padrão, apenas com o barramento local)
+        self.presenca_ativa = isinstance(self._barramento, BarramentoLocal) if presenca is None else presenca
+        if not self.presenca_ativa:
+            logger.info("[ChatManager] Presença desativada: exige CHAT_PUBSUB_BACKEND=local com um único worker")
+        self._atraso_offline = atraso_offline
+        self._intervalo_digitando = intervalo_digitando
+        self._listar_contatos = listar_contatos
+        self._offline_pendente: Dict[int, asyncio.Task] = {}
+        self._ultimo_digitando: Dict[Tuple[int, str], float] = {}
+        self._tarefas: Set[asyncio.Task] = set()
+
+    async def _iniciar_barramento(self):
+        """Conecta o barramento à entrega local na primeira utilização."""
+        if not self._barramento_iniciado:
+            self._barramento_iniciado = True
+            await self._barramento.iniciar(self._entregar_local)
+
+    async def _entregar_local(self, usuario_id: int, evento: dict):
+        """
+        Coloca um evento nas filas SSE do usuário, se ele estiver conectado neste worker.
+
+        A entrega nunca bloqueia: uma conexão com a fila cheia (cliente lento
+        ou travado) perde um evento, conforme a política configurada, sem
+        atrasar as demais.
 
-    async def connect(self, usuario_id: int) -> asyncio.Queue:
+        Args:
+            usuario_id: ID do usuário destinatário
+            evento: Dicionário com dados do evento
+        """
+        filas = self._connections.get(usuario_id)
+        if not filas:
+            logger.debug(f"[ChatManager] Usuário {usuario_id} não está conectado (não receberá via SSE)")
+            return
+
+        for fila in list(filas):
+            resultado = fila.colocar(evento)
+            self._metricas[resultado] += 1
+            if resultado == DESCARTADO:
+                logger.warning(f"[ChatManager] Fila SSE cheia para usuário {usuario_id}; evento descartado")
+        logger.debug(f"[ChatManager] Mensagem enviada para usuário {usuario_id} via SSE ({len(filas)} conexões)")
+
+    async def connect(self, usuario_id: int) -> FilaEventos:
         """
         Registra nova conexão SSE para um usuário.
 
+        Conexões anteriores do mesmo usuário (outras abas) continuam ativas.
+
         Args:
             usuario_id: ID do usuário conectando
 
         Returns:
-            Queue para envio de mensagens SSE
+            Fila exclusiva desta conexão (usar também em disconnect)
         """
-        queue = asyncio.Queue()
-        self._connections[usuario_id] = queue
-        self._active_connections.add(usuario_id)
+        await self._iniciar_barramento()
+        queue = FilaEventos(self._tamanho_fila, self._politica_fila, CHAT_SSE_EVENTOS_AGRUPAVEIS)
+        primeira_conexao = usuario_id not in self._connections
+        self._connections.setdefault(usuario_id, set()).add(queue)
+
+        if primeira_conexao and self.presenca_ativa:
+            pendente = self._offline_pendente.pop(usuario_id, None)
+            if pendente is not None and pendente.get_loop() is asyncio.get_running_loop():
+                # Reconectou antes do aviso de offline: para os contatos, nunca saiu
+                pendente.cancel()
+            else:
+                self._agendar(self._publicar_presenca(usuario_id, True))
 
-        logger.info(f"[ChatManager] Usuário {usuario_id} conectado. Total conexões: {len(self._active_connections)}")
+        logger.info(
+            f"[ChatManager] Usuário {usuario_id} conectado "
+            f"({len(self._connections[usuario_id])} conexões). Total conexões: {self._total_conexoes()}"
+        )
 
         return queue
 
-    async def disconnect(self, usuario_id: int):
+    async def disconnect(self, usuario_id: int, queue: Optional[FilaEventos] = None):
         """
-        Remove conexão SSE de um usuário.
+        Remove uma conexão SSE de um usuário.
 
         Args:
             usuario_id: ID do usuário desconectando
+            queue: Fila retornada por connect; se omitida, remove todas as conexões do usuário
         """
-        if usuario_id in self._connections:
-            del self._connections[usuario_id]
-
-        if usuario_id in self._active_connections:
-            self._active_connections.remove(usuario_id)
+        filas = self._connections.get(usuario_id)
+        if filas is not None:
+            if queue is None:
+                filas.clear()
+            else:
+                filas.discard(queue)
+            if not filas:
+                del self._connections[usuario_id]
+                if self.presenca_ativa and usuario_id not in self._offline_pendente:
+                    self._offline_pendente[usuario_id] = self._agendar(self._anunciar_offline(usuario_id))
 
-        logger.info(f"[ChatManager] Usuário {usuario_id} desconectado. Total conexões: {len(self._active_connections)}")
+        logger.info(f"[ChatManager] Usuário {usuario_id} desconectado. Total conexões: {self._total_conexoes()}")
 
     async def broadcast_para_sala(self, sala_id: str, mensagem_dict: dict):
         """
@@ -63,26 +172,146 @@ class ChatManager:
             sala_id: ID da sala (formato: "menor_id_maior_id")
             mensagem_dict: Dicionário com dados da mensagem a enviar
         """
-        # Extrair IDs dos usuários do sala_id
+        participantes = self._participantes_da_sala(sala_id)
+        if participantes is None:
+            return
+
+        # Publicar para os participantes em todos os workers
+        await self._iniciar_barramento()
+        await self._barramento.publicar(participantes, mensagem_dict)
+
+    def _participantes_da_sala(self, sala_id: str) -> Optional[Tuple[int, int]]:
+        """
+        Extrai os IDs dos dois participantes do sala_id.
+
+        Args:
+            sala_id: ID da sala (formato: "menor_id_maior_id")
+
+        Returns:
+            Tupla (usuario1_id, usuario2_id) ou None se o sala_id for inválido
+        """
         partes = sala_id.split("_")
         if len(partes) != 2:
             logger.error(f"[ChatManager] sala_id inválido: {sala_id}")
-            return
+            return None
 
         try:
-            usuario1_id = int(partes[0])
-            usuario2_id = int(partes[1])
+            return int(partes[0]), int(partes[1])
         except ValueError:
             logger.error(f"[ChatManager] Erro ao parsear IDs do sala_id: {sala_id}")
+            return None
+
+    def _agendar(self, corrotina) -> asyncio.Task:
+        """Executa uma corrotina em segundo plano, mantendo referência até terminar."""
+        tarefa = asyncio.ensure_future(corrotina)
+        self._tarefas.add(tarefa)
+        tarefa.add_done_callback(self._tarefas.discard)
+        return tarefa
+
+    async def _anunciar_offline(self, usuario_id: int):
+        """Aguarda o atraso de offline e avisa os contatos se o usuário não voltou."""
+        await asyncio.sleep(self._atraso_offline)
+        self._offline_pendente.pop(usuario_id, None)
+        if usuario_id not in self._connections:
+            await self._publicar_presenca(usuario_id, False)
+
+    async def _publicar_presenca(self, usuario_id: int, online: bool):
+        """
+        Envia o evento de presença aos contatos do usuário.
+
+        Args:
+            usuario_id: Usuário que entrou ou saiu
+            online: Novo estado
+        """
+        try:
+            contatos = await executar_db(self._listar_contatos, usuario_id)
+            if contatos:
+                await self._barramento.publicar(contatos, {
+                    "tipo": "presenca",
+                    "usuario_id": usuario_id,
+                    "online": online
+                })
+        except Exception as e:
+            logger.error(f"[ChatManager] Erro ao publicar presença do usuário {usuario_id}: {e}")
+
+    def obter_presenca(self, usuario_ids: Iterable[int]) -> Dict[int, bool]:
+        """
+        Informa quais usuários estão online (consulta em lote, sem acesso ao banco).
+
+        Usuários cujo aviso de offline ainda está pendente contam como online,
+        coerente com os eventos já enviados.
+
+        Args:
+            usuario_ids: IDs a consultar
+
+        Returns:
+            Dicionário {usuario_id: online} (vazio se a presença está desativada)
+        """
+        if not self.presenca_ativa:
+            return {}
+        return {
+            usuario_id: usuario_id in self._connections or usuario_id in self._offline_pendente
+            for usuario_id in usuario_ids
+        }
+
+    def digitando_recente(self, usuario_id: int, sala_id: str) -> bool:
+        """
+        Verifica, sem registrar nada, se há evento "digitando" recente do usuário na sala.
+
+        Args:
+            usuario_id: Usuário que está digitando
+            sala_id: Sala em que está digitando
+
+        Returns:
+            True se um evento foi registrado há menos de `intervalo_digitando` segundos
+        """
+        ultimo = self._ultimo_digitando.get((usuario_id, sala_id))
+        return ultimo is not None and time.monotonic() - ultimo < self._intervalo_digitando
+
+    def registrar_digitando(self, usuario_id: int, sala_id: str) -> bool:
+        """
+        Aplica o limite de eventos "digitando" por usuário e sala.
+
+        Args:
+            usuario_id: Usuário que está digitando
+            sala_id: Sala em que está digitando
+
+        Returns:
+            True se o evento deve ser publicado; False se outro foi publicado
+            há menos de `intervalo_digitando` segundos
+        """
+        agora = time.monotonic()
+        chave = (usuario_id, sala_id)
+        ultimo = self._ultimo_digitando.get(chave)
+        if ultimo is not None and agora - ultimo < self._intervalo_digitando:
+            return False
+
+        if len(self._ultimo_digitando) >= _MAX_REGISTROS_DIGITANDO:
+            self._ultimo_digitando = {
+                c: t for c, t in self._ultimo_digitando.items() if agora - t < self._intervalo_digitando
+            }
+        self._ultimo_digitando[chave] = agora
+        return True
+
+    async def publicar_digitando(self, usuario_id: int, sala_id: str):
+        """
+        Avisa o outro participante da sala que o usuário está digitando.
+
+        Args:
+            usuario_id: Usuário que está digitando
+            sala_id: ID da sala
+        """
+        participantes = self._participantes_da_sala(sala_id)
+        if participantes is None:
             return
 
-        # Enviar para cada participante se estiver conectado
-        for usuario_id in [usuario1_id, usuario2_id]:
-            if usuario_id in self._connections:
-                await self._connections[usuario_id].put(mensagem_dict)
-                logger.debug(f"[ChatManager] Mensagem enviada para usuário {usuario_id} via SSE")
-            else:
-                logger.debug(f"[ChatManager] Usuário {usuario_id} não está conectado (não receberá via SSE)")
+        destinatarios = [p for p in participantes if p != usuario_id]
+        await self._iniciar_barramento()
+        await self._barramento.publicar(destinatarios, {
+            "tipo": "digitando",
+            "sala_id": sala_id,
+            "usuario_id": usuario_id
+        })
 
     def is_connected(self, usuario_id: int) -> bool:
         """
@@ -94,7 +323,11 @@ class ChatManager:
         Returns:
             True se conectado, False caso contrário
         """
-        return usuario_id in self._active_connections
+        return usuario_id in self._connections
+
+    def _total_conexoes(self) -> int:
+        """Soma as conexões SSE de todos os usuários."""
+        return sum(len(filas) for filas in self._connections.values())
 
     def obter_estatisticas(self) -> dict:
         """
@@ -104,11 +337,29 @@ class ChatManager:
             Dicionário com estatísticas
         """
         return {
-            "total_conexoes": len(self._connections),
-            "usuarios_ativos": list(self._active_connections),
-            "total_usuarios_ativos": len(self._active_connections)
+            "total_conexoes": self._total_conexoes(),
+            "usuarios_ativos": list(self._connections),
+            "total_usuarios_ativos": len(self._connections),
+            "conexoes_por_usuario": {
+                usuario_id: len(filas) for usuario_id, filas in self._connections.items()
+            },
+            "eventos": dict(self._metricas),
+            "offline_pendentes": len(self._offline_pendente),
+            "barramento": self._barramento.obter_estatisticas()
         }
 
+    async def encerrar(self):
+        """Encerra o barramento e as tarefas de presença (chamado no shutdown da aplicação)."""
+        loop = asyncio.get_running_loop()
+        for tarefa in list(self._tarefas):
+            # Tarefas de um event loop já encerrado não podem mais ser canceladas
+            if tarefa.get_loop() is loop:
+                tarefa.cancel()
+        self._tarefas.clear()
+        self._offline_pendente.clear()
+        await self._barramento.encerrar()
+        self._barramento_iniciado = False
+
 
 # Instância singleton global
 chat_manager = ChatManager()
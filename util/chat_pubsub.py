@@ -0,0 +1,198 @@
+"""
+Barramento de eventos do chat (pub/sub) entre workers.
+
+O ChatManager guarda as conexões SSE na memória do processo. Com vários
+workers do uvicorn, uma mensagem enviada no worker A precisa chegar ao
+stream mantido pelo worker B. O ChatManager publica no barramento e
+cada worker entrega às suas próprias conexões.
+
+Implementações:
+    - BarramentoLocal: entrega direta no mesmo processo (padrão, um worker)
+    - BarramentoSQLite: eventos gravados na tabela chat_evento do banco
+      compartilhado e lidos periodicamente por todos os workers
+
+Outro broker (ex: Redis pub/sub) pode ser usado implementando
+BarramentoChat (publicar/iniciar/encerrar) e registrando em criar_barramento.
+"""
+
+import asyncio
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable, Iterable, Optional
+
+from repo import chat_evento_repo
+from util.config import CHAT_PUBSUB_BACKEND, CHAT_PUBSUB_INTERVALO_MS, CHAT_PUBSUB_RETENCAO_SEGUNDOS
+from util.db_async import executar_db
+from util.logger_config import logger
+
+# Entrega um evento às conexões locais de um usuário
+EntregarEvento = Callable[[int, dict], Awaitable[None]]
+
+
+class BarramentoChat(ABC):
+    """
+    Interface do barramento de eventos do chat.
+
+    `publicar` envia um evento aos usuários indicados em todos os workers;
+    cada worker repassa à função `entregar` recebida em `iniciar`, que
+    coloca o evento nas filas SSE locais (usuários sem conexão no worker
+    são ignorados por ela).
+    """
+
+    def __init__(self):
+        self._entregar: Optional[EntregarEvento] = None
+        self.publicados = 0
+        self.recebidos = 0
+
+    async def iniciar(self, entregar: EntregarEvento) -> None:
+        """
+        Passa a entregar eventos recebidos às conexões locais.
+
+        Args:
+            entregar: Corrotina (usuario_id, evento) do ChatManager
+        """
+        self._entregar = entregar
+
+    @abstractmethod
+    async def publicar(self, usuario_ids: Iterable[int], evento: dict) -> None:
+        """
+        Publica um evento para usuários conectados em qualquer worker.
+
+        Args:
+            usuario_ids: IDs dos destinatários
+            evento: Dicionário serializável em JSON
+        """
+
+    async def encerrar(self) -> None:
+        """Libera recursos (tarefas de escuta, conexões com o broker)."""
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna métricas do barramento.
+
+        Returns:
+            Dicionário com tipo e contadores de eventos
+        """
+        return {
+            "tipo": type(self).__name__,
+            "publicados": self.publicados,
+            "recebidos": self.recebidos,
+        }
+
+
+class BarramentoLocal(BarramentoChat):
+    """Entrega direta no próprio processo (adequado a um único worker)."""
+
+    async def publicar(self, usuario_ids: Iterable[int], evento: dict) -> None:
+        self.publicados += 1
+        if self._entregar is None:
+            return
+        for usuario_id in usuario_ids:
+            await self._entregar(usuario_id, evento)
+
+
+class BarramentoSQLite(BarramentoChat):
+    """
+    Barramento entre processos usando a tabela chat_evento do banco compartilhado.
+
+    O worker que publica entrega imediatamente às suas conexões e grava o
+    evento; os demais o leem na próxima consulta (a cada `intervalo_segundos`),
+    ignorando os que eles mesmos publicaram. Eventos mais antigos que
+    `retencao_segundos` são removidos periodicamente.
+    """
+
+    def __init__(
+        self,
+        intervalo_segundos: float = CHAT_PUBSUB_INTERVALO_MS / 1000,
+        retencao_segundos: float = CHAT_PUBSUB_RETENCAO_SEGUNDOS,
+        lote: int = 500
+    ):
+        super().__init__()
+        self.intervalo_segundos = intervalo_segundos
+        self.retencao_segundos = retencao_segundos
+        self.lote = lote
+        # Identifica este worker nos eventos gravados
+        self.origem = uuid.uuid4().hex
+        self._ultimo_id = 0
+        self._tarefa: Optional[asyncio.Task] = None
+
+    async def iniciar(self, entregar: EntregarEvento) -> None:
+        await super().iniciar(entregar)
+        if self._tarefa is not None:
+            return
+
+        await executar_db(chat_evento_repo.criar_tabela)
+        # Eventos anteriores à conexão deste worker não interessam
+        self._ultimo_id = await executar_db(chat_evento_repo.obter_ultimo_id)
+        self._tarefa = asyncio.create_task(self._escutar())
+        logger.info(f"[BarramentoSQLite] Escutando eventos a partir do ID {self._ultimo_id} (origem {self.origem[:8]})")
+
+    async def publicar(self, usuario_ids: Iterable[int], evento: dict) -> None:
+        usuario_ids = list(usuario_ids)
+        self.publicados += 1
+        if self._entregar is not None:
+            for usuario_id in usuario_ids:
+                await self._entregar(usuario_id, evento)
+        await executar_db(chat_evento_repo.inserir, usuario_ids, evento, self.origem)
+
+    async def _escutar(self) -> None:
+        """Lê eventos de outros workers e remove os expirados."""
+        proxima_limpeza = 0.0
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                eventos = await executar_db(chat_evento_repo.listar_apos, self._ultimo_id, self.origem, self.lote)
+                for evento in eventos:
+                    self._ultimo_id = evento.id
+                    self.recebidos += 1
+                    if self._entregar is not None:
+                        await self._entregar(evento.usuario_id, evento.payload)
+
+                agora = loop.time()
+                if agora >= proxima_limpeza:
+                    await executar_db(chat_evento_repo.excluir_anteriores, time.time() - self.retencao_segundos)
+                    proxima_limpeza = agora + self.retencao_segundos
+
+                if len(eventos) < self.lote:
+                    await asyncio.sleep(self.intervalo_segundos)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[BarramentoSQLite] Erro ao ler eventos: {e}")
+                await asyncio.sleep(max(self.intervalo_segundos, 1.0))
+
+    async def encerrar(self) -> None:
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+
+    def obter_estatisticas(self) -> dict:
+        estatisticas = super().obter_estatisticas()
+        estatisticas["ultimo_id"] = self._ultimo_id
+        estatisticas["escutando"] = self._tarefa is not None and not self._tarefa.done()
+        return estatisticas
+
+
+def criar_barramento(tipo: str = CHAT_PUBSUB_BACKEND) -> BarramentoChat:
+    """
+    Cria o barramento configurado em CHAT_PUBSUB_BACKEND.
+
+    Args:
+        tipo: "local" ou "sqlite"
+
+    Returns:
+        Instância de BarramentoChat
+
+    Raises:
+        ValueError: Se o tipo não for suportado
+    """
+    if tipo == "local":
+        return BarramentoLocal()
+    if tipo == "sqlite":
+        return BarramentoSQLite()
+    raise ValueError(f"CHAT_PUBSUB_BACKEND inválido: {tipo!r} (use 'local' ou 'sqlite')")
@@ -0,0 +1,161 @@
+"""
+Retenção de mensagens do chat.
+
+chat_mensagem cresceria para sempre. Periodicamente, as mensagens fora da
+janela "quente" de cada sala (as CHAT_ARQUIVO_MANTER_POR_SALA mais
+recentes) e mais antigas que CHAT_ARQUIVO_IDADE_DIAS são movidas, em lotes,
+para chat_mensagem_arquivo. chat_mensagem_repo.listar_por_sala lê o arquivo
+quando o usuário rola além da janela, então o histórico continua completo.
+
+Depois de arquivar, o espaço liberado é devolvido ao sistema de arquivos
+com incremental_vacuum (ver db_util.liberar_espaco). O job nunca executa
+um VACUUM completo: em bancos sem auto_vacuum=INCREMENTAL, a conversão é
+feita pelo administrador (db_util.converter_para_vacuum_incremental).
+"""
+
+import asyncio
+from datetime import timedelta
+from typing import Optional
+
+from repo import chat_mensagem_repo, chat_sala_repo
+from util.config import (
+    CHAT_ARQUIVO_MANTER_POR_SALA,
+    CHAT_ARQUIVO_IDADE_DIAS,
+    CHAT_ARQUIVO_LOTE,
+    CHAT_ARQUIVO_INTERVALO_MINUTOS,
+    DB_VACUUM_PAGINAS_POR_RODADA,
+    DB_VACUUM_LIMIAR_LIVRES
+)
+from util.datetime_util import agora
+from util.db_async import executar_db
+from util.db_util import liberar_espaco
+from util.logger_config import logger
+
+# Salas lidas por consulta ao percorrer chat_sala
+_SALAS_POR_PAGINA = 200
+
+
+def arquivar_mensagens(
+    manter: int = CHAT_ARQUIVO_MANTER_POR_SALA,
+    idade_dias: int = CHAT_ARQUIVO_IDADE_DIAS,
+    lote: int = CHAT_ARQUIVO_LOTE
+) -> int:
+    """
+    Arquiva as mensagens antigas de todas as salas.
+
+    Cada lote é uma transação curta, então o chat continua gravando
+    normalmente durante a execução.
+
+    Args:
+        manter: Mensagens mais recentes de cada sala que não são arquivadas
+        idade_dias: Idade mínima (dias) para arquivar
+        lote: Mensagens movidas por transação
+
+    Returns:
+        Total de mensagens arquivadas
+    """
+    anteriores_a = agora() - timedelta(days=idade_dias)
+    total = 0
+    ultimo_id = ""
+    while True:
+        salas = chat_sala_repo.listar_ids_apos(ultimo_id, _SALAS_POR_PAGINA)
+        for sala_id in salas:
+            while True:
+                movidas = chat_mensagem_repo.arquivar_lote(sala_id, manter, anteriores_a, lote)
+                total += movidas
+                if movidas < lote:
+                    break
+        if len(salas) < _SALAS_POR_PAGINA:
+            break
+        ultimo_id = salas[-1]
+
+    if total:
+        logger.info(f"[Retenção] {total} mensagens de chat arquivadas")
+    return total
+
+
+def executar_manutencao() -> dict:
+    """
+    Arquiva mensagens antigas e devolve o espaço liberado.
+
+    Returns:
+        Dicionário com mensagens arquivadas e resultado de db_util.liberar_espaco
+    """
+    arquivadas = arquivar_mensagens()
+    espaco = liberar_espaco(DB_VACUUM_PAGINAS_POR_RODADA, DB_VACUUM_LIMIAR_LIVRES)
+    if espaco["acao"] == "conversao_pendente":
+        logger.warning(
+            f"[Retenção] {espaco['paginas_livres_antes']} páginas livres sem auto_vacuum incremental: "
+            f"compacte o banco em Admin > Backups para devolver o espaço"
+        )
+    elif espaco["acao"] != "nenhuma":
+        logger.info(
+            f"[Retenção] Espaço liberado ({espaco['acao']}): páginas livres "
+            f"{espaco['paginas_livres_antes']} -> {espaco['paginas_livres_depois']}"
+        )
+    return {"arquivadas": arquivadas, "espaco": espaco}
+
+
+class AgendadorRetencao:
+    """
+    Executa executar_manutencao a cada `intervalo_minutos`, em segundo plano.
+
+    A primeira execução ocorre um intervalo após o início, para não
+    competir com a inicialização da aplicação.
+    """
+
+    def __init__(self, intervalo_minutos: float = CHAT_ARQUIVO_INTERVALO_MINUTOS):
+        self.intervalo_minutos = intervalo_minutos
+        self._tarefa: Optional[asyncio.Task] = None
+        self.execucoes = 0
+        self.arquivadas = 0
+        self.ultimo_resultado: Optional[dict] = None
+
+    async def iniciar(self) -> None:
+        """Agenda o job (sem efeito se desativado ou já iniciado)."""
+        if self.intervalo_minutos <= 0 or self._tarefa is not None:
+            return
+        self._tarefa = asyncio.create_task(self._executar_periodicamente())
+        logger.info(f"[Retenção] Job de arquivamento do chat agendado a cada {self.intervalo_minutos} minutos")
+
+    async def _executar_periodicamente(self) -> None:
+        while True:
+            await asyncio.sleep(self.intervalo_minutos * 60)
+            try:
+                resultado = await executar_db(executar_manutencao)
+                self.execucoes += 1
+                self.arquivadas += resultado["arquivadas"]
+                self.ultimo_resultado = resultado
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[Retenção] Erro no job de arquivamento do chat: {e}")
+
+    async def encerrar(self) -> None:
+        """Cancela o job (chamado no shutdown da aplicação)."""
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna métricas do job.
+
+        Returns:
+            Dicionário com execuções, total arquivado e último resultado
+        """
+        return {
+            "ativo": self._tarefa is not None and not self._tarefa.done(),
+            "intervalo_minutos": self.intervalo_minutos,
+            "execucoes": self.execucoes,
+            "arquivadas": self.arquivadas,
+            "ultimo_resultado": self.ultimo_resultado,
+        }
+
+
+# Instância global usada por main.py
+agendador_retencao = AgendadorRetencao()
@@ -32,6 +32,96 @@ if RUNNING_MODE_CHECK.lower() != "development":
 # === Configurações do Banco de Dados ===
 DATABASE_PATH = os.getenv("DATABASE_PATH", "database.db")
 
+# Pool de conexões (util/db_util.py)
+# Conexões ociosas mantidas abertas para reutilização
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+# Conexões extras temporárias permitidas quando o pool está esgotado
+DB_POOL_MAX_OVERFLOW = int(os.getenv("DB_POOL_MAX_OVERFLOW", "10"))
+# Tempo máximo (segundos) aguardando uma conexão livre
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Conexões ociosas há mais tempo que isso (segundos) são testadas antes do uso
+DB_POOL_PING_SEGUNDOS = float(os.getenv("DB_POOL_PING_SEGUNDOS", "30"))
+
+# Acesso assíncrono ao banco (util/db_async.py)
+# Threads dedicadas às consultas das rotas async (padrão: uma por conexão do pool)
+DB_ASYNC_THREADS = int(os.getenv("DB_ASYNC_THREADS", str(DB_POOL_SIZE)))
+# Chamadas aguardando thread livre antes de responder 503
+DB_ASYNC_MAX_FILA = int(os.getenv("DB_ASYNC_MAX_FILA", "200"))
+
+# Perfil de PRAGMAs aplicado a cada nova conexão
+# WAL permite leitores simultâneos a um escritor (sem bloquear o arquivo inteiro)
+DB_JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "WAL").upper()
+# NORMAL é seguro em WAL (perde no máximo a última transação em queda de energia)
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL").upper()
+# Tempo (ms) aguardando um lock antes de falhar com "database is locked"
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+# Negativo = tamanho em KiB (-20000 ≈ 20MB de cache de páginas por conexão)
+DB_CACHE_SIZE = int(os.getenv("DB_CACHE_SIZE", "-20000"))
+# Bytes do arquivo mapeados em memória (0 desativa)
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(128 * 1024 * 1024)))
+# Onde ficam tabelas/índices temporários (DEFAULT, FILE ou MEMORY)
+DB_TEMP_STORE = os.getenv("DB_TEMP_STORE", "MEMORY").upper()
+
+# === Configurações de Cache ===
+# Tempo (segundos) que as contagens por faceta da busca de vagas ficam em cache
+VAGA_FACETAS_CACHE_SEGUNDOS = float(os.getenv("VAGA_FACETAS_CACHE_SEGUNDOS", "30"))
+# Intervalo mínimo (segundos) entre consultas à versão das configurações no banco.
+# Alterações feitas em outro worker aparecem neste após no máximo esse intervalo.
+CONFIG_CACHE_VERIFICAR_SEGUNDOS = float(os.getenv("CONFIG_CACHE_VERIFICAR_SEGUNDOS", "1"))
+# Recarga completa das configurações mesmo sem mudança de versão (salvaguarda)
+CONFIG_CACHE_TTL_SEGUNDOS = float(os.getenv("CONFIG_CACHE_TTL_SEGUNDOS", "300"))
+# Páginas públicas renderizadas para visitantes anônimos (util/cache_paginas.py).
+# A chave inclui a versão das configurações; o TTL é só um limite de segurança.
+PAGINAS_CACHE_TTL_SEGUNDOS = float(os.getenv("PAGINAS_CACHE_TTL_SEGUNDOS", "300"))
+PAGINAS_CACHE_MAX_ITENS = int(os.getenv("PAGINAS_CACHE_MAX_ITENS", "64"))
+
+# === Configurações do Chat em Tempo Real ===
+# Barramento de eventos SSE: "local" (um único worker) ou "sqlite" (vários workers
+# compartilhando o mesmo banco; eventos passam pela tabela chat_evento).
+# A presença online/offline só funciona com "local": com "sqlite" ela fica desativada
+CHAT_PUBSUB_BACKEND = os.getenv("CHAT_PUBSUB_BACKEND", "local").lower()
+# Intervalo (ms) entre consultas de eventos de outros workers no barramento SQLite
+CHAT_PUBSUB_INTERVALO_MS = int(os.getenv("CHAT_PUBSUB_INTERVALO_MS", "100"))
+# Tempo (segundos) que eventos ficam na tabela chat_evento antes da limpeza
+CHAT_PUBSUB_RETENCAO_SEGUNDOS = int(os.getenv("CHAT_PUBSUB_RETENCAO_SEGUNDOS", "60"))
+# Máximo de eventos pendentes na fila de cada conexão SSE (cada aba tem a sua)
+CHAT_SSE_FILA_MAX = int(os.getenv("CHAT_SSE_FILA_MAX", "100"))
+# Ao encher a fila: "descartar_antigo" (perde o evento mais antigo) ou "descartar_novo"
+CHAT_SSE_POLITICA_FILA_CHEIA = os.getenv("CHAT_SSE_POLITICA_FILA_CHEIA", "descartar_antigo").lower()
+# Tipos de evento em que só o último pendente por sala importa (separados por vírgula)
+CHAT_SSE_EVENTOS_AGRUPAVEIS = [
+    tipo.strip() for tipo in os.getenv("CHAT_SSE_EVENTOS_AGRUPAVEIS", "atualizar_contador,digitando").split(",")
+    if tipo.strip()
+]
+# Máximo de eventos enviados em uma única escrita do stream SSE
+CHAT_SSE_LOTE_MAX = int(os.getenv("CHAT_SSE_LOTE_MAX", "50"))
+# Intervalo (segundos) sem eventos após o qual o stream envia um comentário de heartbeat
+CHAT_SSE_HEARTBEAT_SEGUNDOS = int(os.getenv("CHAT_SSE_HEARTBEAT_SEGUNDOS", "15"))
+# Espera (ms) sugerida ao navegador antes de reconectar o EventSource
+CHAT_SSE_RETRY_MS = int(os.getenv("CHAT_SSE_RETRY_MS", "3000"))
+# Máximo de mensagens reenviadas ao reconectar com Last-Event-ID
+CHAT_SSE_REPLAY_MAX = int(os.getenv("CHAT_SSE_REPLAY_MAX", "200"))
+# Espera (segundos) após a última conexão fechar antes de anunciar o usuário como offline
+# (recarregar a página ou reconectar o SSE dentro desse prazo não gera eventos)
+CHAT_PRESENCA_ATRASO_OFFLINE_SEGUNDOS = float(os.getenv("CHAT_PRESENCA_ATRASO_OFFLINE_SEGUNDOS", "5"))
+# Intervalo mínimo (segundos) entre eventos "digitando" do mesmo usuário na mesma sala
+CHAT_DIGITANDO_INTERVALO_SEGUNDOS = float(os.getenv("CHAT_DIGITANDO_INTERVALO_SEGUNDOS", "3"))
+
+# === Configurações de Retenção do Chat ===
+# Mensagens mais recentes de cada sala mantidas na tabela principal (janela "quente")
+CHAT_ARQUIVO_MANTER_POR_SALA = int(os.getenv("CHAT_ARQUIVO_MANTER_POR_SALA", "500"))
+# Idade mínima (dias) para uma mensagem fora da janela ser arquivada
+CHAT_ARQUIVO_IDADE_DIAS = int(os.getenv("CHAT_ARQUIVO_IDADE_DIAS", "90"))
+# Mensagens movidas por transação (transações curtas não travam as escritas do chat)
+CHAT_ARQUIVO_LOTE = int(os.getenv("CHAT_ARQUIVO_LOTE", "500"))
+# Intervalo (minutos) entre execuções do job de retenção (0 desativa)
+CHAT_ARQUIVO_INTERVALO_MINUTOS = int(os.getenv("CHAT_ARQUIVO_INTERVALO_MINUTOS", "60"))
+# Páginas devolvidas ao sistema de arquivos por execução com auto_vacuum incremental
+DB_VACUUM_PAGINAS_POR_RODADA = int(os.getenv("DB_VACUUM_PAGINAS_POR_RODADA", "2000"))
+# Fração de páginas livres a partir da qual o job de retenção pede a compactação do banco
+# (VACUUM completo que ativa o modo incremental; executado pelo administrador em Admin > Backups)
+DB_VACUUM_LIMIAR_LIVRES = float(os.getenv("DB_VACUUM_LIMIAR_LIVRES", "0.2"))
+
 # === Configurações de Logging ===
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", "30"))
@@ -50,6 +140,21 @@ RELOAD = os.getenv("RELOAD", "True").lower() == "true"
 RUNNING_MODE = os.getenv("RUNNING_MODE", "Production")
 IS_DEVELOPMENT = RUNNING_MODE.lower() == "development"
 
+# === Configurações de Templates (util/template_util.py) ===
+# Recarregar templates alterados em disco (verifica o arquivo a cada uso).
+# Padrão: ligado em desenvolvimento, desligado em produção.
+TEMPLATES_AUTO_RELOAD = os.getenv("TEMPLATES_AUTO_RELOAD", str(IS_DEVELOPMENT)).lower() == "true"
+# Cache em disco do bytecode compilado dos templates (compartilhado entre workers e reinícios)
+TEMPLATES_BYTECODE_CACHE = os.getenv("TEMPLATES_BYTECODE_CACHE", "True").lower() == "true"
+# Pasta do cache de bytecode (vazio = pasta temporária do sistema)
+TEMPLATES_BYTECODE_CACHE_DIR = os.getenv("TEMPLATES_BYTECODE_CACHE_DIR", "")
+# Compilar todos os templates na inicialização, antes da primeira requisição
+TEMPLATES_PRECOMPILAR = os.getenv("TEMPLATES_PRECOMPILAR", "True").lower() == "true"
+# Cache de fragmentos renderizados ({% cache %}, util/cache_fragmentos.py)
+TEMPLATES_CACHE_FRAGMENTOS_MAX_ITENS = int(os.getenv("TEMPLATES_CACHE_FRAGMENTOS_MAX_ITENS", "2000"))
+# Tempo de vida padrão (segundos) de um fragmento, quando a tag não informa
+TEMPLATES_CACHE_FRAGMENTOS_TTL_SEGUNDOS = float(os.getenv("TEMPLATES_CACHE_FRAGMENTOS_TTL_SEGUNDOS", "300"))
+
 # === Configurações de Fotos de Perfil ===
 FOTO_PERFIL_TAMANHO_MAX = int(os.getenv("FOTO_PERFIL_TAMANHO_MAX", "256"))
 # Tamanho máximo em bytes (5MB)
@@ -63,6 +168,10 @@ PASSWORD_MAX_LENGTH = int(os.getenv("PASSWORD_MAX_LENGTH", "128"))
 TOAST_AUTO_HIDE_DELAY_MS = int(os.getenv("TOAST_AUTO_HIDE_DELAY_MS", "5000"))
 
 # === Configurações de Rate Limiting ===
+# Onde fica o estado dos limites: "memoria" (por processo) ou "sqlite" (tabela
+# rate_limit do banco, compartilhada entre workers e preservada em reinícios)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memoria").lower()
+
 # Autenticação
 RATE_LIMIT_LOGIN_MAX = int(os.getenv("RATE_LIMIT_LOGIN_MAX", "5"))
 RATE_LIMIT_LOGIN_MINUTOS = int(os.getenv("RATE_LIMIT_LOGIN_MINUTOS", "5"))
@@ -131,6 +240,11 @@ RATE_LIMIT_PUBLIC_MINUTOS = int(os.getenv("RATE_LIMIT_PUBLIC_MINUTOS", "1"))
 RATE_LIMIT_EXAMPLES_MAX = int(os.getenv("RATE_LIMIT_EXAMPLES_MAX", "100"))
 RATE_LIMIT_EXAMPLES_MINUTOS = int(os.getenv("RATE_LIMIT_EXAMPLES_MINUTOS", "1"))
 
+# Máximo de identificadores (IPs) mantidos por limiter no armazenamento em memória.
+# Identificadores ociosos são descartados antes; acima do limite, sai o
+# menos recente.
+RATE_LIMIT_MAX_CHAVES = int(os.getenv("RATE_LIMIT_MAX_CHAVES", "100000"))
+
 # === Versão da Aplicação ===
 VERSION = "1.0.0"
 
@@ -168,15 +282,8 @@ def obter_config_int(chave: str, padrao_env: int) -> int:
         Valor do banco de dados ou do .env
     """
     from util.config_cache import config
-    # obter_int já retorna o padrão se não encontrar ou der erro
-    # Mas precisamos verificar se existe no banco antes
-    valor_db_str = config.obter(chave, "")
-    if valor_db_str:
-        try:
-            return int(valor_db_str)
-        except ValueError:
-            return padrao_env
-    return padrao_env
+    # Valor já convertido no snapshot; ausente, vazio ou inválido usa o .env
+    return config.obter_int(chave, padrao_env)
 
 
 def obter_config_bool(chave: str, padrao_env: bool) -> bool:
@@ -191,7 +298,6 @@ def obter_config_bool(chave: str, padrao_env: bool) -> bool:
         Valor do banco de dados ou do .env
     """
     from util.config_cache import config
-    valor_db_str = config.obter(chave, "")
-    if valor_db_str:
-        return valor_db_str.lower() in ("true", "1", "yes", "sim", "verdadeiro")
+    if config.obter(chave, ""):
+        return config.obter_bool(chave, padrao_env)
     return padrao_env
@@ -1,11 +1,192 @@
-from typing import Dict, Any, List
+import threading
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional
 import sqlite3
 from repo import configuracao_repo
+from util.config import CONFIG_CACHE_VERIFICAR_SEGUNDOS, CONFIG_CACHE_TTL_SEGUNDOS
 from util.logger_config import logger
 
+# Valores aceitos como verdadeiro em configurações booleanas
+VALORES_VERDADEIROS = frozenset({"true", "1", "yes", "sim", "verdadeiro"})
+
+
+def _converter(valores: Mapping[str, str], conversor) -> MappingProxyType:
+    """Converte os valores que o conversor aceita; os demais ficam de fora (usa-se o padrão)."""
+    convertidos = {}
+    for chave, valor in valores.items():
+        try:
+            convertidos[chave] = conversor(valor)
+        except ValueError:
+            pass
+    return MappingProxyType(convertidos)
+
+
+@dataclass(frozen=True)
+class SnapshotConfiguracoes:
+    """
+    Fotografia imutável das configurações, já convertidas para cada tipo.
+
+    Montada uma vez por carga; leituras não consultam o banco nem convertem
+    strings. Uma nova carga cria outro snapshot, trocado de uma só vez.
+    """
+    versao: int
+    textos: Mapping[str, str]
+    inteiros: Mapping[str, int]
+    decimais: Mapping[str, float]
+    booleanos: Mapping[str, bool]
+
+    @classmethod
+    def criar(cls, valores: Mapping[str, str], versao: int) -> "SnapshotConfiguracoes":
+        """
+        Cria o snapshot a partir dos valores em texto.
+
+        Args:
+            valores: Dicionário {chave: valor} (padrões + banco)
+            versao: Versão local das configurações
+
+        Returns:
+            Snapshot com os valores convertidos
+        """
+        textos = MappingProxyType(dict(valores))
+        return cls(
+            versao=versao,
+            textos=textos,
+            inteiros=_converter(textos, int),
+            decimais=_converter(textos, float),
+            booleanos=MappingProxyType({
+                chave: valor.lower() in VALORES_VERDADEIROS for chave, valor in textos.items()
+            }),
+        )
+
+
+def _valores_padrao() -> Dict[str, str]:
+    """Valores de configuracao_repo.CONFIGS_PADRAO, sobrescritos pelo que estiver no banco."""
+    return {chave: valor for chave, valor, _ in configuracao_repo.CONFIGS_PADRAO}
+
+
 class ConfigCache:
-    """Cache de configurações do sistema para melhor performance"""
-    _cache: Dict[str, Any] = {}
+    """
+    Cache de configurações do sistema para melhor performance
+
+    Todas as configurações são carregadas de uma vez (uma única consulta),
+    sobre os padrões de configuracao_repo.CONFIGS_PADRAO, e mantidas em um
+    SnapshotConfiguracoes imutável com os valores já convertidos para
+    int/float/bool. Cada carga monta um novo snapshot e o troca com uma única
+    atribuição, então leitores nunca veem um estado parcial. main.py faz a
+    primeira carga na inicialização (carregar).
+
+    A tabela configuracao_versao guarda um contador incrementado por gatilhos
+    a cada escrita em configuracao; cada worker consulta esse contador no
+    máximo a cada CONFIG_CACHE_VERIFICAR_SEGUNDOS e recarrega tudo quando ele
+    muda, de modo que alterações feitas em qualquer worker chegam a todos.
+    Como salvaguarda, a carga é refeita a cada CONFIG_CACHE_TTL_SEGUNDOS
+    mesmo sem mudança de versão.
+
+    `versao` é incrementada sempre que os valores em cache mudam (ou o cache
+    é invalidado com limpar/limpar_chave). Quem guarda valores derivados das
+    configurações (ex: DynamicRateLimiter) compara obter_versao() em vez de
+    reler as chaves a cada uso.
+
+    O cache é lido do event loop e de threads do executor do banco ao mesmo
+    tempo (ex: DynamicRateLimiter no RateLimitMiddleware). A verificação e a
+    recarga rodam sob `_lock`: só a thread que o obtém consulta o banco; as
+    demais seguem com o snapshot atual (ou aguardam, se ainda não há nenhum).
+    """
+    # None = carregar na próxima leitura
+    _snapshot: Optional[SnapshotConfiguracoes] = None
+    versao: int = 0
+    _versao_banco: Optional[int] = None
+    _proxima_verificacao: float = 0.0
+    _expira_em: float = 0.0
+    _relogio = staticmethod(time.monotonic)
+    _lock = threading.Lock()
+
+    @classmethod
+    def _sincronizar(cls) -> SnapshotConfiguracoes:
+        """
+        Garante que o snapshot está carregado e atualizado com o banco.
+
+        Consulta a versão no banco no máximo a cada CONFIG_CACHE_VERIFICAR_SEGUNDOS
+        e recarrega todas as configurações se ela mudou ou se o TTL expirou.
+
+        Returns:
+            Snapshot atual (só com os padrões se o banco estiver indisponível)
+        """
+        agora = cls._relogio()
+        snapshot = cls._snapshot
+        if snapshot is not None and agora < cls._proxima_verificacao:
+            return snapshot
+
+        # Outra thread já está verificando: segue com o snapshot atual
+        if not cls._lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            snapshot = cls._snapshot
+            if snapshot is not None and agora < cls._proxima_verificacao:
+                return snapshot
+            return cls._recarregar(agora, snapshot)
+        finally:
+            cls._lock.release()
+
+    @classmethod
+    def _recarregar(cls, agora: float, snapshot: Optional[SnapshotConfiguracoes]) -> SnapshotConfiguracoes:
+        """Consulta a versão no banco e recarrega se preciso (chamado com `_lock`)."""
+        cls._proxima_verificacao = agora + CONFIG_CACHE_VERIFICAR_SEGUNDOS
+
+        try:
+            versao_banco = configuracao_repo.obter_versao()
+            if snapshot is not None and versao_banco == cls._versao_banco and agora < cls._expira_em:
+                return snapshot
+
+            valores = _valores_padrao()
+            valores.update(configuracao_repo.obter_valores())
+            cls._versao_banco = versao_banco
+            cls._expira_em = agora + CONFIG_CACHE_TTL_SEGUNDOS
+            if snapshot is None or valores != snapshot.textos:
+                cls.versao += 1
+                cls._snapshot = SnapshotConfiguracoes.criar(valores, cls.versao)
+
+        except sqlite3.Error as e:
+            logger.error(f"Erro ao carregar configurações do banco: {e}")
+            # Mantém o snapshot anterior; sem ele, usa os padrões até a próxima verificação
+            if cls._snapshot is None:
+                cls._snapshot = SnapshotConfiguracoes.criar(_valores_padrao(), cls.versao)
+
+        except Exception as e:
+            logger.critical(f"Erro crítico ao carregar configurações: {e}")
+            if cls._snapshot is None:
+                cls._snapshot = SnapshotConfiguracoes.criar(_valores_padrao(), cls.versao)
+
+        return cls._snapshot
+
+    @classmethod
+    def carregar(cls) -> SnapshotConfiguracoes:
+        """
+        Carrega todas as configurações (chamado na inicialização da aplicação).
+
+        Returns:
+            Snapshot carregado
+        """
+        cls.limpar()
+        snapshot = cls._sincronizar()
+        logger.info(f"{len(snapshot.textos)} configurações carregadas em cache")
+        return snapshot
+
+    @classmethod
+    def obter_snapshot(cls) -> SnapshotConfiguracoes:
+        """
+        Obtém o snapshot atual das configurações.
+
+        Para várias leituras seguidas, guardar o snapshot evita até a
+        verificação de versão: ex. `snap = config.obter_snapshot();
+        snap.inteiros.get("rate_limit_login_max", 5)`.
+
+        Returns:
+            SnapshotConfiguracoes imutável
+        """
+        return cls._sincronizar()
 
     @classmethod
     def obter(cls, chave: str, padrao: str = "") -> str:
@@ -22,96 +203,62 @@ class ConfigCache:
         Raises:
             Nenhuma exceção - retorna padrao em caso de erro
         """
-        # Retorna do cache se disponível
-        if chave in cls._cache:
-            return cls._cache[chave]
-
-        # Tenta buscar do banco com error handling
-        try:
-            config = configuracao_repo.obter_por_chave(chave)
-            if config:
-                cls._cache[chave] = config.valor
-                return config.valor
-            else:
-                cls._cache[chave] = padrao
-                return padrao
+        return cls._sincronizar().textos.get(chave, padrao)
 
-        except sqlite3.Error as e:
-            logger.error(f"Erro ao buscar configuração '{chave}' do banco: {e}")
-            # Retorna padrão em vez de crashar a aplicação
-            return padrao
+    @classmethod
+    def obter_versao(cls) -> int:
+        """
+        Obtém a versão local das configurações (verificando antes o banco).
 
-        except Exception as e:
-            logger.critical(f"Erro crítico ao acessar configuração '{chave}': {e}")
-            # Ainda retorna padrão, mas loga como crítico
-            return padrao
+        Returns:
+            Contador incrementado a cada mudança dos valores em cache
+        """
+        cls._sincronizar()
+        return cls.versao
 
     @classmethod
     def obter_int(cls, chave: str, padrao: int) -> int:
         """
-        Obtém configuração como inteiro com cache e tratamento de erros
+        Obtém configuração como inteiro (convertida na carga do snapshot)
 
         Args:
             chave: Chave da configuração
-            padrao: Valor padrão se não encontrado
+            padrao: Valor padrão se não encontrado ou não numérico
 
         Returns:
-            Valor da configuração convertido para int ou padrão
-
-        Raises:
-            Nenhuma exceção - retorna padrao em caso de erro
+            Valor da configuração como int ou padrão
         """
-        try:
-            valor_str = cls.obter(chave, str(padrao))
-            return int(valor_str)
-        except ValueError as e:
-            logger.error(f"Erro ao converter configuração '{chave}' para int: {e}")
-            return padrao
+        return cls._sincronizar().inteiros.get(chave, padrao)
 
     @classmethod
     def obter_bool(cls, chave: str, padrao: bool) -> bool:
         """
-        Obtém configuração como booleano com cache e tratamento de erros
+        Obtém configuração como booleano (convertida na carga do snapshot)
+
+        Aceita "true", "1", "yes", "sim", "verdadeiro" como verdadeiro.
 
         Args:
             chave: Chave da configuração
             padrao: Valor padrão se não encontrado
 
         Returns:
-            Valor da configuração convertido para bool ou padrão
-
-        Raises:
-            Nenhuma exceção - retorna padrao em caso de erro
+            Valor da configuração como bool ou padrão
         """
-        try:
-            valor_str = cls.obter(chave, str(padrao)).lower()
-            # Aceita "true", "1", "yes", "sim" como verdadeiro
-            return valor_str in ("true", "1", "yes", "sim", "verdadeiro")
-        except Exception as e:
-            logger.error(f"Erro ao converter configuração '{chave}' para bool: {e}")
-            return padrao
+        return cls._sincronizar().booleanos.get(chave, padrao)
 
     @classmethod
     def obter_float(cls, chave: str, padrao: float) -> float:
         """
-        Obtém configuração como float com cache e tratamento de erros
+        Obtém configuração como float (convertida na carga do snapshot)
 
         Args:
             chave: Chave da configuração
-            padrao: Valor padrão se não encontrado
+            padrao: Valor padrão se não encontrado ou não numérico
 
         Returns:
-            Valor da configuração convertido para float ou padrão
-
-        Raises:
-            Nenhuma exceção - retorna padrao em caso de erro
+            Valor da configuração como float ou padrão
         """
-        try:
-            valor_str = cls.obter(chave, str(padrao))
-            return float(valor_str)
-        except ValueError as e:
-            logger.error(f"Erro ao converter configuração '{chave}' para float: {e}")
-            return padrao
+        return cls._sincronizar().decimais.get(chave, padrao)
 
     @classmethod
     def obter_multiplos(cls, chaves: List[str], padroes: List[str]) -> Dict[str, str]:
@@ -140,14 +287,20 @@ class ConfigCache:
 
     @classmethod
     def limpar(cls):
-        """Limpa todo o cache de configurações"""
-        cls._cache = {}
+        """Limpa todo o cache de configurações (recarregado na próxima leitura)"""
+        with cls._lock:
+            cls._snapshot = None
+            cls.versao += 1
 
     @classmethod
     def limpar_chave(cls, chave: str):
-        """Limpa cache de uma chave específica"""
-        if chave in cls._cache:
-            del cls._cache[chave]
+        """
+        Limpa cache de uma chave específica
+
+        Como as configurações são carregadas em uma única consulta, equivale
+        a limpar o cache inteiro.
+        """
+        cls.limpar()
 
 # Instância global para uso em toda a aplicação
 config = ConfigCache()
@@ -0,0 +1,241 @@
+"""
+Camada assíncrona de acesso ao banco de dados.
+
+Os repositórios são síncronos (sqlite3). Chamá-los diretamente de uma rota
+`async def` bloqueia o event loop: uma consulta lenta trava todas as outras
+requisições e todos os streams SSE do worker. Este módulo executa as chamadas
+de repositório em um pool de threads dedicado, com concorrência limitada
+e métricas de fila.
+
+Uso com fachada de repositório (recomendado):
+    from repo import chat_mensagem_repo
+    from util.db_async import repo_async
+
+    chat_mensagem_db = repo_async(chat_mensagem_repo)
+
+    @router.get("/mensagens/{sala_id}")
+    async def listar(request: Request, sala_id: str):
+        mensagens = await chat_mensagem_db.listar_por_sala(sala_id)
+
+Uso direto:
+    from util.db_async import executar_db
+
+    usuario = await executar_db(usuario_repo.obter_por_id, usuario_id)
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from types import ModuleType
+from typing import Any, Callable, TypeVar
+
+from util.config import DB_ASYNC_THREADS, DB_ASYNC_MAX_FILA
+from util.exceptions import BancoSobrecarregadoError
+from util.logger_config import logger
+
+T = TypeVar("T")
+
+
+class ExecutorBanco:
+    """
+    Executa funções síncronas de banco em threads dedicadas.
+
+    O número de threads limita quantas consultas rodam ao mesmo tempo
+    (e, portanto, quantas conexões do pool ficam em uso). Chamadas além
+    disso aguardam na fila; acima de `max_fila` são rejeitadas com
+    BancoSobrecarregadoError (HTTP 503) em vez de acumular indefinidamente.
+    """
+
+    def __init__(self, max_threads: int = DB_ASYNC_THREADS, max_fila: int = DB_ASYNC_MAX_FILA):
+        """
+        Inicializa o executor (threads são criadas sob demanda).
+
+        Args:
+            max_threads: Número máximo de consultas simultâneas
+            max_fila: Número máximo de chamadas aguardando thread livre
+        """
+        if max_threads <= 0:
+            raise ValueError("max_threads deve ser positivo")
+        if max_fila < 0:
+            raise ValueError("max_fila não pode ser negativo")
+
+        self.max_threads = max_threads
+        self.max_fila = max_fila
+        self._executor = ThreadPoolExecutor(max_workers=max_threads, thread_name_prefix="db")
+        self._lock = threading.Lock()
+
+        # Métricas
+        self._na_fila = 0
+        self._em_execucao = 0
+        self._maior_fila = 0
+        self._executadas = 0
+        self._rejeitadas = 0
+        self._erros = 0
+        self._espera_total = 0.0
+        self._execucao_total = 0.0
+
+    def _executar_medindo(self, func: Callable[..., T], enfileirada_em: float) -> T:
+        """Roda na thread do executor, atualizando as métricas."""
+        inicio = time.monotonic()
+        with self._lock:
+            self._na_fila -= 1
+            self._em_execucao += 1
+            self._espera_total += inicio - enfileirada_em
+
+        try:
+            return func()
+        except Exception:
+            with self._lock:
+                self._erros += 1
+            raise
+        finally:
+            with self._lock:
+                self._em_execucao -= 1
+                self._executadas += 1
+                self._execucao_total += time.monotonic() - inicio
+
+    async def executar(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Executa `func(*args, **kwargs)` em uma thread de banco e aguarda o resultado.
+
+        Args:
+            func: Função síncrona (geralmente de um módulo repo)
+            *args: Argumentos posicionais
+            **kwargs: Argumentos nomeados
+
+        Returns:
+            Valor retornado pela função
+
+        Raises:
+            BancoSobrecarregadoError: Se a fila de espera estiver cheia
+        """
+        with self._lock:
+            if self._na_fila >= self.max_fila and self._em_execucao >= self.max_threads:
+                self._rejeitadas += 1
+                na_fila = self._na_fila
+            else:
+                na_fila = None
+                self._na_fila += 1
+                self._maior_fila = max(self._maior_fila, self._na_fila)
+
+        if na_fila is not None:
+            logger.warning(f"[ExecutorBanco] Fila cheia ({na_fila}), rejeitando {func.__qualname__}")
+            raise BancoSobrecarregadoError(na_fila)
+
+        chamada = partial(func, *args, **kwargs)
+        try:
+            futuro = self._executor.submit(self._executar_medindo, chamada, time.monotonic())
+        except RuntimeError:
+            # Executor encerrado: a chamada nunca entrou na fila
+            with self._lock:
+                self._na_fila -= 1
+            raise
+        # Se quem aguarda for cancelado (ex: cliente desconectou) enquanto a
+        # chamada ainda está na fila, ela é cancelada sem nunca executar:
+        # _executar_medindo não roda e a fila precisa ser descontada aqui.
+        futuro.add_done_callback(self._descontar_se_cancelada)
+
+        return await asyncio.wrap_future(futuro)
+
+    def _descontar_se_cancelada(self, futuro: Future) -> None:
+        """Callback do futuro: retira da fila a chamada cancelada antes de executar."""
+        if futuro.cancelled():
+            with self._lock:
+                self._na_fila -= 1
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna métricas do executor.
+
+        Returns:
+            Dicionário com profundidade da fila, concorrência e tempos médios (ms)
+        """
+        with self._lock:
+            executadas = self._executadas
+            return {
+                "max_threads": self.max_threads,
+                "max_fila": self.max_fila,
+                "na_fila": self._na_fila,
+                "em_execucao": self._em_execucao,
+                "maior_fila": self._maior_fila,
+                "executadas": executadas,
+                "rejeitadas": self._rejeitadas,
+                "erros": self._erros,
+                "espera_media_ms": round(self._espera_total / executadas * 1000, 3) if executadas else 0.0,
+                "execucao_media_ms": round(self._execucao_total / executadas * 1000, 3) if executadas else 0.0,
+            }
+
+    def encerrar(self) -> None:
+        """Aguarda as chamadas em andamento e encerra as threads."""
+        self._executor.shutdown(wait=True)
+
+
+class RepoAsync:
+    """
+    Fachada assíncrona para um módulo de repositório.
+
+    Cada função pública do módulo vira uma corrotina executada no
+    ExecutorBanco, com a mesma assinatura e o mesmo retorno.
+
+    Example:
+        >>> usuario_db = RepoAsync(usuario_repo)
+        >>> usuario = await usuario_db.obter_por_id(1)
+    """
+
+    def __init__(self, modulo: ModuleType, executor: "ExecutorBanco | None" = None):
+        self._modulo = modulo
+        self._executor = executor
+
+    def __getattr__(self, nome: str):
+        if nome.startswith("_"):
+            raise AttributeError(nome)
+
+        func = getattr(self._modulo, nome)
+        if not callable(func):
+            raise AttributeError(f"{self._modulo.__name__}.{nome} não é uma função")
+
+        executor = self._executor or executor_banco
+
+        async def chamada_async(*args, **kwargs):
+            return await executor.executar(func, *args, **kwargs)
+
+        chamada_async.__name__ = nome
+        chamada_async.__doc__ = func.__doc__
+        return chamada_async
+
+    def __repr__(self) -> str:
+        return f"RepoAsync({self._modulo.__name__})"
+
+
+# Instância global usada pelas rotas
+executor_banco = ExecutorBanco()
+
+
+def repo_async(modulo: ModuleType) -> RepoAsync:
+    """
+    Cria fachada assíncrona para um módulo de repositório.
+
+    Args:
+        modulo: Módulo do pacote repo (ex: repo.vaga_repo)
+
+    Returns:
+        RepoAsync cujas funções podem ser aguardadas com await
+    """
+    return RepoAsync(modulo)
+
+
+async def executar_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Executa uma função síncrona de banco no executor global.
+
+    Args:
+        func: Função síncrona
+        *args: Argumentos posicionais
+        **kwargs: Argumentos nomeados
+
+    Returns:
+        Valor retornado pela função
+    """
+    return await executor_banco.executar(func, *args, **kwargs)
@@ -1,10 +1,27 @@
 import sqlite3
 import os
+import threading
+import time
+from collections import deque
 from contextlib import contextmanager
 from datetime import datetime
+from typing import Optional
 from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
 
+from util.config import (
+    DB_POOL_SIZE,
+    DB_POOL_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_PING_SEGUNDOS,
+    DB_JOURNAL_MODE,
+    DB_SYNCHRONOUS,
+    DB_BUSY_TIMEOUT_MS,
+    DB_CACHE_SIZE,
+    DB_MMAP_SIZE,
+    DB_TEMP_STORE,
+)
+
 
 load_dotenv()
 
@@ -12,24 +29,500 @@ DATABASE_PATH = os.getenv('DATABASE_PATH', 'dados.db')
 TIMEZONE = os.getenv('TIMEZONE', 'America/Sao_Paulo')
 APP_TIMEZONE = ZoneInfo(TIMEZONE)
 
+# Valores aceitos para os PRAGMAs textuais (evita montar SQL com valor arbitrário)
+_JOURNAL_MODES = {"DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF"}
+_SYNCHRONOUS = {"OFF", "NORMAL", "FULL", "EXTRA"}
+_TEMP_STORES = {"DEFAULT", "FILE", "MEMORY"}
+_NOMES_PRAGMA_NUMERICO = {
+    "foreign_keys": {0: "OFF", 1: "ON"},
+    "synchronous": {0: "OFF", 1: "NORMAL", 2: "FULL", 3: "EXTRA"},
+    "temp_store": {0: "DEFAULT", 1: "FILE", 2: "MEMORY"},
+}
+
+
+def _validar_opcao(nome: str, valor: str, validos: set[str]) -> str:
+    if valor not in validos:
+        raise ValueError(f"{nome} inválido: '{valor}'. Use um de: {', '.join(sorted(validos))}")
+    return valor
+
+
+# Perfil de PRAGMAs aplicado uma única vez a cada conexão aberta pelo pool
+PRAGMAS_CONEXAO: dict[str, str | int] = {
+    "foreign_keys": "ON",
+    "journal_mode": _validar_opcao("DB_JOURNAL_MODE", DB_JOURNAL_MODE, _JOURNAL_MODES),
+    "synchronous": _validar_opcao("DB_SYNCHRONOUS", DB_SYNCHRONOUS, _SYNCHRONOUS),
+    "busy_timeout": DB_BUSY_TIMEOUT_MS,
+    "cache_size": DB_CACHE_SIZE,
+    "mmap_size": DB_MMAP_SIZE,
+    "temp_store": _validar_opcao("DB_TEMP_STORE", DB_TEMP_STORE, _TEMP_STORES),
+}
+
+
+def aplicar_pragmas(conn: sqlite3.Connection) -> None:
+    """
+    Aplica o perfil PRAGMAS_CONEXAO a uma conexão recém-aberta.
+
+    journal_mode é persistente no arquivo, mas reaplicá-lo é barato e
+    garante o modo configurado mesmo em bancos criados antes da mudança.
+
+    Args:
+        conn: Conexão SQLite sem transação aberta
+    """
+    for pragma, valor in PRAGMAS_CONEXAO.items():
+        conn.execute(f"PRAGMA {pragma} = {valor}")
+
+
+def verificar_pragmas() -> dict:
+    """
+    Lê os valores efetivos dos PRAGMAs em uma conexão do pool.
+
+    Usado no startup para registrar a configuração real do banco: alguns
+    valores podem ser recusados silenciosamente pelo SQLite (ex: WAL em
+    bancos em memória ou sistemas de arquivos de rede).
+
+    Returns:
+        Dicionário {pragma: {"configurado": valor, "efetivo": valor, "ok": bool}}
+    """
+    resultado = {}
+    with get_connection() as conn:
+        for pragma, configurado in PRAGMAS_CONEXAO.items():
+            efetivo = conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+            # SQLite devolve alguns PRAGMAs como códigos numéricos
+            if pragma in _NOMES_PRAGMA_NUMERICO:
+                efetivo = _NOMES_PRAGMA_NUMERICO[pragma].get(efetivo, efetivo)
+            elif isinstance(efetivo, str):
+                efetivo = efetivo.upper()
+            resultado[pragma] = {
+                "configurado": configurado,
+                "efetivo": efetivo,
+                "ok": efetivo == configurado,
+            }
+    return resultado
+
+
+class PoolConexoes:
+    """
+    Pool de conexões SQLite reutilizáveis.
+
+    Mantém até `tamanho` conexões ociosas abertas para o mesmo arquivo de banco,
+    evitando abrir/fechar uma conexão (e reconfigurar PRAGMAs) a cada chamada
+    de repositório. Quando todas estão em uso, abre até `max_overflow`
+    conexões temporárias, que são fechadas ao serem devolvidas. Acima disso,
+    aguarda até `timeout` segundos por uma conexão livre.
+
+    Cada conexão é usada por uma thread de cada vez (check_same_thread=False
+    apenas permite que a conexão troque de thread entre checkouts).
+    """
+
+    def __init__(
+        self,
+        caminho: str,
+        tamanho: int = DB_POOL_SIZE,
+        max_overflow: int = DB_POOL_MAX_OVERFLOW,
+        timeout: float = DB_POOL_TIMEOUT,
+        ping_segundos: float = DB_POOL_PING_SEGUNDOS,
+    ):
+        """
+        Inicializa o pool (nenhuma conexão é aberta até o primeiro uso).
+
+        Args:
+            caminho: Caminho do arquivo de banco de dados
+            tamanho: Número máximo de conexões ociosas mantidas abertas
+            max_overflow: Conexões extras permitidas além de `tamanho`
+            timeout: Segundos aguardando conexão livre antes de falhar
+            ping_segundos: Ociosidade a partir da qual a conexão é testada
+        """
+        if tamanho <= 0:
+            raise ValueError("tamanho deve ser positivo")
+        if max_overflow < 0:
+            raise ValueError("max_overflow não pode ser negativo")
+
+        self.caminho = caminho
+        self.tamanho = tamanho
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.ping_segundos = ping_segundos
+
+        self._condicao = threading.Condition()
+        # Pilha LIFO de (conexão, instante em que foi devolvida)
+        self._ociosas: deque[tuple[sqlite3.Connection, float]] = deque()
+        self._abertas = 0
+        self._pid = os.getpid()
+        # Incrementada por fechar(): conexões de gerações antigas não voltam ao pool
+        self._geracao = 0
+        self._geracao_por_conexao: dict[int, int] = {}
+
+        # Contadores para monitoramento
+        self._criadas = 0
+        self._reutilizadas = 0
+        self._descartadas = 0
+        self._esperas = 0
+        self._timeouts = 0
+
+    def _criar_conexao(self) -> sqlite3.Connection:
+        """Abre e configura uma nova conexão."""
+        conn = sqlite3.connect(
+            self.caminho,
+            detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
+            check_same_thread=False
+        )
+        aplicar_pragmas(conn)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _conexao_saudavel(self, conn: sqlite3.Connection) -> bool:
+        """Executa uma consulta trivial para validar a conexão."""
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _verificar_fork(self) -> None:
+        """
+        Descarta conexões herdadas de outro processo.
+
+        Conexões SQLite não podem ser compartilhadas entre processos após
+        fork; elas são apenas esquecidas (sem close) no processo filho.
+        Deve ser chamado com o lock adquirido.
+        """
+        if self._pid != os.getpid():
+            self._ociosas.clear()
+            self._geracao_por_conexao.clear()
+            self._abertas = 0
+            self._pid = os.getpid()
+
+    def obter(self) -> sqlite3.Connection:
+        """
+        Retira uma conexão do pool (abrindo uma nova se necessário).
+
+        Returns:
+            Conexão exclusiva do chamador até ser devolvida com devolver()
+
+        Raises:
+            TimeoutError: Se nenhuma conexão ficar livre dentro do timeout
+        """
+        limite = self.tamanho + self.max_overflow
+        prazo = time.monotonic() + self.timeout
+
+        with self._condicao:
+            self._verificar_fork()
+            esperou = False
+            while not self._ociosas and self._abertas >= limite:
+                if not esperou:
+                    self._esperas += 1
+                    esperou = True
+                restante = prazo - time.monotonic()
+                if restante <= 0 or not self._condicao.wait(restante):
+                    if not self._ociosas and self._abertas >= limite:
+                        self._timeouts += 1
+                        raise TimeoutError(
+                            f"Nenhuma conexão livre no pool após {self.timeout}s "
+                            f"({self._abertas} conexões abertas)"
+                        )
+
+            if self._ociosas:
+                conn, devolvida_em = self._ociosas.pop()
+            else:
+                conn, devolvida_em = None, 0.0
+                self._abertas += 1
+
+        if conn is not None:
+            ociosa_ha = time.monotonic() - devolvida_em
+            if ociosa_ha < self.ping_segundos or self._conexao_saudavel(conn):
+                with self._condicao:
+                    self._reutilizadas += 1
+                    self._geracao_por_conexao[id(conn)] = self._geracao
+                return conn
+            # Conexão quebrada: fechar e abrir outra no mesmo "slot"
+            self._fechar_silenciosamente(conn)
+            with self._condicao:
+                self._descartadas += 1
+
+        try:
+            conn = self._criar_conexao()
+        except Exception:
+            with self._condicao:
+                self._abertas -= 1
+                self._condicao.notify()
+            raise
+
+        with self._condicao:
+            self._criadas += 1
+            self._geracao_por_conexao[id(conn)] = self._geracao
+        return conn
+
+    def devolver(self, conn: sqlite3.Connection, descartar: bool = False) -> None:
+        """
+        Devolve uma conexão ao pool.
+
+        Conexões excedentes (overflow), marcadas para descarte ou com
+        transação pendente são fechadas em vez de reaproveitadas.
+
+        Args:
+            conn: Conexão obtida com obter()
+            descartar: Se True, fecha a conexão em vez de reaproveitá-la
+        """
+        if conn.in_transaction:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                descartar = True
+
+        with self._condicao:
+            if self._pid != os.getpid():
+                # Conexão de outro processo: não reaproveitar nem contar
+                return
+
+            geracao = self._geracao_por_conexao.pop(id(conn), None)
+            if geracao != self._geracao:
+                descartar = True
+
+            if descartar or len(self._ociosas) >= self.tamanho:
+                self._abertas -= 1
+                if descartar:
+                    self._descartadas += 1
+                fechar = True
+            else:
+                self._ociosas.append((conn, time.monotonic()))
+                fechar = False
+            self._condicao.notify()
+
+        if fechar:
+            self._fechar_silenciosamente(conn)
+
+    @contextmanager
+    def transacao(self):
+        """
+        Checkout com escopo de transação.
+
+        Faz commit ao sair normalmente e rollback em caso de exceção;
+        a conexão sempre volta ao pool ao final.
+
+        Example:
+            >>> with pool.transacao() as conn:
+            ...     conn.execute("UPDATE ...")
+        """
+        conn = self.obter()
+        descartar = False
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                descartar = True
+            raise
+        finally:
+            self.devolver(conn, descartar=descartar)
+
+    def fechar(self) -> None:
+        """Fecha todas as conexões ociosas (as em uso são fechadas ao voltar)."""
+        with self._condicao:
+            self._verificar_fork()
+            self._geracao += 1
+            ociosas = [conn for conn, _ in self._ociosas]
+            self._ociosas.clear()
+            self._abertas -= len(ociosas)
+            self._condicao.notify_all()
+
+        for conn in ociosas:
+            self._fechar_silenciosamente(conn)
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna estatísticas do pool para monitoramento.
+
+        Returns:
+            Dicionário com contadores de uso do pool
+        """
+        with self._condicao:
+            ociosas = len(self._ociosas)
+            return {
+                "tamanho": self.tamanho,
+                "max_overflow": self.max_overflow,
+                "abertas": self._abertas,
+                "ociosas": ociosas,
+                "em_uso": self._abertas - ociosas,
+                "criadas": self._criadas,
+                "reutilizadas": self._reutilizadas,
+                "descartadas": self._descartadas,
+                "esperas": self._esperas,
+                "timeouts": self._timeouts,
+            }
+
+    @staticmethod
+    def _fechar_silenciosamente(conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+_pool: Optional[PoolConexoes] = None
+_pool_lock = threading.Lock()
+
+
+def obter_pool() -> PoolConexoes:
+    """
+    Retorna o pool de conexões do banco da aplicação.
+
+    O pool é criado sob demanda e recriado se DATABASE_PATH mudar
+    (por exemplo, em testes que apontam para outro arquivo).
+    """
+    global _pool
+    pool = _pool
+    if pool is not None and pool.caminho == DATABASE_PATH:
+        return pool
+
+    with _pool_lock:
+        if _pool is None or _pool.caminho != DATABASE_PATH:
+            if _pool is not None:
+                _pool.fechar()
+            _pool = PoolConexoes(DATABASE_PATH)
+        return _pool
+
+
+def fechar_pool() -> None:
+    """
+    Fecha as conexões ociosas do pool.
+
+    Necessário antes de substituir o arquivo do banco (ex: restauração
+    de backup), para que nenhuma conexão continue apontando para o
+    arquivo antigo.
+    """
+    if _pool is not None:
+        _pool.fechar()
+
+
+def copiar_banco_para(destino: str) -> None:
+    """
+    Grava uma cópia consistente do banco em `destino` (API de backup do SQLite).
+
+    Em modo WAL, transações confirmadas podem existir apenas no arquivo
+    `-wal`, e outro processo pode fazer checkpoint no `.db` a qualquer
+    momento; copiar o arquivo diretamente perderia ou corromperia dados.
+    A API de backup lê pelas travas normais do SQLite, a partir de uma
+    conexão do pool, e produz um instantâneo íntegro.
+
+    Args:
+        destino: Caminho do arquivo a gravar (sobrescrito se existir)
+    """
+    copia = sqlite3.connect(destino)
+    try:
+        with get_connection() as conn:
+            conn.backup(copia)
+    finally:
+        copia.close()
+
+
+def restaurar_banco_de(origem: str) -> None:
+    """
+    Substitui o conteúdo do banco pelo de `origem` (API de backup do SQLite).
+
+    A escrita passa pela conexão do pool, com as travas e o WAL do próprio
+    SQLite, então conexões de outros workers continuam válidas e passam a
+    ler o conteúdo restaurado; nenhum arquivo é sobrescrito por fora.
+
+    Args:
+        origem: Caminho do arquivo de banco a restaurar
+    """
+    fonte = sqlite3.connect(origem)
+    try:
+        with get_connection() as conn:
+            fonte.backup(conn)
+    finally:
+        fonte.close()
+
+
+def obter_espaco_banco() -> dict:
+    """
+    Lê a ocupação do arquivo do banco.
+
+    Returns:
+        Dicionário com total de páginas, páginas livres e modo de auto_vacuum
+    """
+    with get_connection() as conn:
+        auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        return {
+            "paginas": conn.execute("PRAGMA page_count").fetchone()[0],
+            "paginas_livres": conn.execute("PRAGMA freelist_count").fetchone()[0],
+            "auto_vacuum": {0: "NONE", 1: "FULL", 2: "INCREMENTAL"}.get(auto_vacuum, auto_vacuum),
+        }
+
+
+def liberar_espaco(paginas: int, limiar_livres: float) -> dict:
+    """
+    Devolve ao sistema de arquivos as páginas liberadas por exclusões.
+
+    Só age com auto_vacuum=INCREMENTAL, liberando no máximo `paginas`
+    páginas (operação curta, pode rodar com a aplicação no ar e em vários
+    workers ao mesmo tempo). Bancos sem esse modo nunca são reescritos
+    aqui: quando a fração de páginas livres atinge `limiar_livres`, a ação
+    "conversao_pendente" indica que o administrador deve executar
+    converter_para_vacuum_incremental (Admin > Backups > Compactar banco).
+
+    Args:
+        paginas: Máximo de páginas por execução incremental
+        limiar_livres: Fração (0 a 1) de páginas livres que justifica a conversão
+
+    Returns:
+        Dicionário com a ação executada e as páginas livres antes e depois
+    """
+    antes = obter_espaco_banco()
+    acao = "nenhuma"
+
+    if antes["auto_vacuum"] == "INCREMENTAL":
+        if antes["paginas_livres"] > 0:
+            with get_connection() as conn:
+                # executescript percorre todos os passos do PRAGMA (execute libera só uma página)
+                conn.executescript(f"PRAGMA incremental_vacuum({int(paginas)});")
+            acao = "incremental"
+    elif antes["paginas"] and antes["paginas_livres"] / antes["paginas"] >= limiar_livres:
+        acao = "conversao_pendente"
+
+    depois = obter_espaco_banco()
+    return {
+        "acao": acao,
+        "paginas_livres_antes": antes["paginas_livres"],
+        "paginas_livres_depois": depois["paginas_livres"],
+    }
+
+
+def converter_para_vacuum_incremental() -> dict:
+    """
+    Ativa auto_vacuum=INCREMENTAL e executa um VACUUM completo.
+
+    Reescreve o arquivo inteiro e bloqueia o banco durante a operação, por
+    isso é uma ação de manutenção explícita do administrador, nunca do job
+    de retenção. Basta uma vez: depois dela, liberar_espaco é incremental.
+
+    Returns:
+        Dicionário com o modo de auto_vacuum e as páginas antes e depois
+    """
+    antes = obter_espaco_banco()
+    with get_connection() as conn:
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        conn.execute("VACUUM")
+    depois = obter_espaco_banco()
+    return {
+        "auto_vacuum": depois["auto_vacuum"],
+        "paginas_antes": antes["paginas"],
+        "paginas_depois": depois["paginas"],
+    }
+
+
+def obter_estatisticas_pool() -> dict:
+    """Retorna estatísticas do pool de conexões (ver PoolConexoes.obter_estatisticas)."""
+    return obter_pool().obter_estatisticas()
+
+
 @contextmanager
 def get_connection():
-    """Context manager para conexão com banco de dados"""
-    register_adapters()
-    conn = sqlite3.connect(
-        DATABASE_PATH,
-        detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
-    )
-    conn.execute("PRAGMA foreign_keys = ON")
-    conn.row_factory = sqlite3.Row
-    try:
+    """Context manager para conexão com banco de dados (reutilizada do pool)"""
+    with obter_pool().transacao() as conn:
         yield conn
-        conn.commit()
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
 
 
 def adapt_datetime(dt: datetime) -> str:
@@ -90,4 +583,8 @@ def convert_datetime(s: bytes) -> datetime:
 def register_adapters() -> None:
     """Registra os adaptadores customizados para datetime no sqlite3"""
     sqlite3.register_adapter(datetime, adapt_datetime)
-    sqlite3.register_converter("TIMESTAMP", convert_datetime)
\ No newline at end of file
+    sqlite3.register_converter("TIMESTAMP", convert_datetime)
+
+
+# Adaptadores são globais no módulo sqlite3: registrar uma única vez
+register_adapters()
@@ -6,6 +6,7 @@ exception handlers globais para centralizar o tratamento de erros.
 """
 
 from pydantic import ValidationError
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
 
 class FormValidationError(Exception):
@@ -72,3 +73,22 @@ class FormValidationError(Exception):
         super().__init__(
             f"Erro de validação em '{template_path}': {len(validation_error.errors())} erro(s)"
         )
+
+
+class BancoSobrecarregadoError(StarletteHTTPException):
+    """
+    Fila de consultas assíncronas ao banco está cheia (util/db_async.py).
+
+    Subclasse de HTTPException para ser tratada pelo handler HTTP global,
+    respondendo 503 em vez de acumular requisições indefinidamente.
+
+    Attributes:
+        na_fila: Número de chamadas aguardando no momento da rejeição
+    """
+
+    def __init__(self, na_fila: int):
+        self.na_fila = na_fila
+        super().__init__(
+            status_code=503,
+            detail="Servidor ocupado. Tente novamente em instantes."
+        )
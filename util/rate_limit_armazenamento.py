@@ -0,0 +1,270 @@
+"""
+Armazenamento do estado do rate limiter.
+
+O RateLimiter guarda, por identificador, um token bucket ([fichas, último
+acesso]). Onde esse estado fica é definido pelo armazenamento:
+
+Implementações:
+    - ArmazenamentoMemoria: dicionário no próprio processo (padrão, um worker)
+    - ArmazenamentoSQLite: tabela rate_limit do banco compartilhado; os
+      limites valem somados entre todos os workers e sobrevivem a reinícios
+
+Com N workers e armazenamento em memória, cada processo tem seus próprios
+baldes e o limite efetivo é N vezes o configurado. Outro backend (ex: Redis)
+pode ser usado implementando ArmazenamentoRateLimit e registrando em
+criar_armazenamento; `consumir` precisa ser atômico (reabastecer, verificar
+e consumir em uma única operação).
+"""
+
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+from repo import rate_limit_repo
+from util.config import RATE_LIMIT_BACKEND, RATE_LIMIT_MAX_CHAVES
+from util.logger_config import logger
+
+
+class ArmazenamentoRateLimit(ABC):
+    """
+    Interface do armazenamento de token buckets de um rate limiter.
+
+    Attributes:
+        relogio: Função que retorna o instante atual em segundos, na base
+                 de tempo esperada pelo armazenamento
+    """
+
+    relogio = staticmethod(time.monotonic)
+
+    @abstractmethod
+    def consumir(self, identificador: str, capacidade: int, janela_segundos: float, agora: float) -> bool:
+        """
+        Reabastece o balde e consome uma ficha, se houver, de forma atômica.
+
+        Args:
+            identificador: Identificador do cliente (geralmente IP)
+            capacidade: Fichas do balde cheio (max_tentativas)
+            janela_segundos: Tempo para reabastecer o balde vazio
+            agora: Instante atual (segundos, base de `relogio`)
+
+        Returns:
+            True se a ficha foi consumida (permitido), False se bloqueado
+        """
+
+    @abstractmethod
+    def consultar(self, identificador: str, capacidade: int, janela_segundos: float, agora: float) -> Optional[float]:
+        """
+        Retorna as fichas disponíveis sem consumir.
+
+        Args:
+            identificador: Identificador do cliente
+            capacidade: Fichas do balde cheio
+            janela_segundos: Tempo para reabastecer o balde vazio
+            agora: Instante atual
+
+        Returns:
+            Fichas disponíveis, ou None se o identificador não tem estado
+        """
+
+    @abstractmethod
+    def limpar(self, identificador: Optional[str] = None) -> None:
+        """
+        Remove o estado de um identificador (ou de todos, se None).
+
+        Args:
+            identificador: Identificador a remover
+        """
+
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna métricas do armazenamento.
+
+        Returns:
+            Dicionário com tipo e quantidade de identificadores
+        """
+        return {"tipo": type(self).__name__}
+
+
+def _reabastecer(fichas: float, atualizado_em: float, capacidade: int, janela_segundos: float, agora: float) -> float:
+    """Fichas do balde após reabastecer de `atualizado_em` até `agora`."""
+    return min(float(capacidade), fichas + (agora - atualizado_em) * capacidade / janela_segundos)
+
+
+class ArmazenamentoMemoria(ArmazenamentoRateLimit):
+    """
+    Token buckets em um dicionário do processo.
+
+    `estados` está em ordem de último acesso. Um identificador ocioso por
+    uma janela inteira tem o balde cheio, equivalente a nunca ter sido
+    visto, e é descartado; além disso, no máximo `max_chaves`
+    identificadores são mantidos (os menos recentes saem primeiro).
+    """
+
+    def __init__(self, max_chaves: int = RATE_LIMIT_MAX_CHAVES):
+        if max_chaves <= 0:
+            raise ValueError("max_chaves deve ser positivo")
+        self.max_chaves = max_chaves
+        self.estados: OrderedDict[str, list[float]] = OrderedDict()
+        self.descartadas = 0
+
+    def _obter(self, identificador: str, capacidade: int, janela_segundos: float, agora: float) -> Optional[list[float]]:
+        """Estado [fichas, último acesso] reabastecido até `agora`, ou None."""
+        estado = self.estados.get(identificador)
+        if estado is not None:
+            estado[0] = _reabastecer(estado[0], estado[1], capacidade, janela_segundos, agora)
+            estado[1] = agora
+        return estado
+
+    def _descartar_ociosas(self, janela_segundos: float, agora: float) -> None:
+        """Remove os identificadores ociosos (início do dicionário) e aplica max_chaves."""
+        while self.estados:
+            identificador, estado = next(iter(self.estados.items()))
+            if agora - estado[1] < janela_segundos:
+                break
+            del self.estados[identificador]
+
+        while len(self.estados) > self.max_chaves:
+            self.estados.popitem(last=False)
+            self.descartadas += 1
+
+    def consumir(self, identificador: str, capacidade: int, janela_segundos: float, agora: float) -> bool:
+        estado = self._obter(identificador, capacidade, janela_segundos, agora)
+        if estado is None:
+            estado = [float(capacidade), agora]
+            self.estados[identificador] = estado
+        else:
+            self.estados.move_to_end(identificador)
+        self._descartar_ociosas(janela_segundos, agora)
+
+        if estado[0] < 1:
+            return False
+        estado[0] -= 1
+        return True
+
+    def consultar(self, identificador: str, capacidade: int, janela_segundos: float, agora: float) -> Optional[float]:
+        estado = self._obter(identificador, capacidade, janela_segundos, agora)
+        return None if estado is None else estado[0]
+
+    def limpar(self, identificador: Optional[str] = None) -> None:
+        if identificador is None:
+            self.estados.clear()
+        else:
+            self.estados.pop(identificador, None)
+
+    def obter_estatisticas(self) -> dict:
+        return {
+            **super().obter_estatisticas(),
+            "chaves": len(self.estados),
+            "max_chaves": self.max_chaves,
+            "descartadas": self.descartadas,
+        }
+
+
+class ArmazenamentoSQLite(ArmazenamentoRateLimit):
+    """
+    Token buckets na tabela rate_limit do banco compartilhado entre workers.
+
+    Cada verificação é um único UPSERT ... RETURNING (ver
+    rate_limit_sql.CONSUMIR), atômico mesmo com vários processos. Usa o
+    relógio de parede, comum a todos os processos da máquina. Identificadores
+    ociosos são removidos no máximo uma vez por janela.
+
+    Se o banco falhar (sqlite3.Error), a requisição é permitida e o erro
+    registrado: uma indisponibilidade do armazenamento não deve derrubar as
+    rotas. Consultas e limpeza falham da mesma forma (balde desconhecido,
+    nada removido); outros erros não são engolidos.
+    """
+
+    relogio = staticmethod(time.time)
+
+    def __init__(self, limiter: str):
+        """
+        Args:
+            limiter: Nome do rate limiter (separa os registros na tabela)
+        """
+        self.limiter = limiter
+        self._tabela_criada = False
+        self._proxima_limpeza = 0.0
+        self.falhas = 0
+
+    def _garantir_tabela(self) -> None:
+        if not self._tabela_criada:
+            rate_limit_repo.criar_tabela()
+            self._tabela_criada = True
+
+    def _registrar_falha(self, operacao: str, erro: sqlite3.Error) -> None:
+        self.falhas += 1
+        logger.error(f"[RateLimit] Erro no armazenamento SQLite [{self.limiter}] ao {operacao}: {erro}")
+
+    def consumir(self, identificador: str, capacidade: int, janela_segundos: float, agora: float) -> bool:
+        try:
+            self._garantir_tabela()
+            permitido, _ = rate_limit_repo.consumir(
+                self.limiter, identificador, capacidade, capacidade / janela_segundos, agora
+            )
+            if agora >= self._proxima_limpeza:
+                rate_limit_repo.excluir_ociosos(self.limiter, agora - janela_segundos)
+                self._proxima_limpeza = agora + janela_segundos
+            return permitido
+        except sqlite3.Error as e:
+            self._registrar_falha("consumir", e)
+            return True
+
+    def consultar(self, identificador: str, capacidade: int, janela_segundos: float, agora: float) -> Optional[float]:
+        try:
+            self._garantir_tabela()
+            estado = rate_limit_repo.obter(self.limiter, identificador)
+        except sqlite3.Error as e:
+            self._registrar_falha("consultar", e)
+            return None
+        if estado is None:
+            return None
+        return _reabastecer(estado[0], estado[1], capacidade, janela_segundos, agora)
+
+    def limpar(self, identificador: Optional[str] = None) -> None:
+        try:
+            self._garantir_tabela()
+            rate_limit_repo.excluir(self.limiter, identificador)
+        except sqlite3.Error as e:
+            self._registrar_falha("limpar", e)
+
+    def obter_estatisticas(self) -> dict:
+        try:
+            self._garantir_tabela()
+            chaves = rate_limit_repo.contar(self.limiter)
+        except sqlite3.Error as e:
+            self._registrar_falha("obter estatísticas", e)
+            chaves = None
+        return {
+            **super().obter_estatisticas(),
+            "chaves": chaves,
+            "falhas": self.falhas,
+        }
+
+
+def criar_armazenamento(
+    tipo: str = RATE_LIMIT_BACKEND,
+    limiter: str = "default",
+    max_chaves: int = RATE_LIMIT_MAX_CHAVES
+) -> ArmazenamentoRateLimit:
+    """
+    Cria o armazenamento configurado para um rate limiter.
+
+    Args:
+        tipo: "memoria" ou "sqlite"
+        limiter: Nome do rate limiter
+        max_chaves: Máximo de identificadores (apenas em memória)
+
+    Returns:
+        Instância de ArmazenamentoRateLimit
+
+    Raises:
+        ValueError: Se o tipo não for suportado
+    """
+    if tipo == "memoria":
+        return ArmazenamentoMemoria(max_chaves)
+    if tipo == "sqlite":
+        return ArmazenamentoSQLite(limiter)
+    raise ValueError(f"RATE_LIMIT_BACKEND inválido: {tipo!r} (use 'memoria' ou 'sqlite')")
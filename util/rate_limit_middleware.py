@@ -0,0 +1,191 @@
+"""
+Middleware ASGI de rate limiting.
+
+Aplica os rate limiters a partir de uma tabela declarativa de regras
+(padrão de rota -> limiter), antes do roteamento, da leitura do corpo,
+da decodificação da sessão e da renderização de templates. Requisições
+acima do limite recebem uma resposta 429 pré-renderizada.
+
+Uso (main.py, adicionado por último para ser o middleware mais externo):
+    app.add_middleware(RateLimitMiddleware, regras=[
+        RegraRateLimit("/", public_limiter),
+        RegraRateLimit("/exemplos/{pagina:path}", examples_limiter),
+        RegraRateLimit("/chat/mensagens", chat_mensagem_limiter, metodos=["POST"], formato="json"),
+    ])
+
+Rotas cuja resposta de bloqueio depende da sessão (mensagem flash e
+formulário re-renderizado, como login e cadastro) continuam verificando
+o limiter no próprio handler.
+"""
+
+import json
+import math
+from dataclasses import dataclass, field
+from re import Pattern
+from typing import Iterable, Optional, Sequence
+
+from starlette.requests import Request
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from util.config_cache import config
+from util.db_async import executor_banco
+from util.exceptions import BancoSobrecarregadoError
+from util.logger_config import logger
+from util.rate_limit_armazenamento import ArmazenamentoMemoria
+from util.rate_limiter import RateLimiter
+from util.template_util import obter_templates
+
+MENSAGEM_LIMITE_EXCEDIDO = "Muitas requisições. Aguarde alguns minutos."
+
+FORMATOS = ("html", "json")
+
+# Usada se o template errors/429.html não puder ser renderizado
+_PAGINA_429_SIMPLES = (
+    "<!DOCTYPE html><html lang=\"pt-BR\"><head><meta charset=\"utf-8\">"
+    "<title>Muitas Requisições</title></head><body>"
+    f"<h1>429</h1><p>{MENSAGEM_LIMITE_EXCEDIDO}</p><p><a href=\"/\">Ir para Página Inicial</a></p>"
+    "</body></html>"
+).encode("utf-8")
+
+_CORPO_429_JSON = json.dumps({"detail": MENSAGEM_LIMITE_EXCEDIDO}).encode("utf-8")
+
+
+@dataclass
+class RegraRateLimit:
+    """
+    Associa um padrão de rota a um rate limiter.
+
+    Attributes:
+        caminho: Padrão no formato das rotas do FastAPI ("/chat/mensagens/{sala_id}",
+                 "/exemplos/{pagina:path}"), comparado com o caminho inteiro
+        limiter: RateLimiter aplicado às requisições que casam com o padrão
+        metodos: Métodos HTTP limitados (GET inclui HEAD)
+        formato: Corpo da resposta 429: "html" (página de erro) ou "json" (chamadas fetch)
+    """
+    caminho: str
+    limiter: RateLimiter
+    metodos: Sequence[str] = ("GET",)
+    formato: str = "html"
+    _regex: Pattern = field(init=False, repr=False)
+
+    def __post_init__(self):
+        if self.formato not in FORMATOS:
+            raise ValueError(f"formato inválido: {self.formato!r} (use 'html' ou 'json')")
+        metodos = {metodo.upper() for metodo in self.metodos}
+        if "GET" in metodos:
+            metodos.add("HEAD")
+        self.metodos = frozenset(metodos)
+        self._regex = compile_path(self.caminho)[0]
+
+    def corresponde(self, metodo: str, caminho: str) -> bool:
+        """
+        Verifica se a requisição é coberta pela regra.
+
+        Args:
+            metodo: Método HTTP
+            caminho: Caminho da requisição (sem query string)
+
+        Returns:
+            True se método e caminho casam com a regra
+        """
+        return metodo in self.metodos and self._regex.match(caminho) is not None
+
+
+class RateLimitMiddleware:
+    """
+    Middleware ASGI puro que bloqueia requisições acima do limite.
+
+    A primeira regra que corresponde à requisição decide o limiter; a ordem
+    da tabela importa quando padrões se sobrepõem. O identificador é o IP
+    do cliente, como em rate_limiter.obter_identificador_cliente.
+
+    A página HTML é renderizada uma vez a partir de errors/429.html (como
+    visitante anônimo) e reaproveitada até as configurações mudarem
+    (ConfigCache.obter_versao), já que o tema faz parte da página.
+
+    Limiters em memória são verificados direto no loop de eventos; os de
+    armazenamento compartilhado (SQLite) fazem E/S e rodam no executor do
+    banco (util/db_async.py). Se o executor estiver sobrecarregado, a
+    requisição segue, como numa falha do armazenamento.
+    """
+
+    def __init__(self, app: ASGIApp, regras: Iterable[RegraRateLimit]):
+        """
+        Args:
+            app: Aplicação ASGI envolvida
+            regras: Tabela de regras, em ordem de prioridade
+        """
+        self.app = app
+        self.regras = list(regras)
+        # (versão do config_cache, corpo) da página 429
+        self._pagina_429: Optional[tuple[int, bytes]] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metodo = scope["method"]
+        caminho = scope["path"]
+        for regra in self.regras:
+            if regra.corresponde(metodo, caminho):
+                cliente = scope.get("client")
+                if not await self._verificar(regra.limiter, cliente[0] if cliente else "unknown"):
+                    await self._responder_429(regra, send)
+                    return
+                break
+
+        await self.app(scope, receive, send)
+
+    async def _verificar(self, limiter: RateLimiter, identificador: str) -> bool:
+        """Consome uma ficha do limiter sem bloquear o loop com E/S do armazenamento."""
+        if isinstance(limiter.armazenamento, ArmazenamentoMemoria):
+            return limiter.verificar(identificador)
+        try:
+            return await executor_banco.executar(limiter.verificar, identificador)
+        except BancoSobrecarregadoError:
+            logger.warning(f"[RateLimit] Executor do banco sobrecarregado, permitindo requisição [{limiter.nome}]")
+            return True
+
+    def _obter_pagina_429(self) -> bytes:
+        """Página HTML 429 pré-renderizada (re-renderizada se as configurações mudarem)."""
+        versao = config.obter_versao()
+        if self._pagina_429 is not None and self._pagina_429[0] == versao:
+            return self._pagina_429[1]
+
+        try:
+            request = Request({
+                "type": "http", "method": "GET", "path": "/", "query_string": b"",
+                "headers": [], "session": {},
+            })
+            template = obter_templates().env.get_template("errors/429.html")
+            corpo = template.render(request=request).encode("utf-8")
+        except Exception as e:
+            logger.error(f"Erro ao pré-renderizar página 429: {e}")
+            corpo = _PAGINA_429_SIMPLES
+
+        self._pagina_429 = (versao, corpo)
+        return corpo
+
+    async def _responder_429(self, regra: RegraRateLimit, send: Send) -> None:
+        """Envia a resposta 429 pré-renderizada no formato da regra."""
+        if regra.formato == "json":
+            corpo, tipo = _CORPO_429_JSON, b"application/json"
+        else:
+            corpo, tipo = self._obter_pagina_429(), b"text/html; charset=utf-8"
+
+        limiter = regra.limiter
+        # Tempo para o balde reabastecer uma ficha
+        retry_after = math.ceil(limiter.janela_minutos * 60 / limiter.max_tentativas)
+
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", tipo),
+                (b"content-length", str(len(corpo)).encode("latin-1")),
+                (b"retry-after", str(retry_after).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": corpo})
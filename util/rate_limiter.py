@@ -43,26 +43,37 @@ Uso do DynamicRateLimiter (recomendado):
             raise HTTPException(status_code=429, detail="Muitas tentativas")
 
     # Mudanças nas configurações no banco são aplicadas automaticamente!
+
+Com vários workers, use RATE_LIMIT_BACKEND=sqlite para que os limites sejam
+compartilhados entre os processos (ver util/rate_limit_armazenamento.py).
 """
 
-from collections import defaultdict
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import timedelta
+from typing import Callable, Optional
 from util.logger_config import logger
 from util.config_cache import config
+from util.config import RATE_LIMIT_MAX_CHAVES
+from util.rate_limit_armazenamento import ArmazenamentoRateLimit, criar_armazenamento
 
 
 class RateLimiter:
     """
-    Rate limiter baseado em janela deslizante (sliding window).
+    Rate limiter baseado em token bucket.
+
+    Cada identificador (geralmente IP) tem um balde com capacidade para
+    `max_tentativas` fichas, reabastecido continuamente à taxa de
+    `max_tentativas` fichas por janela. Cada tentativa consome uma ficha;
+    sem fichas, a tentativa é bloqueada.
 
-    Mantém registro de tentativas por identificador (geralmente IP)
-    e bloqueia se exceder limite em janela de tempo.
+    O estado dos baldes fica no armazenamento (ver
+    util/rate_limit_armazenamento.py): em memória, com descarte de
+    identificadores ociosos e no máximo `max_chaves` identificadores, ou
+    no banco compartilhado entre workers (RATE_LIMIT_BACKEND=sqlite).
 
     Attributes:
         max_tentativas: Número máximo de tentativas permitidas
         janela: Timedelta representando janela de tempo
-        tentativas: Dict de identificador -> lista de timestamps
+        armazenamento: Onde ficam os baldes de cada identificador
     """
 
     def __init__(
@@ -70,6 +81,9 @@ class RateLimiter:
         max_tentativas: int = 5,
         janela_minutos: int = 5,
         nome: str = "default",
+        max_chaves: int = RATE_LIMIT_MAX_CHAVES,
+        relogio: Optional[Callable[[], float]] = None,
+        armazenamento: Optional[ArmazenamentoRateLimit] = None,
     ):
         """
         Inicializa rate limiter.
@@ -77,7 +91,11 @@ class RateLimiter:
         Args:
             max_tentativas: Número máximo de tentativas na janela
             janela_minutos: Tamanho da janela em minutos
-            nome: Nome descritivo do limiter (para logs)
+            nome: Nome descritivo do limiter (para logs e no armazenamento compartilhado)
+            max_chaves: Máximo de identificadores no armazenamento em memória
+            relogio: Função que retorna o instante atual em segundos
+                     (padrão: o relógio do armazenamento)
+            armazenamento: Armazenamento dos baldes (padrão: RATE_LIMIT_BACKEND)
         """
         if max_tentativas <= 0:
             raise ValueError("max_tentativas deve ser positivo")
@@ -88,14 +106,16 @@ class RateLimiter:
         self.janela = timedelta(minutes=janela_minutos)
         self.janela_minutos = janela_minutos
         self.nome = nome
-        self.tentativas: defaultdict[str, list[datetime]] = defaultdict(list)
+        self.armazenamento = armazenamento or criar_armazenamento(limiter=nome, max_chaves=max_chaves)
+        self._relogio = relogio or self.armazenamento.relogio
 
     def verificar(self, identificador: str) -> bool:
         """
         Verifica se identificador está dentro do limite.
 
-        Remove tentativas antigas da janela e verifica se está
-        abaixo do máximo. Se estiver, registra nova tentativa.
+        Reabastece o balde do identificador e, se houver ficha disponível,
+        consome uma (registra a tentativa), em uma operação atômica do
+        armazenamento.
 
         Args:
             identificador: Identificador único (geralmente IP)
@@ -104,25 +124,17 @@ class RateLimiter:
             True se dentro do limite (permitido)
             False se excedeu limite (bloqueado)
         """
-        agora = datetime.now()
-
-        # Limpar tentativas antigas (fora da janela)
-        self.tentativas[identificador] = [
-            t for t in self.tentativas[identificador] if agora - t < self.janela
-        ]
+        permitido = self.armazenamento.consumir(
+            identificador, self.max_tentativas, self.janela_minutos * 60, self._relogio()
+        )
 
-        # Verificar se excedeu limite
-        if len(self.tentativas[identificador]) >= self.max_tentativas:
+        if not permitido:
             logger.warning(
                 f"Rate limit excedido [{self.nome}] - "
                 f"Identificador: {identificador}, "
-                f"Tentativas: {len(self.tentativas[identificador])}/{self.max_tentativas}"
+                f"Limite: {self.max_tentativas} em {self.janela_minutos} min"
             )
-            return False
-
-        # Registrar nova tentativa
-        self.tentativas[identificador].append(agora)
-        return True
+        return permitido
 
     def limpar(self, identificador: Optional[str] = None) -> None:
         """
@@ -133,13 +145,18 @@ class RateLimiter:
                           Se None, limpa todos (útil para testes).
         """
         if identificador:
-            if identificador in self.tentativas:
-                del self.tentativas[identificador]
-                logger.debug(f"Limpo rate limit para identificador: {identificador}")
+            self.armazenamento.limpar(identificador)
+            logger.debug(f"Limpo rate limit para identificador: {identificador}")
         else:
-            self.tentativas.clear()
+            self.armazenamento.limpar()
             logger.debug(f"Limpo todos os rate limits [{self.nome}]")
 
+    def _fichas(self, identificador: str) -> Optional[float]:
+        """Fichas disponíveis do identificador (None se não tem estado)."""
+        return self.armazenamento.consultar(
+            identificador, self.max_tentativas, self.janela_minutos * 60, self._relogio()
+        )
+
     def obter_tentativas_restantes(self, identificador: str) -> int:
         """
         Retorna número de tentativas restantes para identificador.
@@ -150,15 +167,8 @@ class RateLimiter:
         Returns:
             Número de tentativas restantes (0 se bloqueado)
         """
-        agora = datetime.now()
-
-        # Limpar tentativas antigas
-        self.tentativas[identificador] = [
-            t for t in self.tentativas[identificador] if agora - t < self.janela
-        ]
-
-        tentativas_atuais = len(self.tentativas[identificador])
-        return max(0, self.max_tentativas - tentativas_atuais)
+        fichas = self._fichas(identificador)
+        return self.max_tentativas if fichas is None else int(fichas)
 
     def obter_tempo_reset(self, identificador: str) -> Optional[timedelta]:
         """
@@ -168,26 +178,24 @@ class RateLimiter:
             identificador: Identificador único
 
         Returns:
-            Timedelta até reset, ou None se não bloqueado
+            Timedelta até a próxima tentativa ser permitida, ou None se não bloqueado
         """
-        if identificador not in self.tentativas or not self.tentativas[identificador]:
+        fichas = self._fichas(identificador)
+        if fichas is None or fichas >= 1:
             return None
 
-        agora = datetime.now()
+        # Tempo até o balde acumular uma ficha inteira
+        segundos_por_ficha = self.janela_minutos * 60 / self.max_tentativas
+        return timedelta(seconds=(1 - fichas) * segundos_por_ficha)
 
-        # Limpar tentativas antigas
-        self.tentativas[identificador] = [
-            t for t in self.tentativas[identificador] if agora - t < self.janela
-        ]
-
-        # Se ainda está bloqueado, calcular tempo até reset
-        if len(self.tentativas[identificador]) >= self.max_tentativas:
-            # Reset quando a tentativa mais antiga sair da janela
-            tentativa_mais_antiga = self.tentativas[identificador][0]
-            tempo_reset = (tentativa_mais_antiga + self.janela) - agora
-            return tempo_reset if tempo_reset.total_seconds() > 0 else None
+    def obter_estatisticas(self) -> dict:
+        """
+        Retorna métricas do armazenamento do limiter.
 
-        return None
+        Returns:
+            Dicionário com tipo de armazenamento e identificadores mantidos
+        """
+        return self.armazenamento.obter_estatisticas()
 
     def __repr__(self) -> str:
         """Representação string do limiter."""
@@ -200,11 +208,13 @@ class RateLimiter:
 
 class DynamicRateLimiter(RateLimiter):
     """
-    Rate limiter dinâmico que busca valores do config_cache a cada verificação.
+    Rate limiter dinâmico que acompanha os valores do config_cache.
 
     Permite alteração de rate limits sem reiniciar o servidor. Os valores
     max_tentativas e janela_minutos são lidos do cache de configuração
-    usando as chaves fornecidas.
+    usando as chaves fornecidas, e relidos apenas quando a versão do cache
+    muda (ConfigCache.obter_versao, que acompanha as configurações salvas em
+    qualquer worker), sem consultas nem conversões no caminho de cada requisição.
 
     Attributes:
         chave_max: Chave de configuração para max_tentativas
@@ -220,6 +230,7 @@ class DynamicRateLimiter(RateLimiter):
         padrao_max: int = 5,
         padrao_minutos: int = 5,
         nome: str = "dynamic",
+        armazenamento: Optional[ArmazenamentoRateLimit] = None,
     ):
         """
         Inicializa rate limiter dinâmico.
@@ -230,6 +241,7 @@ class DynamicRateLimiter(RateLimiter):
             padrao_max: Valor padrão para max_tentativas
             padrao_minutos: Valor padrão para janela_minutos
             nome: Nome descritivo do limiter (para logs)
+            armazenamento: Armazenamento dos baldes (padrão: RATE_LIMIT_BACKEND)
         """
         # Validar valores padrão
         if padrao_max <= 0:
@@ -249,16 +261,27 @@ class DynamicRateLimiter(RateLimiter):
         super().__init__(
             max_tentativas=max_tentativas,
             janela_minutos=janela_minutos,
-            nome=nome
+            nome=nome,
+            armazenamento=armazenamento
         )
 
+        # Versão do config_cache já aplicada. None força a releitura na primeira
+        # verificação: na importação das rotas a tabela configuracao pode ainda
+        # não existir e os valores acima seriam apenas os padrões.
+        self._versao_config: Optional[int] = None
+
     def _atualizar_valores(self) -> None:
         """
         Atualiza valores de max_tentativas e janela_minutos do config_cache.
 
-        Chamado internamente antes de cada verificação para garantir
-        que está usando os valores mais recentes.
+        Chamado internamente antes de cada verificação; só relê as chaves
+        quando a versão do config_cache mudou desde a última leitura.
         """
+        versao = config.obter_versao()
+        if versao == self._versao_config:
+            return
+        self._versao_config = versao
+
         max_tentativas = config.obter_int(self.chave_max, self.padrao_max)
         janela_minutos = config.obter_int(self.chave_minutos, self.padrao_minutos)
 
@@ -282,8 +305,8 @@ class DynamicRateLimiter(RateLimiter):
         """
         Verifica se identificador está dentro do limite (com valores atualizados).
 
-        Atualiza valores do config_cache antes de verificar, garantindo
-        que mudanças em configurações sejam aplicadas imediatamente.
+        Aplica mudanças de configuração salvas desde a última verificação
+        (ver _atualizar_valores) antes de verificar.
 
         Args:
             identificador: Identificador único (geralmente IP)
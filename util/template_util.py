@@ -3,18 +3,40 @@ Módulo de utilidades para templates Jinja2.
 
 Fornece filtros customizados, funções globais e configuração
 do ambiente Jinja2 para a aplicação FastAPI.
+
+Todos os routers compartilham um único Environment (obter_templates), de
+modo que cada template é compilado uma vez por worker. O bytecode
+compilado fica em cache no disco e pode ser gerado na inicialização
+(precompilar_templates).
 """
 
+import time
+from pathlib import Path
 from typing import Union, Optional
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, TemplateError
 from fastapi.templating import Jinja2Templates
 from fastapi import Request
 
 from util.flash_messages import obter_mensagens
-from util.config import APP_NAME, VERSION, TOAST_AUTO_HIDE_DELAY_MS
+from util.config import (
+    APP_NAME,
+    VERSION,
+    TOAST_AUTO_HIDE_DELAY_MS,
+    TEMPLATES_AUTO_RELOAD,
+    TEMPLATES_BYTECODE_CACHE,
+    TEMPLATES_BYTECODE_CACHE_DIR
+)
 from util.csrf_protection import get_csrf_token, CSRF_FORM_FIELD
 from util.config_cache import config
+from util.cache_fragmentos import CacheFragmentosExtension
+from util.logger_config import logger
+
+# Diretório raiz dos templates (permite acesso a base.html e subpastas)
+PASTA_TEMPLATES = "templates"
+
+# Instância compartilhada, criada na primeira chamada de obter_templates
+_templates: Optional[Jinja2Templates] = None
 
 
 def formatar_data_br(
@@ -201,27 +223,37 @@ def csrf_input(request: Optional[Request] = None) -> str:
     return f'<input type="hidden" name="{CSRF_FORM_FIELD}" value="{token}">'
 
 
-def criar_templates(pasta: str) -> Jinja2Templates:
+def _criar_bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    """Cria o cache de bytecode em disco (None se desativado)."""
+    if not TEMPLATES_BYTECODE_CACHE:
+        return None
+    if not TEMPLATES_BYTECODE_CACHE_DIR:
+        # Pasta temporária do sistema, por usuário
+        return FileSystemBytecodeCache()
+    Path(TEMPLATES_BYTECODE_CACHE_DIR).mkdir(parents=True, exist_ok=True)
+    return FileSystemBytecodeCache(TEMPLATES_BYTECODE_CACHE_DIR)
+
+
+def _criar_ambiente() -> Environment:
     """
-    Cria instância de Jinja2Templates com configurações customizadas.
+    Cria o ambiente Jinja2 com configurações customizadas.
 
     Configura o ambiente Jinja2 com:
     - Funções globais (obter_mensagens, csrf_input)
     - Variáveis globais (APP_NAME, VERSION)
     - Filtros customizados (data_br, data_hora_br, foto_usuario)
-
-    Args:
-        pasta: Caminho da pasta de templates (não utilizado, mantido por compatibilidade)
+    - Cache de bytecode em disco e auto_reload conforme TEMPLATES_*
+    - Tag {% cache %} para fragmentos renderizados (util/cache_fragmentos.py)
 
     Returns:
-        Instância configurada de Jinja2Templates
-
-    Note:
-        Sempre usa o diretório raiz 'templates' para permitir
-        acesso a templates base e componentes compartilhados.
+        Environment configurado
     """
-    # Usar o diretório raiz 'templates' para permitir acesso a base.html e subpastas
-    env = Environment(loader=FileSystemLoader("templates"))
+    env = Environment(
+        loader=FileSystemLoader(PASTA_TEMPLATES),
+        auto_reload=TEMPLATES_AUTO_RELOAD,
+        bytecode_cache=_criar_bytecode_cache(),
+        extensions=[CacheFragmentosExtension]
+    )
 
     # Adicionar função global para obter mensagens
     env.globals['obter_mensagens'] = obter_mensagens
@@ -258,5 +290,60 @@ def criar_templates(pasta: str) -> Jinja2Templates:
     env.filters['data_br_as'] = format_data_as_hora
     env.filters['hora_br'] = format_hora
 
-    templates = Jinja2Templates(env=env)
-    return templates
+    return env
+
+
+def obter_templates() -> Jinja2Templates:
+    """
+    Obtém a instância de Jinja2Templates compartilhada por todos os routers.
+
+    Returns:
+        Instância configurada de Jinja2Templates (sempre a mesma no processo)
+    """
+    global _templates
+    if _templates is None:
+        _templates = Jinja2Templates(env=_criar_ambiente())
+    return _templates
+
+
+def criar_templates(pasta: str) -> Jinja2Templates:
+    """
+    Obtém a instância de Jinja2Templates usada pelos routers.
+
+    Args:
+        pasta: Caminho da pasta de templates (não utilizado, mantido por compatibilidade)
+
+    Returns:
+        Instância compartilhada (ver obter_templates)
+
+    Note:
+        Sempre usa o diretório raiz 'templates' para permitir
+        acesso a templates base e componentes compartilhados.
+    """
+    return obter_templates()
+
+
+def precompilar_templates() -> int:
+    """
+    Compila todos os templates .html, aquecendo o cache do ambiente e o
+    cache de bytecode em disco, para que as primeiras requisições não
+    paguem o custo de compilação.
+
+    Templates com erro são registrados no log e ignorados (o erro volta a
+    aparecer quando forem usados).
+
+    Returns:
+        Quantidade de templates compilados
+    """
+    env = obter_templates().env
+    inicio = time.perf_counter()
+    compilados = 0
+    for nome in env.list_templates(extensions=["html"]):
+        try:
+            env.get_template(nome)
+            compilados += 1
+        except TemplateError as e:
+            logger.error(f"Erro ao pré-compilar template '{nome}': {e}")
+
+    logger.info(f"{compilados} templates pré-compilados em {time.perf_counter() - inicio:.2f}s")
+    return compilados